@@ -0,0 +1,89 @@
+import math
+import typing
+
+
+# How much a new shrink rate measurement counts against the running estimate
+RATE_SMOOTHING = 0.3
+
+
+class ClosingBoundary:
+    """
+    The closing boundary as four numbers (its edges), updated only when the server sends a new version of it.
+    Containment checks are a few comparisons, and from how far each edge moved between updates it estimates how fast
+    the boundary is closing in, to predict when a point will end up outside.
+    Rates and predictions are in turns.
+    """
+    def __init__(self):
+        self.known = False
+        self.x_min = -math.inf
+        self.y_min = -math.inf
+        self.x_max = math.inf
+        self.y_max = math.inf
+
+        # How many units each edge moves inwards per turn
+        self.x_min_rate = 0.0
+        self.y_min_rate = 0.0
+        self.x_max_rate = 0.0
+        self.y_max_rate = 0.0
+
+        self._updated_turn = None
+
+    def update(self, game_object: dict, turn: int):
+        """
+        :param game_object: The closing boundary object-dict as sent by the server.
+        :param turn: Number of the turn it arrived in.
+        """
+        corners = game_object["position"]
+        x_min = min(corner[0] for corner in corners)
+        x_max = max(corner[0] for corner in corners)
+        y_min = min(corner[1] for corner in corners)
+        y_max = max(corner[1] for corner in corners)
+
+        if self.known and self._updated_turn is not None and turn > self._updated_turn:
+            turns = turn - self._updated_turn
+            self.x_min_rate = _smooth(self.x_min_rate, (x_min - self.x_min) / turns)
+            self.y_min_rate = _smooth(self.y_min_rate, (y_min - self.y_min) / turns)
+            self.x_max_rate = _smooth(self.x_max_rate, (self.x_max - x_max) / turns)
+            self.y_max_rate = _smooth(self.y_max_rate, (self.y_max - y_max) / turns)
+
+        self.x_min, self.y_min, self.x_max, self.y_max = x_min, y_min, x_max, y_max
+        self.known = True
+        self._updated_turn = turn
+
+    def contains(self, x: float, y: float) -> bool:
+        return self.x_min <= x <= self.x_max and self.y_min <= y <= self.y_max
+
+    def contains_after(self, x: float, y: float, turns: float) -> bool:
+        """
+        :return: Whether (x, y) will still be inside the boundary after the given number of turns.
+        """
+        return (self.x_min + self.x_min_rate * turns <= x <= self.x_max - self.x_max_rate * turns
+                and self.y_min + self.y_min_rate * turns <= y <= self.y_max - self.y_max_rate * turns)
+
+    def turns_until_outside(self, x: float, y: float) -> float:
+        """
+        :return: How many turns until (x, y) is outside the boundary: 0 if it already is, math.inf if the boundary
+            isn't closing in on it.
+        """
+        if not self.contains(x, y):
+            return 0.0
+
+        turns = math.inf
+        for distance, rate in (
+            (x - self.x_min, self.x_min_rate),
+            (self.x_max - x, self.x_max_rate),
+            (y - self.y_min, self.y_min_rate),
+            (self.y_max - y, self.y_max_rate),
+        ):
+            if rate > 0:
+                turns = min(turns, distance / rate)
+        return turns
+
+    def corners(self) -> typing.List[typing.List[float]]:
+        return [[self.x_min, self.y_max], [self.x_min, self.y_min], [self.x_max, self.y_min], [self.x_max, self.y_max]]
+
+
+def _smooth(estimate, measurement):
+    if estimate == 0.0:
+        return measurement
+    return estimate + RATE_SMOOTHING * (measurement - estimate)
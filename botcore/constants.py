@@ -0,0 +1,19 @@
+"""
+Game constants that aren't sent to us by the server.
+https://docs.codequest.club/game_logic/
+"""
+
+# Walls (destructible or not) are squares of this size, centered on their position
+WALL_SIZE = 18.0
+
+# Tanks are squares of this size, centered on their position
+TANK_SIZE = 20.0
+
+# Distance a tank covers in one second at its base speed
+TANK_SPEED = 150.0
+
+# Length of one server simulation step in seconds. Velocities are given in units per second.
+TICK_DURATION = 1 / 30
+
+# Distance a bullet covers in one second
+BULLET_SPEED = 450.0
@@ -0,0 +1,401 @@
+import math
+import typing
+
+import numpy as np
+
+from . import geometry
+from .constants import BULLET_SPEED, TANK_SPEED, TICK_DURATION, WALL_SIZE
+from .line_of_sight import LineOfSight, WALL_FLAG
+from .navigation import NavigationGrid
+from .scheduler import Deadline
+
+
+# Side of a cover cell. Visibility is worked out between the centers of these, so a coarser grid is cheaper to build
+# but a rougher idea of where exactly the cover is.
+COVER_CELL_SIZE = 4 * WALL_SIZE
+
+# Distance between the points checked along the line between two cells, half a wall so no wall is skipped
+SAMPLE_SPACING = WALL_SIZE / 2
+
+# Marks a line of sight grid cell with a static wall in it while building
+STATIC_WALL = -2
+
+# Points checked per batch while building the map, which keeps a batch to a few milliseconds
+BATCH_SAMPLES = 1 << 15
+
+# Damage our bullets do to a wall unless the caller knows better
+DEFAULT_BULLET_DAMAGE = 1.0
+
+# We can fire once per turn, so every hit on a wall costs at least a turn
+TURNS_PER_HIT = 1.0
+
+# Distances covered in one turn
+TANK_SPEED_PER_TURN = TANK_SPEED * TICK_DURATION
+BULLET_SPEED_PER_TURN = BULLET_SPEED * TICK_DURATION
+
+
+class CoverMap:
+    """
+    Knows where on the map one can hide from the enemy, and which destructible walls are worth shooting through.
+    The map is split into cells of COVER_CELL_SIZE and for every pair of cells it keeps whether their centers can see
+    each other, as one boolean matrix, so "can A see B" is a single lookup. The line between every pair is sampled once
+    (in NumPy batches, under a deadline, see `build`), which gives the pairs static walls block and, for the rest, the
+    destructible walls in the way. A pair can see through once all of its destructible walls are gone, so destroying a
+    wall only touches the pairs it was blocking instead of the whole matrix.
+    The nearest covered cell from every cell is worked out for a whole row (one enemy cell) at once the first time it's
+    asked for and then kept until a wall is destroyed, so repeated questions are lookups too.
+    Destructible walls are tracked by id with their health as it comes in with the turn deltas.
+    The map as it was at the start of the match can be exported once it's built, and restored in a later match on the
+    same map instead of being built again (see `map_cache`).
+    """
+    def __init__(self, line_of_sight: LineOfSight, navigation: NavigationGrid, width: float, height: float,
+                 cell_size: float = COVER_CELL_SIZE):
+        self.line_of_sight = line_of_sight
+        self.navigation = navigation
+        self.cell_size = cell_size
+        self.columns = int(math.ceil(width / cell_size))
+        self.rows = int(math.ceil(height / cell_size))
+        cells = self.columns * self.rows
+
+        cell_y, cell_x = np.divmod(np.arange(cells), self.columns)
+        self._centers = np.stack([
+            np.minimum((cell_x + 0.5) * cell_size, width),
+            np.minimum((cell_y + 0.5) * cell_size, height),
+        ], axis=1)
+        self._distances = geometry.distances(self._centers, self._centers).astype(np.float32)
+        # Whether a tank can stand on each cell's center, worked out again when walls come or go
+        self._standable = np.ones(cells, dtype=bool)
+        self._standable_stale = True
+
+        # Every unordered pair of cells, shortest first, and how far `build` has got through them
+        pair_a, pair_b = np.triu_indices(cells, 1)
+        lengths = self._distances[pair_a, pair_b]
+        order = np.argsort(lengths, kind="stable")
+        self._pair_a, self._pair_b, self._pair_lengths = pair_a[order], pair_b[order], lengths[order]
+        self._built_pairs = 0
+        # Starts as everyone sees everyone, pairs are blocked off as they're built
+        self._visible = np.ones((cells, cells), dtype=bool)
+        # Per pair: number of destructible walls in the way, -1 if a static wall is. Once as the map was at the start
+        # (which is what gets cached) and once counting only the walls that are still standing.
+        self._initial_blockers = np.zeros(len(self._pair_a), dtype=np.int16)
+        self._blockers = np.zeros(len(self._pair_a), dtype=np.int16)
+
+        self._cell_columns = line_of_sight.columns
+        self._cell_rows = line_of_sight.rows
+        # The line of sight grid's cells: index of the destructible wall in each at the start, -1 if none
+        self._wall_of_cell = np.full(self._cell_columns * self._cell_rows, -1, dtype=np.int32)
+
+        # {destructible-wall-id: (x, y, hp)}
+        self._walls = {}
+        # Destructible walls get an index on the order they were added in, {id: index}, [id, ...] and [(x, y), ...]
+        self._wall_indexes = {}
+        self._wall_ids = []
+        self._wall_positions = []
+        self._wall_alive = []
+        # {wall index: pairs it blocks}, filled by `build`. Destroyed walls are kept, for `export`.
+        self._wall_pairs = {}
+
+        # {enemy cell: nearest covered cell from every cell, -1 where there's none}
+        self._nearest = {}
+
+    @property
+    def ready(self) -> bool:
+        """
+        Whether the whole map has been built. Until it is, pairs that haven't been looked at yet count as visible.
+        """
+        return self._built_pairs == len(self._pair_a)
+
+    def cell_of(self, x: float, y: float) -> int:
+        cell_x = min(max(int(x // self.cell_size), 0), self.columns - 1)
+        cell_y = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return cell_y * self.columns + cell_x
+
+    def update_wall(self, object_id: str, x: float, y: float, hp: typing.Optional[float] = None):
+        """
+        Adds a destructible wall, or updates the health of a known one.
+        Walls are only sent during init, one that shows up after the map has been built makes it start over.
+        """
+        known = self._walls.get(object_id)
+        if known is not None:
+            if hp is not None:
+                self._walls[object_id] = (known[0], known[1], float(hp))
+            return
+
+        self._walls[object_id] = (x, y, float(hp) if hp is not None else 1.0)
+        index = self._wall_indexes[object_id] = len(self._wall_ids)
+        self._wall_ids.append(object_id)
+        self._wall_positions.append((float(x), float(y)))
+        self._wall_alive.append(True)
+        for cell in self._cells_covered(x, y):
+            self._wall_of_cell[cell] = index
+        self._standable_stale = True
+        if self._built_pairs:
+            self._restart()
+
+    def remove_wall(self, object_id: str):
+        """
+        Forgets a destroyed wall and opens up the lines of sight it was the last thing blocking. Pairs that haven't
+        been built yet leave it out when they are. Unknown ids are ignored.
+        """
+        if self._walls.pop(object_id, None) is None:
+            return
+        index = self._wall_indexes[object_id]
+        self._wall_alive[index] = False
+        self._standable_stale = True
+        self._nearest.clear()
+
+        pairs = self._wall_pairs.get(index)
+        if pairs is None or not len(pairs):
+            return
+        self._blockers[pairs] -= 1
+        opened = pairs[self._blockers[pairs] == 0]
+        first, second = self._pair_a[opened], self._pair_b[opened]
+        self._visible[first, second] = True
+        self._visible[second, first] = True
+
+    def health(self, object_id: str) -> typing.Optional[float]:
+        """
+        :return: The wall's health as last sent by the server, or None if there's no such wall.
+        """
+        wall = self._walls.get(object_id)
+        return wall[2] if wall is not None else None
+
+    def build(self, deadline: typing.Optional[Deadline] = None) -> bool:
+        """
+        Works through the cell pairs that haven't been looked at yet, a batch at a time, until the deadline.
+        At least one batch is always done.
+        :return: Whether the map is complete.
+        """
+        total = len(self._pair_a)
+        if self._built_pairs == total:
+            return True
+
+        # What's in every line of sight grid cell: a destructible wall's index, STATIC_WALL or -1 for nothing
+        contents = self._wall_of_cell.copy()
+        contents[(np.frombuffer(self.line_of_sight.flags, dtype=np.uint8) & WALL_FLAG) != 0] = STATIC_WALL
+        while self._built_pairs < total:
+            start = self._built_pairs
+            # Pairs are sorted by length, so the batch is sized by the longest line it could end with
+            longest = self._pair_lengths[min(start + BATCH_SAMPLES // _samples(self._pair_lengths[start]), total) - 1]
+            end = min(start + max(BATCH_SAMPLES // _samples(longest), 1), total)
+            self._build_batch(contents, start, end)
+            self._built_pairs = end
+            if deadline is not None and deadline.expired():
+                break
+
+        self._nearest.clear()
+        return self._built_pairs == total
+
+    def export(self) -> typing.Optional[typing.Dict[str, np.ndarray]]:
+        """
+        :return: The built map as it was at the start of the match, as {name: array}, to be saved and handed to
+            `restore` in a later match on the same map. None if it isn't built yet.
+        """
+        if not self.ready:
+            return None
+        pairs = [self._wall_pairs.get(index, np.zeros(0, dtype=np.intp)) for index in range(len(self._wall_ids))]
+        offsets = np.zeros(len(pairs) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(wall_pairs) for wall_pairs in pairs])
+        return {
+            "blockers": self._initial_blockers,
+            "wall_positions": np.array(self._wall_positions, dtype=float).reshape(-1, 2),
+            "wall_pair_offsets": offsets,
+            "wall_pairs": np.concatenate(pairs).astype(np.int32) if pairs else np.zeros(0, dtype=np.int32),
+        }
+
+    def restore(self, arrays: typing.Dict[str, np.ndarray]) -> bool:
+        """
+        Takes over a map built in an earlier match, as given by `export`, before any wall has been destroyed. Walls are
+        matched up by position, since their ids can differ between matches. The arrays are used as they are, not
+        copied, apart from what changes as walls get destroyed.
+        :return: Whether they fit this map. If not nothing is changed.
+        """
+        blockers = arrays["blockers"]
+        positions = arrays["wall_positions"]
+        offsets = arrays["wall_pair_offsets"]
+        if (blockers.shape != self._blockers.shape or len(positions) != len(self._wall_ids)
+                or len(offsets) != len(positions) + 1):
+            return False
+
+        indexes = {position: index for index, position in enumerate(self._wall_positions)}
+        wall_pairs = {}
+        for cached, (x, y) in enumerate(positions.tolist()):
+            index = indexes.get((x, y))
+            if index is None:
+                return False
+            wall_pairs[index] = arrays["wall_pairs"][offsets[cached]:offsets[cached + 1]]
+
+        self._initial_blockers = blockers
+        self._blockers = np.array(blockers)
+        self._wall_pairs = wall_pairs
+        hidden = np.flatnonzero(blockers)
+        self._visible[:] = True
+        self._visible[self._pair_a[hidden], self._pair_b[hidden]] = False
+        self._visible[self._pair_b[hidden], self._pair_a[hidden]] = False
+        self._built_pairs = len(self._pair_a)
+        self._nearest.clear()
+        return True
+
+    def _build_batch(self, contents: np.ndarray, start: int, end: int):
+        first, second = self._pair_a[start:end], self._pair_b[start:end]
+        # In line of sight grid cells rather than map units, so a point's cell is just its integer part
+        size = self.line_of_sight.cell_size
+        a = (self._centers[first] / size).astype(np.float32)
+        offset = (self._centers[second] / size).astype(np.float32) - a
+        samples = np.maximum(np.ceil(self._pair_lengths[start:end] / SAMPLE_SPACING).astype(np.int32), 1)
+
+        # Points along every line, padded to the longest one in the batch: (pairs, samples, 2). The pairs are sorted by
+        # length, so there's little padding.
+        steps = np.arange(1, samples.max(), dtype=np.int32)
+        fraction = np.minimum(steps[None, :] / samples[:, None].astype(np.float32), 1.0)
+        points = a[:, None, :] + offset[:, None, :] * fraction[:, :, None]
+        cells = points[..., 1].astype(np.int32) * self._cell_columns + points[..., 0].astype(np.int32)
+        # Like LineOfSight, the cells the ends are in don't count
+        start_cells = a[:, 1].astype(np.int32) * self._cell_columns + a[:, 0].astype(np.int32)
+        end_cells = self._grid_cells(self._centers[second])
+        valid = (steps[None, :] < samples[:, None]) & (cells != start_cells[:, None]) & (cells != end_cells[:, None])
+
+        found = np.where(valid, contents[cells], -1)
+        blocked = (found == STATIC_WALL).any(axis=1)
+        found[blocked] = -1
+
+        pair_rows, sample_columns = np.nonzero(found >= 0)
+        initial_blockers = np.zeros(end - start, dtype=np.int16)
+        blockers = np.zeros(end - start, dtype=np.int16)
+        if len(pair_rows):
+            # Every wall counts once per pair, however many of its cells the line crosses
+            walls = len(self._wall_ids)
+            keys = np.unique(pair_rows.astype(np.int64) * walls + found[pair_rows, sample_columns])
+            pair_rows, wall_indexes = np.divmod(keys, walls)
+            initial_blockers = np.bincount(pair_rows, minlength=end - start).astype(np.int16)
+            standing = np.array(self._wall_alive)[wall_indexes]
+            blockers = np.bincount(pair_rows[standing], minlength=end - start).astype(np.int16)
+            order = np.argsort(wall_indexes, kind="stable")
+            wall_indexes, pairs = wall_indexes[order], pair_rows[order] + start
+            splits = np.flatnonzero(np.diff(wall_indexes)) + 1
+            for index, wall_pairs in zip(wall_indexes[np.r_[0, splits]].tolist(), np.split(pairs, splits)):
+                known = self._wall_pairs.get(index)
+                self._wall_pairs[index] = wall_pairs if known is None else np.concatenate([known, wall_pairs])
+
+        initial_blockers[blocked] = -1
+        blockers[blocked] = -1
+        self._initial_blockers[start:end] = initial_blockers
+        self._blockers[start:end] = blockers
+        hidden = blockers != 0
+        self._visible[first[hidden], second[hidden]] = False
+        self._visible[second[hidden], first[hidden]] = False
+
+    def _grid_cells(self, points: np.ndarray) -> np.ndarray:
+        """
+        :return: Index of the line of sight grid cell each point is in, for points of any shape (..., 2).
+        """
+        size = self.line_of_sight.cell_size
+        cell_x = np.clip((points[..., 0] // size).astype(np.int32), 0, self._cell_columns - 1)
+        cell_y = np.clip((points[..., 1] // size).astype(np.int32), 0, self._cell_rows - 1)
+        return cell_y * self._cell_columns + cell_x
+
+    def _cells_covered(self, x: float, y: float) -> typing.List[int]:
+        size = self.line_of_sight.cell_size
+        half = WALL_SIZE / 2
+        epsilon = 1e-6
+        min_x = max(int((x - half + epsilon) // size), 0)
+        max_x = min(int((x + half - epsilon) // size), self._cell_columns - 1)
+        min_y = max(int((y - half + epsilon) // size), 0)
+        max_y = min(int((y + half - epsilon) // size), self._cell_rows - 1)
+        return [
+            cell_y * self._cell_columns + cell_x
+            for cell_y in range(min_y, max_y + 1)
+            for cell_x in range(min_x, max_x + 1)
+        ]
+
+    def _restart(self):
+        self._built_pairs = 0
+        self._visible[:] = True
+        self._initial_blockers[:] = 0
+        self._blockers[:] = 0
+        self._wall_pairs.clear()
+        self._nearest.clear()
+
+    def visible(self, x1: float, y1: float, x2: float, y2: float) -> bool:
+        """
+        :return: Whether the cells the two points are in can see each other.
+        """
+        return bool(self._visible[self.cell_of(x1, y1), self.cell_of(x2, y2)])
+
+    def nearest_cover(self, x: float, y: float, enemy_x: float, enemy_y: float) -> typing.Optional[typing.List[float]]:
+        """
+        :return: The center of the closest cell (in a straight line) to (x, y) that the enemy's cell can't see and a
+            tank can stand in, or None if there's no such cell. Until the map is `ready` there's less cover than there
+            really is.
+        """
+        enemy_cell = self.cell_of(enemy_x, enemy_y)
+        nearest = self._nearest.get(enemy_cell)
+        if nearest is None:
+            nearest = self._nearest[enemy_cell] = self._nearest_row(enemy_cell)
+        cover = int(nearest[self.cell_of(x, y)])
+        if cover < 0:
+            return None
+        return self._centers[cover].tolist()
+
+    def _nearest_row(self, enemy_cell: int) -> np.ndarray:
+        if self._standable_stale:
+            self._standable = np.array([self.navigation.is_walkable(x, y) for x, y in self._centers.tolist()])
+            self._standable_stale = False
+        covered = np.flatnonzero(~self._visible[enemy_cell] & self._standable)
+        if not len(covered):
+            return np.full(len(self._centers), -1, dtype=np.intp)
+        return covered[np.argmin(self._distances[:, covered], axis=1)]
+
+    def blocking_wall(self, x1: float, y1: float, x2: float, y2: float) -> typing.Optional[str]:
+        """
+        :return: The id of the first destructible wall on the straight line from (x1, y1) to (x2, y2), or None.
+        """
+        length = math.hypot(x2 - x1, y2 - y1)
+        samples = max(int(math.ceil(length / SAMPLE_SPACING)), 1)
+        size = self.line_of_sight.cell_size
+        for step in range(1, samples):
+            x = x1 + (x2 - x1) * step / samples
+            y = y1 + (y2 - y1) * step / samples
+            cell_x = min(max(int(x // size), 0), self._cell_columns - 1)
+            cell_y = min(max(int(y // size), 0), self._cell_rows - 1)
+            index = self._wall_of_cell[cell_y * self._cell_columns + cell_x]
+            if index >= 0 and self._wall_alive[index]:
+                return self._wall_ids[index]
+        return None
+
+    def breach_turns(self, object_id: str, x: float, y: float, damage: float = DEFAULT_BULLET_DAMAGE) -> float:
+        """
+        :return: How many turns it takes to shoot the wall down from (x, y): a turn per hit it takes, plus the last
+            bullet's flight. math.inf for unknown walls.
+        """
+        wall = self._walls.get(object_id)
+        if wall is None:
+            return math.inf
+        wall_x, wall_y, hp = wall
+        hits = max(math.ceil(hp / damage), 1)
+        return hits * TURNS_PER_HIT + math.hypot(wall_x - x, wall_y - y) / BULLET_SPEED_PER_TURN
+
+    def should_breach(self, object_id: str, x: float, y: float, target_x: float, target_y: float,
+                      damage: float = DEFAULT_BULLET_DAMAGE) -> bool:
+        """
+        Whether shooting through the given wall gets us from (x, y) to the target sooner than walking around it.
+        Going through is taken as straight to the wall and straight on to the target. Going around is the navigation
+        grid's walking distance, so the target's distance field has to be there already (building it here would take
+        too long); without it the answer is False.
+        """
+        wall = self._walls.get(object_id)
+        if wall is None or not self.navigation.has_distance_field(target_x, target_y):
+            return False
+        wall_x, wall_y, _ = wall
+        through = math.hypot(wall_x - x, wall_y - y) + math.hypot(target_x - wall_x, target_y - wall_y)
+        around = self.navigation.path_distance(x, y, target_x, target_y)
+        if math.isinf(around):
+            return True
+        return (around - through) / TANK_SPEED_PER_TURN > self.breach_turns(object_id, x, y, damage)
+
+
+def _samples(length: float) -> int:
+    """
+    :return: How many steps of SAMPLE_SPACING a line of the given length is split into.
+    """
+    return max(int(math.ceil(length / SAMPLE_SPACING)), 1)
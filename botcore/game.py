@@ -0,0 +1,359 @@
+"""
+The part of a bot that every bot needs: reading the game server's messages, keeping track of every object and the
+engines built on top of them, and sending responses. A bot subclasses BaseGame and writes its strategy in
+`respond_to_turn`, then hands its class to `run`.
+"""
+import importlib
+import threading
+import time
+
+from . import comms
+from . import telemetry
+from .actions import ActionOutput
+from .boundary import ClosingBoundary
+from .hit_table import HitTable
+from .line_of_sight import LineOfSight
+from .navigation import NavigationGrid
+from .object_store import ObjectStore
+from .object_types import ObjectTypes
+from .routes import RoutePlanner
+from .scheduler import Deadline, TurnScheduler, turn_time
+from .spatial_index import SpatialIndex
+from .tracker import MotionTracker
+
+
+BULLET = ObjectTypes.BULLET.value
+WALL = ObjectTypes.WALL.value
+DESTRUCTIBLE_WALL = ObjectTypes.DESTRUCTIBLE_WALL.value
+CLOSING_BOUNDARY = ObjectTypes.CLOSING_BOUNDARY.value
+POWERUP = ObjectTypes.POWERUP.value
+
+# Turns that were already over when we got to them are applied without a response, at most this many in a row
+MAX_SKIPPED_TURNS = 3
+
+# Engines that take a while to import, loaded by `_preload` before the game needs them
+PRELOADED_MODULES = ("bounce_shot", "cover", "history", "map_cache", "search", "threats", "workers")
+
+
+class BaseGame:
+    """
+    Stores all information about the game and manages the communication cycle.
+    Available attributes after initialization will be:
+    - tank_id: your tank id
+    - objects: a dict of all objects on the map like {object-id: object-dict}.
+    - store: the same objects split into per-type buckets, see `ObjectStore`.
+    - width: the width of the map as a floating point number.
+    - height: the height of the map as a floating point number.
+    - current_turn_message: a copy of the message received this turn. It will be updated everytime `read_next_turn_data`
+        is called and will be available to be used in `respond_to_turn` if needed.
+    - index: a spatial index over the walls, destructible walls, powerups and bullets, kept up to date every turn.
+    - line_of_sight: wall grid used to check whether shots between two points are blocked.
+    - navigation: occupancy grid that gives walking distances around the walls.
+    - threats: every live bullet's position and velocity, used to see incoming shots and dodge them.
+    - bounce_solver: finds shots that reach the enemy by bouncing off walls.
+    - scheduler: runs the planning stages of each turn so a response is always sent before the turn's time runs out.
+    - turn_started: perf_counter time the current turn's message was received.
+    - turn: number of turns played so far.
+    - boundary: the closing boundary, with a prediction of how fast it is closing in.
+    - enemy_tracker: the enemy tank's recent positions and where it's heading.
+    - search: plays candidate moves and shots forward a few ticks to find the best ones.
+    - workers: processes that play some of the search's rollouts on the other cores, None if there's only one.
+    - routes: decides which powerups to go for and in what order.
+    - history: what changed in each of the recent turns, for looking back in time.
+    - cover: where to hide from the enemy, and the destructible walls' health and whether to shoot through them.
+    - map_key: fingerprint of the map's walls, under which the slow to build parts are cached on disk, see `precompute`.
+    - actions: the path the server is taking us along, which `post_response` only changes when it's worth it.
+    - hit_table: how likely a shot at the enemy is to hit, to decide whether it's worth taking.
+    """
+    # Object types that are kept in the spatial index
+    TRACKED_TYPES = (WALL, DESTRUCTIBLE_WALL, POWERUP, BULLET)
+
+    def __init__(self):
+        self.scheduler = TurnScheduler()
+        self.actions = ActionOutput()
+        self.turn_started = time.perf_counter()
+        
+        tank_id_message: dict = comms.read_message()
+        self.tank_id = tank_id_message["message"]["your-tank-id"]
+        
+        self.enemy_tank_id = tank_id_message["message"]["enemy-tank-id"]
+
+        self.current_turn_message = None
+        # Set once the end game signal has been read, which can be along with the last turn
+        self._game_over = False
+
+        # We will store all game objects here
+        self.store = ObjectStore()
+        self.objects = self.store.objects
+
+        next_init_message = comms.read_message()
+        while next_init_message != comms.END_INIT_SIGNAL:
+            # At this stage, there won't be any "events" in the message. So we only care about the object_info.
+            object_info: dict = next_init_message["message"]["updated_objects"]
+
+            # Store them in the object store, which sorts them into per-type buckets as they come in
+            self.store.apply((), object_info)
+
+            # Read the next message
+            next_init_message = comms.read_message()
+
+        # We are outside the loop, which means we must've received the END_INIT signal
+
+        # The biggest X and the biggest Y among all corners of the boundaries must be the top right corner of the map
+        self.width = 0.0
+        self.height = 0.0
+        for boundary in self.store.boundaries.values():
+            for corner_x, corner_y in boundary["position"]:
+                self.width = max(self.width, corner_x)
+                self.height = max(self.height, corner_y)
+
+        # These need numpy, which takes longer to import than everything else put together. `run` starts importing
+        # them in the background as soon as the bot starts, so they're usually ready by the time we get here.
+        from . import map_cache
+        from .bounce_shot import BounceShotSolver
+        from .cover import CoverMap
+        from .history import WorldHistory
+        from .search import ActionSearch
+        from .threats import BulletThreats
+        from .workers import WorkerPool, default_workers
+
+        self.index = SpatialIndex()
+        self.line_of_sight = LineOfSight(self.width, self.height)
+        self.navigation = NavigationGrid(self.width, self.height)
+        self.threats = BulletThreats(self.line_of_sight, self.width, self.height, self.tank_id)
+        # Started once and kept for the whole match, they take a moment to come up and join in
+        workers = default_workers()
+        self.workers = WorkerPool(workers) if workers else None
+        self.search = ActionSearch(
+            self.threats, self.line_of_sight, self.navigation, self.width, self.height, pool=self.workers,
+        )
+        self.routes = RoutePlanner(self.navigation)
+        self.cover = CoverMap(self.line_of_sight, self.navigation, self.width, self.height)
+        self.history = WorldHistory()
+        self.turn = 0
+        self.boundary = ClosingBoundary()
+        self.enemy_tracker = MotionTracker()
+        self.hit_table = HitTable.load()
+
+        # One pass over everything we got during init fills all of the above
+        self.track_objects(self.objects)
+
+        # Turns the walls into faces once, so it has to come after they're in the line of sight grid
+        self.bounce_solver = BounceShotSolver(self.line_of_sight, self.width, self.height)
+
+        # Maps come up again and again, the slow to build parts may be on disk from an earlier match already
+        self.map_key = map_cache.fingerprint(
+            self.width, self.height,
+            (wall["position"] for wall in self.store.walls.values()),
+            (wall["position"] for wall in self.store.destructible_walls.values()),
+            "cover", self.cover.cell_size,
+        )
+        cached = map_cache.load(self.map_key)
+        self._map_cached = cached is not None and self.cover.restore(cached)
+
+    def track_objects(self, updated_objects: dict):
+        """
+        Keeps the spatial index, line of sight and navigation grids, cover map, bullet threats, route planner, closing
+        boundary and enemy tracker in sync with the given new or updated objects.
+        """
+        for object_id, game_object in updated_objects.items():
+            object_type = game_object["type"]
+            if object_type == CLOSING_BOUNDARY:
+                self.boundary.update(game_object, self.turn)
+            elif object_id == self.enemy_tank_id:
+                enemy_tank = self.store.tanks[object_id]
+                if "velocity" in game_object:
+                    self.enemy_tracker.update(enemy_tank.x, enemy_tank.y, self.turn, enemy_tank.vx, enemy_tank.vy)
+                else:
+                    # The store says 0 when the server leaves it out, let the tracker work it out from the positions
+                    self.enemy_tracker.update(enemy_tank.x, enemy_tank.y, self.turn)
+            elif object_type in self.TRACKED_TYPES:
+                position = game_object["position"]
+                self.index.insert(object_id, object_type, position[0], position[1])
+                if object_type == WALL:
+                    # Only ever sent during init
+                    self.line_of_sight.add_wall(position[0], position[1])
+                    self.navigation.add_wall(position[0], position[1])
+                elif object_type == DESTRUCTIBLE_WALL:
+                    self.line_of_sight.add_destructible_wall(object_id, position[0], position[1])
+                    self.navigation.add_destructible_wall(object_id, position[0], position[1])
+                    # Sent again whenever the wall takes damage
+                    self.cover.update_wall(object_id, position[0], position[1], game_object.get("hp"))
+                elif object_type == POWERUP:
+                    self.routes.add(object_id, position[0], position[1], game_object.get("powerup_type"))
+                elif object_type == BULLET:
+                    bullet = self.store.bullets[object_id]
+                    self.threats.update(object_id, bullet.x, bullet.y, bullet.vx, bullet.vy, bullet.tank_id)
+
+    def untrack_objects(self, deleted_objects: list):
+        """
+        Removes the given deleted objects from the spatial index, line of sight and navigation grids, cover map, bullet
+        threats and route planner.
+        """
+        for object_id in deleted_objects:
+            self.index.remove(object_id)
+            self.line_of_sight.remove_destructible_wall(object_id)
+            self.navigation.remove_destructible_wall(object_id)
+            self.cover.remove_wall(object_id)
+            self.threats.remove(object_id)
+            self.routes.remove(object_id)
+
+    def read_next_turn_data(self):
+        """
+        It's our turn! Read what the game has sent us and update the game info.
+        Turns we were too busy to get to before their time ran out are skipped on purpose, as long as a newer one is
+        already waiting: their changes are applied, but only the newer turn gets a response, since a late answer to an
+        old turn would only make us late for the new one too. At most MAX_SKIPPED_TURNS turns in a row are skipped like
+        that. If the game ended right after a turn, that turn still gets its response and the next call returns False.
+        :returns True if the game continues, False if the end game signal is received and the bot should be terminated
+        """
+        if self._game_over:
+            return self._end_game()
+
+        message = comms.read_message()
+        skipped = 0
+        while True:
+            if message == comms.END_SIGNAL:
+                return self._end_game()
+            self.current_turn_message = message
+            # The turn's time budget started when it arrived, not when we got around to it
+            self.turn_started = comms.last_arrival()
+            self.apply_turn_message(message)
+
+            if skipped >= MAX_SKIPPED_TURNS or not self.turn_deadline().expired():
+                return True
+            waiting = comms.read_waiting_messages(1)
+            if not waiting:
+                return True
+            if waiting[0] == comms.END_SIGNAL:
+                # Answer this turn anyway, the game is over after it
+                self._game_over = True
+                return True
+            message = waiting[0]
+            skipped += 1
+
+    def _end_game(self) -> bool:
+        """
+        Stops everything that runs in the background once the game is over.
+        :return: False, for `read_next_turn_data` to return.
+        """
+        self.scheduler.shutdown()
+        if self.workers is not None:
+            self.workers.close()
+        if telemetry.level >= telemetry.TURNS:
+            telemetry.record({
+                "match": {
+                    "turns": self.turn, "background_waits": self.scheduler.background_waits, **self.actions.summary(),
+                },
+            })
+        return False
+
+    def apply_turn_message(self, turn_message: dict):
+        """
+        Applies one turn's deleted and updated objects to everything we keep track of.
+        """
+        # A background stage from an earlier turn may still be reading all of this
+        self.scheduler.wait_for_background()
+        self.turn += 1
+
+        # Delete the objects that have been deleted
+        # NOTE: You might want to do some additional logic here. For example check if a powerup you were moving towards
+        # is already deleted, etc.
+        deleted_objects = turn_message["message"]["deleted_objects"]
+        self.untrack_objects(deleted_objects)
+
+        # Update your records of the new and updated objects in the game
+        # NOTE: you might want to do some additional logic here. For example check if a new bullet has been shot or a
+        # new powerup is now spawned, etc.
+        updated_objects = turn_message["message"]["updated_objects"]
+        self.store.apply(deleted_objects, updated_objects)
+        self.track_objects(updated_objects)
+        self.history.record(self.turn, deleted_objects, updated_objects)
+    
+    def precompute(self, deadline: Deadline):
+        """
+        Builds more of the per-map structures that are too slow to build in one go (the cover map), until the deadline.
+        Once they're complete they're saved to the map cache, so the next match on this map starts with them.
+        """
+        if not self.cover.build(deadline) or self._map_cached:
+            return
+        self._map_cached = True
+        arrays = self.cover.export()
+        if arrays is not None:
+            from . import map_cache
+            map_cache.save(self.map_key, arrays)
+
+    def in_boundary(self, x, y):
+        """
+        Whether (x, y) is inside the closing boundary. Until the server has sent one, everywhere is.
+        """
+        return self.boundary.contains(x, y)
+
+    def nearest_powerup(self, x, y):
+        """
+        Finds the closest powerup to (x, y) that's inside the closing boundary, from the spatial index, so only the
+        cells around (x, y) are looked at instead of every object.
+        :return: (object_id, (x, y), distance) of the powerup or None if there isn't one.
+        """
+        return self.index.nearest(POWERUP, x, y, self.in_boundary)
+
+    def turn_deadline(self) -> Deadline:
+        """
+        :return: When the response to the current turn has to be sent by, counted from when its message arrived.
+        """
+        return self.scheduler.deadline(turn_time(self.current_turn_message), self.turn_started)
+
+    def post_response(self, response: dict):
+        """
+        Sends the response for this turn to the game server, and records the turn if telemetry is on.
+        A path is only sent if it's different enough from the one we're on, see `ActionOutput`.
+        """
+        my_tank = self.store.tanks[self.tank_id]
+        response = self.actions.prepare(response, my_tank.x, my_tank.y)
+        comms.post_message(response)
+
+        if telemetry.level >= telemetry.TURNS:
+            telemetry.record({
+                "turn": self.turn,
+                "latency": time.perf_counter() - self.turn_started,
+                "stages": self.scheduler.stage_times,
+                "objects": {
+                    "bullets": len(self.store.bullets),
+                    "powerups": len(self.store.powerups),
+                    "destructible_walls": len(self.store.destructible_walls),
+                },
+                "action": response,
+                "repath": self.actions.last_reason,
+            })
+
+    def respond_to_turn(self):
+        """
+        This is where each bot writes its code to process the data and respond to the game, ending with
+        `post_response`.
+        """
+        raise NotImplementedError
+
+
+def run(game_class: type):
+    """
+    Plays a whole game with the given BaseGame subclass, from the first message to the end signal.
+    """
+    # Parse incoming messages on a background thread while we're busy responding to the last one
+    comms.start_background_reader()
+    # Import the slow to import engines while we wait for the game server's first messages
+    threading.Thread(target=_preload, name="preload", daemon=True).start()
+
+    # Off unless turned on with the CODEQUEST_TELEMETRY / CODEQUEST_PROFILE environment variables
+    telemetry.configure_from_environment()
+    telemetry.profile_methods(game_class)
+
+    game = game_class()
+    while game.read_next_turn_data():
+        game.respond_to_turn()
+
+    telemetry.close()
+
+
+def _preload():
+    for name in PRELOADED_MODULES:
+        importlib.import_module(f"{__package__}.{name}")
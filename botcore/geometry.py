@@ -0,0 +1,145 @@
+"""
+Plane geometry in the game's coordinates: distances, bearings, segment / rectangle intersection and point in polygon.
+Every function comes in two forms: a scalar one for a single pair of points, and a batched one (plural name) that takes
+NumPy arrays of points, rectangles or segments and works on all of them at once, for all N x M combinations where that
+makes sense. Both forms give the same answers. The batched forms import NumPy when first called, so bots that only
+need the scalar forms don't pay for it at start up.
+"""
+import math
+import typing
+
+
+Point = typing.Sequence[float]
+
+
+def distance(x1: float, y1: float, x2: float, y2: float) -> float:
+    return math.hypot(x2 - x1, y2 - y1)
+
+
+def distances(first, second):
+    """
+    :param first: (N, 2) points.
+    :param second: (M, 2) points.
+    :return: (N, M) distance from every point of `first` to every point of `second`.
+    """
+    import numpy as np
+
+    first = np.asarray(first, dtype=float).reshape(-1, 2)
+    second = np.asarray(second, dtype=float).reshape(-1, 2)
+    return np.hypot(second[None, :, 0] - first[:, None, 0], second[None, :, 1] - first[:, None, 1])
+
+
+def angle(x1: float, y1: float, x2: float, y2: float) -> float:
+    """
+    :return: The direction from (x1, y1) to (x2, y2) in degrees, the way the game server measures shooting angles.
+    """
+    return math.degrees(math.atan2(y2 - y1, x2 - x1))
+
+
+def angles(first, second):
+    """
+    :param first: (N, 2) points.
+    :param second: (M, 2) points.
+    :return: (N, M) direction from every point of `first` to every point of `second`, in degrees like `angle`.
+    """
+    import numpy as np
+
+    first = np.asarray(first, dtype=float).reshape(-1, 2)
+    second = np.asarray(second, dtype=float).reshape(-1, 2)
+    return np.degrees(np.arctan2(second[None, :, 1] - first[:, None, 1], second[None, :, 0] - first[:, None, 0]))
+
+
+def segment_intersects_rect(x1: float, y1: float, x2: float, y2: float,
+                            x_min: float, y_min: float, x_max: float, y_max: float) -> bool:
+    """
+    :return: Whether the segment from (x1, y1) to (x2, y2) touches the axis aligned rectangle, edges included.
+    """
+    # Clip the segment's parameter range [0, 1] against the rectangle's x and y slabs in turn (Liang-Barsky)
+    t_enter, t_exit = 0.0, 1.0
+    for start, delta, low, high in ((x1, x2 - x1, x_min, x_max), (y1, y2 - y1, y_min, y_max)):
+        if delta == 0:
+            if start < low or start > high:
+                return False
+            continue
+        t_low = (low - start) / delta
+        t_high = (high - start) / delta
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+        t_enter = max(t_enter, t_low)
+        t_exit = min(t_exit, t_high)
+        if t_enter > t_exit:
+            return False
+    return True
+
+
+def segments_intersect_rects(starts, ends, rects):
+    """
+    :param starts: (N, 2) first ends of the segments.
+    :param ends: (N, 2) other ends of the segments.
+    :param rects: (M, 4) rectangles as x_min, y_min, x_max, y_max.
+    :return: (N, M) whether every segment touches every rectangle, like `segment_intersects_rect`.
+    """
+    import numpy as np
+
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+
+    t_enter = np.zeros((len(starts), len(rects)))
+    t_exit = np.ones((len(starts), len(rects)))
+    for axis in (0, 1):
+        start = starts[:, axis, None]
+        delta = (ends[:, axis] - starts[:, axis])[:, None]
+        low = rects[None, :, axis]
+        high = rects[None, :, axis + 2]
+        flat = delta == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_low = (low - start) / delta
+            t_high = (high - start) / delta
+        near = np.minimum(t_low, t_high)
+        far = np.maximum(t_low, t_high)
+        # A segment parallel to the slab is either in it the whole way or never
+        inside = (start >= low) & (start <= high)
+        near = np.where(flat, np.where(inside, -np.inf, np.inf), near)
+        far = np.where(flat, np.where(inside, np.inf, -np.inf), far)
+        t_enter = np.maximum(t_enter, near)
+        t_exit = np.minimum(t_exit, far)
+    return t_enter <= t_exit
+
+
+def point_in_polygon(x: float, y: float, polygon: typing.Sequence[Point]) -> bool:
+    """
+    :param polygon: Corners in order, either way round. It doesn't have to be convex.
+    :return: Whether (x, y) is inside the polygon, by the even-odd rule. Points exactly on an edge may go either way.
+    """
+    inside = False
+    previous_x, previous_y = polygon[-1]
+    for corner_x, corner_y in polygon:
+        # Count the edges a ray from the point towards +x crosses
+        if (corner_y > y) != (previous_y > y):
+            crossing_x = corner_x + (y - corner_y) * (previous_x - corner_x) / (previous_y - corner_y)
+            if x < crossing_x:
+                inside = not inside
+        previous_x, previous_y = corner_x, corner_y
+    return inside
+
+
+def points_in_polygon(points, polygon: typing.Sequence[Point]):
+    """
+    :param points: Points of any shape (..., 2).
+    :param polygon: Corners in order, like `point_in_polygon`.
+    :return: Whether each point is inside the polygon, in the shape of `points` without the last axis.
+    """
+    import numpy as np
+
+    points = np.asarray(points, dtype=float)
+    x, y = points[..., 0], points[..., 1]
+    inside = np.zeros(points.shape[:-1], dtype=bool)
+    previous_x, previous_y = polygon[-1]
+    # Polygons here have a handful of corners, so it's one vectorised pass over all the points per edge
+    for corner_x, corner_y in polygon:
+        if corner_y != previous_y:
+            crossing_x = corner_x + (y - corner_y) * (previous_x - corner_x) / (previous_y - corner_y)
+            inside ^= ((corner_y > y) != (previous_y > y)) & (x < crossing_x)
+        previous_x, previous_y = corner_x, corner_y
+    return inside
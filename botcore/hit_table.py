@@ -0,0 +1,109 @@
+"""
+How likely a shot at the enemy is to hit, looked up in a table instead of worked out, so deciding whether to shoot
+costs next to nothing.
+
+The table has one cell per combination of:
+- distance to the enemy, in DISTANCE_BIN wide bins,
+- relative bearing: the angle between the enemy's heading and the line from us to it, 0 when it's running straight
+  away, 90 when it's crossing, 180 when it's coming at us, in BEARING_BIN degree bins,
+- the enemy's speed, in SPEED_BIN wide bins.
+Each cell holds the share of shots fired in that situation that hit, as a byte. The table is built offline by
+tools/build_hit_table.py from recorded and simulated matches (shots fired at the lead angle with a clear line of
+sight), which writes it to hit_table_data.py. Rebuild it whenever the aim or the game's rules change.
+"""
+import math
+import typing
+
+from .constants import TANK_SPEED
+
+
+DISTANCE_BIN = 50.0
+DISTANCE_BINS = 40
+
+BEARING_BIN = 15.0
+BEARING_BINS = 12
+
+SPEED_BIN = TANK_SPEED / 4
+SPEED_BINS = 4
+
+LAYOUT = (DISTANCE_BIN, DISTANCE_BINS, BEARING_BIN, BEARING_BINS, SPEED_BIN, SPEED_BINS)
+CELLS = DISTANCE_BINS * BEARING_BINS * SPEED_BINS
+
+# Shoot when the chance of hitting is at least this, a miss costs the time until we can fire again
+DEFAULT_THRESHOLD = 0.3
+
+# Without a table, shoot at anything this close
+FALLBACK_RANGE = 500.0
+
+
+def cell(distance: float, bearing: float, speed: float) -> int:
+    """
+    :param bearing: Relative bearing in degrees, 0 to 180.
+    :return: Index of the table cell for the situation. Anything past the last bin counts as the last bin.
+    """
+    distance_bin = min(int(distance / DISTANCE_BIN), DISTANCE_BINS - 1)
+    bearing_bin = min(int(bearing / BEARING_BIN), BEARING_BINS - 1)
+    speed_bin = min(int(speed / SPEED_BIN), SPEED_BINS - 1)
+    return (distance_bin * BEARING_BINS + bearing_bin) * SPEED_BINS + speed_bin
+
+
+def situation(x: float, y: float, enemy_x: float, enemy_y: float, enemy_vx: float,
+              enemy_vy: float) -> typing.Tuple[float, float, float]:
+    """
+    :return: (distance, relative bearing in degrees, speed) of the enemy as seen from (x, y).
+    """
+    dx, dy = enemy_x - x, enemy_y - y
+    distance = math.hypot(dx, dy)
+    speed = math.hypot(enemy_vx, enemy_vy)
+    if distance == 0 or speed == 0:
+        return distance, 0.0, speed
+    cosine = (dx * enemy_vx + dy * enemy_vy) / (distance * speed)
+    return distance, math.degrees(math.acos(max(-1.0, min(1.0, cosine)))), speed
+
+
+class HitTable:
+    """
+    The hit probability table, see the module's docstring. Lookups are a few arithmetic operations and one index.
+    """
+    def __init__(self, probabilities: typing.Optional[bytes] = None):
+        """
+        :param probabilities: CELLS bytes as written by tools/build_hit_table.py, or None for no table.
+        """
+        if probabilities is not None and len(probabilities) != CELLS:
+            raise ValueError(f"expected {CELLS} cells, got {len(probabilities)}")
+        self._probabilities = probabilities
+
+    @classmethod
+    def load(cls) -> "HitTable":
+        """
+        :return: The table in hit_table_data.py, or an empty one if it was built with different bins.
+        """
+        from . import hit_table_data
+
+        if tuple(hit_table_data.LAYOUT) != LAYOUT:
+            return cls()
+        return cls(hit_table_data.PROBABILITIES)
+
+    @property
+    def available(self) -> bool:
+        return self._probabilities is not None
+
+    def probability(self, x: float, y: float, enemy_x: float, enemy_y: float, enemy_vx: float,
+                    enemy_vy: float) -> typing.Optional[float]:
+        """
+        :return: Chance that a shot from (x, y) at the enemy's lead angle hits, or None without a table.
+        """
+        if self._probabilities is None:
+            return None
+        return self._probabilities[cell(*situation(x, y, enemy_x, enemy_y, enemy_vx, enemy_vy))] / 255
+
+    def should_shoot(self, x: float, y: float, enemy_x: float, enemy_y: float, enemy_vx: float, enemy_vy: float,
+                     threshold: float = DEFAULT_THRESHOLD) -> bool:
+        """
+        Whether a shot is likely enough to hit to be worth it. Doesn't check the line of sight, the table assumes it's
+        clear.
+        """
+        probability = self.probability(x, y, enemy_x, enemy_y, enemy_vx, enemy_vy)
+        if probability is None:
+            return math.hypot(enemy_x - x, enemy_y - y) < FALLBACK_RANGE
+        return probability >= threshold
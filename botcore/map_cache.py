@@ -0,0 +1,141 @@
+"""
+On-disk cache of the things worked out per map, so a map that comes up again doesn't have to be worked out again.
+
+A map is identified by its fingerprint: a hash of its size and every wall's position, plus whatever settings the cached
+structures depend on. Each map's structures are a set of named NumPy arrays stored in one file named after the
+fingerprint: a small header saying where each array is, followed by the raw arrays. Loading maps the file into memory
+copy-on-write instead of reading it, so a hit costs next to nothing and the arrays can still be changed in memory as
+the match goes on (the file never is).
+
+Files are looked for in, in order:
+- CODEQUEST_MAP_CACHE: a writable directory, set it to "off" to turn the cache off.
+- map_cache/ next to botcore/: files baked into the bot's image, see the README.
+- codequest-map-cache/ in the system's temporary directory.
+New files are written to the first of these that can be written to.
+"""
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import typing
+
+import numpy as np
+
+
+ENVIRONMENT_VARIABLE = "CODEQUEST_MAP_CACHE"
+BAKED_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "map_cache")
+TEMPORARY_DIRECTORY = os.path.join(tempfile.gettempdir(), "codequest-map-cache")
+
+# Start of every cache file, followed by the length of the JSON header
+MAGIC = b"CQMAP1\n"
+_HEADER_LENGTH = struct.Struct("<I")
+
+# Arrays start on multiples of this many bytes
+ALIGNMENT = 64
+
+SUFFIX = ".map"
+
+
+def fingerprint(width: float, height: float, walls: typing.Iterable[typing.Sequence[float]],
+                destructible_walls: typing.Iterable[typing.Sequence[float]], *settings) -> str:
+    """
+    :param walls, destructible_walls: Positions of the walls, in any order.
+    :param settings: Anything else the cached structures depend on, like grid sizes. Anything with a stable repr.
+    :return: A hex string that's the same for the same map and settings and different otherwise.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((float(width), float(height), settings)).encode())
+    for positions in (walls, destructible_walls):
+        points = np.array(sorted((float(x), float(y)) for x, y in positions), dtype="<f8")
+        digest.update(struct.pack("<Q", len(points)))
+        digest.update(points.tobytes())
+    return digest.hexdigest()
+
+
+def directories() -> typing.List[str]:
+    """
+    :return: Where cache files are looked for, in order. Empty if the cache is off.
+    """
+    configured = os.environ.get(ENVIRONMENT_VARIABLE, "")
+    if configured.lower() == "off":
+        return []
+    found = [configured] if configured else []
+    return found + [BAKED_DIRECTORY, TEMPORARY_DIRECTORY]
+
+
+def load(key: str) -> typing.Optional[typing.Dict[str, np.ndarray]]:
+    """
+    :return: {name: array} as saved for the given fingerprint, or None if there's no usable file for it.
+    """
+    for directory in directories():
+        path = os.path.join(directory, key + SUFFIX)
+        if not os.path.exists(path):
+            continue
+        try:
+            return _read(path)
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            print(f"Ignoring map cache file {path}: {error}", file=sys.stderr)
+    return None
+
+
+def save(key: str, arrays: typing.Dict[str, np.ndarray]) -> typing.Optional[str]:
+    """
+    Writes the arrays for the given fingerprint to the first cache directory that can be written to. The file is
+    written under a temporary name and renamed, so a bot reading it at the same time never sees half of it.
+    :return: The path written, or None if no directory could be written to.
+    """
+    header = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        header[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode()
+    # Array offsets count from the first aligned byte after the header
+    start = -(-(len(MAGIC) + _HEADER_LENGTH.size + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    for directory in directories():
+        path = os.path.join(directory, key + SUFFIX)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(temporary, "wb") as output:
+                output.write(MAGIC + _HEADER_LENGTH.pack(len(header_bytes)) + header_bytes)
+                for name, array in arrays.items():
+                    output.seek(start + header[name]["offset"])
+                    output.write(np.ascontiguousarray(array).tobytes())
+            os.replace(temporary, path)
+            return path
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+    return None
+
+
+def _read(path: str) -> typing.Dict[str, np.ndarray]:
+    with open(path, "rb") as cache_file:
+        prefix = cache_file.read(len(MAGIC) + _HEADER_LENGTH.size)
+        if prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a map cache file")
+        (header_length,) = _HEADER_LENGTH.unpack(prefix[len(MAGIC):])
+        header = json.loads(cache_file.read(header_length))
+
+    start = -(-(len(MAGIC) + _HEADER_LENGTH.size + header_length) // ALIGNMENT) * ALIGNMENT
+    size = os.path.getsize(path)
+    arrays = {}
+    for name, entry in header.items():
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        offset = start + entry["offset"]
+        if offset + dtype.itemsize * int(np.prod(shape)) > size:
+            raise ValueError(f"{name} runs past the end of the file")
+        if 0 in shape:
+            # Zero length arrays can't be memory mapped
+            arrays[name] = np.zeros(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape)
+    return arrays
@@ -0,0 +1,156 @@
+import collections
+import concurrent.futures
+import sys
+import time
+import traceback
+import typing
+
+
+# Used when a message doesn't say how long we have to respond
+DEFAULT_TURN_TIME = 0.1
+
+# Part of the turn kept back for writing the response and for the server to receive it
+SAFETY_MARGIN = 0.2
+
+
+class Deadline:
+    """
+    The point in time (on the perf_counter clock) the current turn's response has to be sent by.
+    Long running stages should check `expired()` now and then and return what they have so far.
+    """
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float, start: typing.Optional[float] = None) -> "Deadline":
+        if start is None:
+            start = time.perf_counter()
+        return cls(start + seconds)
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.perf_counter(), 0.0)
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.expires_at
+
+
+class Stage(typing.NamedTuple):
+    """
+    One step of planning a turn.
+    `run` is called with the turn's Deadline and returns the parts of the response it decided on (or None).
+    Stages with `background` set run on the worker thread, so the turn doesn't have to wait for them if they're slow.
+    A stage that lists the response fields it `decides` is skipped once higher priority stages have decided all of them.
+    """
+    name: str
+    run: typing.Callable[[Deadline], typing.Optional[dict]]
+    background: bool = False
+    decides: typing.Tuple[str, ...] = ()
+
+
+def turn_time(message: typing.Union[str, dict]) -> float:
+    """
+    :return: How many seconds we have to respond to the given message.
+    """
+    if not isinstance(message, dict):
+        return DEFAULT_TURN_TIME
+    try:
+        return float(message.get("time", DEFAULT_TURN_TIME))
+    except (TypeError, ValueError):
+        return DEFAULT_TURN_TIME
+
+
+class TurnScheduler:
+    """
+    Runs the planning stages of a turn in priority order and always has a response ready by the deadline.
+    A stage's answer for a field (like "path" or "shoot") wins over any lower priority stage's answer for it.
+    Whatever hasn't been decided when time runs out comes from the fallback action.
+    A background stage that is still running when the deadline hits is left to finish on its own, but its result is
+    dropped, and no more background stages are started until it's done. It's still reading the game state while it
+    runs, so the next turn has to call `wait_for_background` before changing any of it.
+    A stage that raises is logged to stderr and skipped, so one bug doesn't cost us the whole turn.
+    """
+    def __init__(self, safety_margin: float = SAFETY_MARGIN):
+        self.safety_margin = safety_margin
+
+        self._worker = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="planner")
+        self._pending = None
+
+        # How many times each stage was skipped or cut off by the deadline, or raised
+        self.missed_stages = collections.Counter()
+        self.failed_stages = collections.Counter()
+
+        # {stage name: seconds it took} for the stages that ran in the last turn
+        self.stage_times = {}
+
+        # How many times a turn had to wait for an earlier turn's background stage, and for how long in total
+        self.background_waits = 0
+        self.background_wait_time = 0.0
+
+    def deadline(self, budget: float, start: typing.Optional[float] = None) -> Deadline:
+        """
+        :param budget: Seconds we have to respond, as given by the game server.
+        :param start: perf_counter time the message was received, defaults to now.
+        """
+        return Deadline.after(budget * (1 - self.safety_margin), start)
+
+    def run(self, stages: typing.Sequence[Stage], deadline: Deadline,
+            fallback: typing.Optional[dict] = None) -> dict:
+        """
+        Runs the stages, highest priority first, until they're all done or the deadline is reached.
+        :return: The response to send.
+        """
+        action = dict(fallback or {})
+        decided = set()
+        self.stage_times = {}
+
+        def merge(update):
+            for key, value in (update or {}).items():
+                if key not in decided:
+                    action[key] = value
+                    decided.add(key)
+
+        for index, stage in enumerate(stages):
+            if deadline.expired():
+                self.missed_stages.update(remaining.name for remaining in stages[index:])
+                break
+
+            if stage.decides and decided.issuperset(stage.decides):
+                continue
+
+            started = time.perf_counter()
+            try:
+                if not stage.background:
+                    merge(stage.run(deadline))
+                    continue
+
+                if self._pending is not None and not self._pending.done():
+                    # Still busy with a stage from an earlier turn
+                    self.missed_stages[stage.name] += 1
+                    continue
+
+                self._pending = self._worker.submit(stage.run, deadline)
+                merge(self._pending.result(timeout=deadline.remaining()))
+            except concurrent.futures.TimeoutError:
+                self.missed_stages[stage.name] += 1
+            except Exception:
+                self.failed_stages[stage.name] += 1
+                traceback.print_exc(file=sys.stderr)
+            finally:
+                self.stage_times[stage.name] = time.perf_counter() - started
+
+        return action
+
+    def wait_for_background(self):
+        """
+        Blocks until the background stage left running by an earlier turn, if any, is done. Its result is dropped.
+        """
+        pending = self._pending
+        if pending is None or pending.done():
+            return
+        started = time.perf_counter()
+        concurrent.futures.wait([pending])
+        self.background_waits += 1
+        self.background_wait_time += time.perf_counter() - started
+
+    def shutdown(self):
+        self._worker.shutdown(wait=False)
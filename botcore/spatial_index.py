@@ -0,0 +1,188 @@
+import math
+import typing
+
+
+# Size (in map units) of a single grid cell. Walls are roughly 18 units wide, so a few walls end up in each cell.
+DEFAULT_CELL_SIZE = 50.0
+
+# Below this many objects of a type it's cheaper to just check all of them than to walk the grid rings.
+BRUTE_FORCE_LIMIT = 16
+
+
+class SpatialIndex:
+    """
+    A uniform grid over the map that buckets point objects (walls, powerups, bullets, ...) by the cell they are in.
+    Nearest and range lookups only look at the cells around the query point instead of every object in the game.
+    The index is keyed by object id, so it can be kept up to date straight from the deleted/updated objects of a turn.
+    """
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+
+        # {object_type: {(cell_x, cell_y): {object_id: (x, y)}}}
+        self._cells = {}
+        # {object_type: {object_id: (x, y)}}
+        self._points = {}
+        # {object_type: [min_cell_x, min_cell_y, max_cell_x, max_cell_y]}, only ever grows
+        self._bounds = {}
+        # {object_id: (object_type, cell)}
+        self._locations = {}
+
+    def __len__(self):
+        return len(self._locations)
+
+    def __contains__(self, object_id):
+        return object_id in self._locations
+
+    def _cell_of(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def count(self, object_type: int) -> int:
+        return len(self._points.get(object_type, ()))
+
+    def points(self, object_type: int) -> typing.Dict[str, typing.Tuple[float, float]]:
+        """
+        :return: All indexed objects of the given type as {object_id: (x, y)}. Do not modify the returned dict.
+        """
+        return self._points.get(object_type, {})
+
+    def insert(self, object_id: str, object_type: int, x: float, y: float):
+        """
+        Adds an object to the index, or moves it if it is already there.
+        """
+        if object_id in self._locations:
+            self.remove(object_id)
+
+        cell = self._cell_of(x, y)
+        self._cells.setdefault(object_type, {}).setdefault(cell, {})[object_id] = (x, y)
+        self._points.setdefault(object_type, {})[object_id] = (x, y)
+        self._locations[object_id] = (object_type, cell)
+
+        bounds = self._bounds.get(object_type)
+        if bounds is None:
+            self._bounds[object_type] = [cell[0], cell[1], cell[0], cell[1]]
+        else:
+            bounds[0] = min(bounds[0], cell[0])
+            bounds[1] = min(bounds[1], cell[1])
+            bounds[2] = max(bounds[2], cell[0])
+            bounds[3] = max(bounds[3], cell[1])
+
+    def remove(self, object_id: str):
+        """
+        Removes an object from the index. Unknown ids are ignored.
+        """
+        location = self._locations.pop(object_id, None)
+        if location is None:
+            return
+
+        object_type, cell = location
+        bucket = self._cells[object_type][cell]
+        del bucket[object_id]
+        if not bucket:
+            del self._cells[object_type][cell]
+        del self._points[object_type][object_id]
+
+    def nearest(self, object_type: int, x: float, y: float,
+                predicate: typing.Optional[typing.Callable[[float, float], bool]] = None):
+        """
+        Finds the closest object of the given type to (x, y).
+        :param predicate: Optional filter called as predicate(x, y). Objects it rejects are skipped.
+        :return: (object_id, (x, y), distance) of the closest object or None if there isn't one.
+        """
+        points = self._points.get(object_type)
+        if not points:
+            return None
+
+        best_id, best_position, best_distance_sq = None, None, math.inf
+
+        def consider(candidates):
+            nonlocal best_id, best_position, best_distance_sq
+            for object_id, position in candidates.items():
+                distance_sq = (position[0] - x) ** 2 + (position[1] - y) ** 2
+                if distance_sq < best_distance_sq and (predicate is None or predicate(position[0], position[1])):
+                    best_id, best_position, best_distance_sq = object_id, position, distance_sq
+
+        if len(points) <= BRUTE_FORCE_LIMIT:
+            consider(points)
+        else:
+            cells = self._cells[object_type]
+            center_x, center_y = self._cell_of(x, y)
+            min_x, min_y, max_x, max_y = self._bounds[object_type]
+            last_ring = max(center_x - min_x, max_x - center_x, center_y - min_y, max_y - center_y, 0)
+
+            for ring in range(last_ring + 1):
+                # Everything in this ring (and further out) is at least (ring - 1) cells away
+                if ring > 0 and best_distance_sq <= ((ring - 1) * self.cell_size) ** 2:
+                    break
+                for cell in _ring_cells(center_x, center_y, ring):
+                    bucket = cells.get(cell)
+                    if bucket:
+                        consider(bucket)
+
+        if best_id is None:
+            return None
+        return best_id, best_position, math.sqrt(best_distance_sq)
+
+    def query_range(self, object_type: int, x: float, y: float,
+                    radius: float) -> typing.List[typing.Tuple[str, typing.Tuple[float, float]]]:
+        """
+        Finds every object of the given type within `radius` of (x, y).
+        :return: A list of (object_id, (x, y)), in no particular order.
+        """
+        cells = self._cells.get(object_type)
+        if not cells:
+            return []
+
+        radius_sq = radius * radius
+        min_cell_x, min_cell_y = self._cell_of(x - radius, y - radius)
+        max_cell_x, max_cell_y = self._cell_of(x + radius, y + radius)
+
+        found = []
+        for cell_x in range(min_cell_x, max_cell_x + 1):
+            for cell_y in range(min_cell_y, max_cell_y + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if not bucket:
+                    continue
+                for object_id, position in bucket.items():
+                    if (position[0] - x) ** 2 + (position[1] - y) ** 2 <= radius_sq:
+                        found.append((object_id, position))
+        return found
+
+    def query_rect(self, object_type: int, x_min: float, y_min: float,
+                   x_max: float, y_max: float) -> typing.List[typing.Tuple[str, typing.Tuple[float, float]]]:
+        """
+        Finds every object of the given type inside the axis aligned rectangle (edges included).
+        :return: A list of (object_id, (x, y)), in no particular order.
+        """
+        cells = self._cells.get(object_type)
+        if not cells:
+            return []
+
+        min_cell_x, min_cell_y = self._cell_of(x_min, y_min)
+        max_cell_x, max_cell_y = self._cell_of(x_max, y_max)
+
+        found = []
+        for cell_x in range(min_cell_x, max_cell_x + 1):
+            for cell_y in range(min_cell_y, max_cell_y + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if not bucket:
+                    continue
+                for object_id, position in bucket.items():
+                    if x_min <= position[0] <= x_max and y_min <= position[1] <= y_max:
+                        found.append((object_id, position))
+        return found
+
+
+def _ring_cells(center_x, center_y, ring):
+    """
+    Yields the cells at exactly `ring` cells (Chebyshev distance) from the center cell.
+    """
+    if ring == 0:
+        yield center_x, center_y
+        return
+
+    for dx in range(-ring, ring + 1):
+        yield center_x + dx, center_y - ring
+        yield center_x + dx, center_y + ring
+    for dy in range(-ring + 1, ring):
+        yield center_x - ring, center_y + dy
+        yield center_x + ring, center_y + dy
@@ -0,0 +1,199 @@
+import json
+import queue
+import sys
+import threading
+import time
+import typing
+
+
+END_SIGNAL = "END"
+END_INIT_SIGNAL = "END_INIT"
+
+
+class Codec(typing.NamedTuple):
+    """
+    A way of turning JSON bytes into Python objects and back.
+    """
+    name: str
+    loads: typing.Callable[[bytes], typing.Any]
+    dumps: typing.Callable[[typing.Any], bytes]
+
+
+def _json_codec() -> Codec:
+    return Codec("json", json.loads, lambda message: json.dumps(message).encode())
+
+
+def _ujson_codec() -> Codec:
+    import ujson
+    return Codec("ujson", ujson.loads, lambda message: ujson.dumps(message).encode())
+
+
+def _orjson_codec() -> Codec:
+    import orjson
+    return Codec("orjson", orjson.loads, orjson.dumps)
+
+
+# Fastest first. Each factory raises ImportError if its library isn't installed.
+CODEC_FACTORIES = {
+    "orjson": _orjson_codec,
+    "ujson": _ujson_codec,
+    "json": _json_codec,
+}
+
+
+def get_codec(name: typing.Optional[str] = None) -> Codec:
+    """
+    :param name: One of CODEC_FACTORIES. If None, the fastest one that is installed is used.
+    :raises ImportError: If the requested codec's library isn't installed.
+    """
+    if name is not None:
+        return CODEC_FACTORIES[name]()
+
+    for factory in CODEC_FACTORIES.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return _json_codec()
+
+
+codec = get_codec()
+
+_input = sys.stdin.buffer
+_output = sys.stdout.buffer
+_reader = None
+_last_arrival = time.perf_counter()
+
+
+def set_transport(input_stream: typing.BinaryIO, output_stream: typing.BinaryIO):
+    """
+    Reads messages from and posts responses to the given binary streams instead of stdin and stdout.
+    Used to run a bot against something other than the game server, like a recorded match.
+    Only the `readline` method of the input and the `write` and `flush` methods of the output are used.
+    """
+    global _input, _output, _reader
+    _input = input_stream
+    _output = output_stream
+    _reader = None
+
+
+def set_codec(name: typing.Optional[str] = None):
+    """
+    Switches the codec used by read_message and post_message.
+    """
+    global codec
+    codec = get_codec(name)
+
+
+def post_message(message: typing.Dict):
+    """
+    Converts the given message to a JSON and prints it for the game server.
+    :param message: Message to be printed - it should be a dict and should convert to JSON without error.
+    """
+    _output.write(codec.dumps(message) + b"\n")
+    _output.flush()
+
+
+class BackgroundReader:
+    """
+    Reads and decodes messages from the game server on a background thread and queues them up, so a message that
+    arrives while the bot is still thinking about the last one is already parsed when the bot asks for it.
+    """
+    def __init__(self, stream: typing.BinaryIO):
+        self._stream = stream
+        self._messages = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="comms-reader", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            for line in iter(self._stream.readline, b""):
+                arrived_at = time.perf_counter()
+                message = codec.loads(line)
+                self._messages.put((message, arrived_at, None))
+                if message == END_SIGNAL:
+                    # Nothing comes after the end of the game. Stop reading, so we aren't stuck in a read of stdin
+                    # while the interpreter shuts down.
+                    return
+            error = EOFError("The game server closed the connection")
+        except Exception as exception:
+            error = exception
+        self._messages.put((None, None, error))
+
+    def get(self, block: bool = True):
+        """
+        :return: (message, arrived_at) of the next message, arrived_at being the perf_counter time it was read.
+        :raises queue.Empty: If block is False and no message is waiting.
+        :raises EOFError: If the game server closed the connection. Anything that went wrong while reading or decoding
+            is raised here too.
+        """
+        if self._error is not None:
+            raise self._error
+
+        message, arrived_at, error = self._messages.get(block)
+        if error is not None:
+            self._error = error
+            raise error
+        return message, arrived_at
+
+
+def start_background_reader():
+    """
+    From now on, read messages on a background thread. Call this before the first read_message.
+    """
+    global _reader
+    if _reader is None:
+        _reader = BackgroundReader(_input)
+
+
+def read_message() -> typing.Union[str, typing.Dict[str, dict]]:
+    """
+    Reads the next message from the game server.
+    :return: The parsed message. If the message is a signal (end game or end init) then the return type will be string
+        otherwise it will be a dict.
+    :raises EOFError: If the game server closed the connection.
+    """
+    global _last_arrival
+    if _reader is not None:
+        message, _last_arrival = _reader.get()
+        return message
+
+    line = _input.readline()
+    _last_arrival = time.perf_counter()
+    if not line:
+        raise EOFError("The game server closed the connection")
+    return codec.loads(line)
+
+
+def last_arrival() -> float:
+    """
+    :return: The perf_counter time the last message returned by read_message or read_waiting_messages was received.
+        Signals read by read_waiting_messages don't count, so after a turn followed by END it's still the turn's time.
+    """
+    return _last_arrival
+
+
+def read_waiting_messages(limit: typing.Optional[int] = None) -> typing.List[typing.Union[str, typing.Dict[str, dict]]]:
+    """
+    Returns the messages that have already arrived, without waiting for new ones.
+    Always empty unless the background reader is running.
+    :param limit: Most messages to return, the rest stay queued for later reads.
+    """
+    global _last_arrival
+    messages = []
+    if _reader is None:
+        return messages
+
+    while limit is None or len(messages) < limit:
+        try:
+            message, arrived_at = _reader.get(block=False)
+            messages.append(message)
+            if not isinstance(message, str):
+                _last_arrival = arrived_at
+        except queue.Empty:
+            return messages
+        except Exception:
+            # The error is kept by the reader and raised again by the next read_message
+            return messages
+    return messages
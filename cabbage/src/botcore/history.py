@@ -0,0 +1,261 @@
+import typing
+
+import numpy as np
+
+from .object_types import ObjectTypes
+
+
+# Bits of the `flags` column
+NEW = 1
+DELETED = 2
+
+DEFAULT_MAX_TURNS = 1024
+DEFAULT_MAX_ROWS = 1 << 16
+
+# Boundaries are sent as corner lists and don't move like the rest, so they're left out
+_SKIPPED_TYPES = (ObjectTypes.BOUNDARY.value, ObjectTypes.CLOSING_BOUNDARY.value)
+_BULLET = ObjectTypes.BULLET.value
+
+
+class Rows(typing.NamedTuple):
+    """
+    A run of recorded rows, one array per column. Ids and owners are interned, see `WorldHistory.intern`.
+    """
+    turn: np.ndarray
+    id: np.ndarray
+    type: np.ndarray
+    flags: np.ndarray
+    owner: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    vx: np.ndarray
+    vy: np.ndarray
+
+    def __len__(self):
+        return len(self.turn)
+
+    def where(self, mask: np.ndarray) -> "Rows":
+        return Rows(*(column[mask] for column in self))
+
+
+class WorldHistory:
+    """
+    What changed in every recent turn, kept as columns of preallocated NumPy arrays in a ring.
+    Each turn only adds rows for the objects that were deleted or actually changed (an update that repeats the last
+    recorded values is dropped), so a long match costs no more memory than max_rows rows. When the ring is full the
+    oldest turns are overwritten. Every turn's rows are contiguous, so finding the rows of the last N turns is a couple
+    of index lookups and the rows themselves are array views that can be filtered with vectorised masks.
+    String ids are interned to ints; `intern` and `name` convert between them. Once a deleted object's rows have all
+    left the ring its int is given to the next new id, so the id tables stay as small as the objects in view.
+    """
+    def __init__(self, max_turns: int = DEFAULT_MAX_TURNS, max_rows: int = DEFAULT_MAX_ROWS):
+        self.max_turns = max_turns
+        self.max_rows = max_rows
+
+        self._turn = np.zeros(max_rows, dtype=np.int32)
+        self._id = np.zeros(max_rows, dtype=np.int32)
+        self._type = np.zeros(max_rows, dtype=np.int8)
+        self._flags = np.zeros(max_rows, dtype=np.int8)
+        self._owner = np.zeros(max_rows, dtype=np.int32)
+        self._x = np.zeros(max_rows, dtype=np.float32)
+        self._y = np.zeros(max_rows, dtype=np.float32)
+        self._vx = np.zeros(max_rows, dtype=np.float32)
+        self._vy = np.zeros(max_rows, dtype=np.float32)
+        # Rows ever written. Row number n lives at n % max_rows.
+        self._rows_written = 0
+
+        # Per recorded turn, in a ring of its own: the turn's number and the row number its rows start at
+        self._turn_numbers = np.zeros(max_turns, dtype=np.int64)
+        self._turn_starts = np.zeros(max_turns, dtype=np.int64)
+        self._turns_recorded = 0
+
+        self._ids = {}
+        self._names = []
+        self._types = []
+        # Per interned id, the number of the last row it's in (as the object or as a bullet's owner)
+        self._last_rows = []
+        # Interned ids of deleted objects, in the order they were deleted, as {interned id: None}
+        self._retired = {}
+        # Interned ids whose rows are all gone, ready for the next new id
+        self._free = []
+        # {interned id: (x, y, vx, vy)} as last recorded, to drop updates that don't change anything
+        self._last = {}
+
+    def intern(self, object_id: typing.Optional[str]) -> int:
+        """
+        :return: The int standing in for the given id in the id and owner columns. None is -1.
+        """
+        if object_id is None:
+            return -1
+        index = self._ids.get(object_id)
+        if index is None:
+            if self._free:
+                index = self._free.pop()
+                self._names[index] = object_id
+                self._types[index] = 0
+            else:
+                index = len(self._names)
+                self._names.append(object_id)
+                self._types.append(0)
+                self._last_rows.append(-1)
+            self._ids[object_id] = index
+        return index
+
+    def name(self, index: int) -> typing.Optional[str]:
+        return self._names[index] if index >= 0 else None
+
+    def _release(self):
+        """
+        Frees the interned ids of deleted objects that no longer show up in any turn that can be looked at.
+        """
+        turns = self._available_turns()
+        if turns:
+            oldest_row = self._turn_starts[(self._turns_recorded - turns) % self.max_turns]
+        else:
+            oldest_row = self._rows_written
+        while self._retired:
+            index = next(iter(self._retired))
+            if self._last_rows[index] >= oldest_row:
+                break
+            del self._retired[index]
+            del self._ids[self._names[index]]
+            self._names[index] = None
+            self._free.append(index)
+
+    def record(self, turn: int, deleted_objects: typing.Iterable[str], updated_objects: typing.Dict[str, dict]):
+        """
+        Adds one turn's deltas.
+        """
+        ids, types, flags, owners, xs, ys, vxs, vys = [], [], [], [], [], [], [], []
+        last_rows = self._last_rows
+        row = self._rows_written
+
+        for object_id in deleted_objects:
+            index = self._ids.get(object_id)
+            if index is None:
+                continue
+            last = self._last.pop(index, None)
+            if last is None:
+                last = (0.0, 0.0, 0.0, 0.0)
+            else:
+                self._retired[index] = None
+            last_rows[index] = row + len(ids)
+            ids.append(index)
+            types.append(self._types[index])
+            flags.append(DELETED)
+            owners.append(-1)
+            xs.append(last[0])
+            ys.append(last[1])
+            vxs.append(last[2])
+            vys.append(last[3])
+
+        for object_id, game_object in updated_objects.items():
+            object_type = game_object["type"]
+            if object_type in _SKIPPED_TYPES:
+                continue
+
+            index = self.intern(object_id)
+            position = game_object["position"]
+            velocity = game_object.get("velocity") or (0.0, 0.0)
+            values = (position[0], position[1], velocity[0], velocity[1])
+            last = self._last.get(index)
+            if last == values:
+                continue
+            self._last[index] = values
+            self._types[index] = object_type
+            if last is None:
+                # Back in view after being deleted
+                self._retired.pop(index, None)
+
+            owner = self.intern(game_object.get("tank_id")) if object_type == _BULLET else -1
+            if owner >= 0:
+                last_rows[owner] = row + len(ids)
+            last_rows[index] = row + len(ids)
+            ids.append(index)
+            types.append(object_type)
+            flags.append(NEW if last is None else 0)
+            owners.append(owner)
+            xs.append(values[0])
+            ys.append(values[1])
+            vxs.append(values[2])
+            vys.append(values[3])
+
+        slot = self._turns_recorded % self.max_turns
+        self._turn_numbers[slot] = turn
+        self._turn_starts[slot] = self._rows_written
+        self._turns_recorded += 1
+
+        count = len(ids)
+        if count > self.max_rows:
+            # More than fits in the whole ring, keep the end of it
+            ids, types, flags, owners, xs, ys, vxs, vys = (
+                column[-self.max_rows:] for column in (ids, types, flags, owners, xs, ys, vxs, vys)
+            )
+            self._rows_written += count - self.max_rows
+            count = self.max_rows
+
+        start = self._rows_written % self.max_rows
+        first = min(count, self.max_rows - start)
+        for array, values in (
+            (self._id, ids), (self._type, types), (self._flags, flags), (self._owner, owners),
+            (self._x, xs), (self._y, ys), (self._vx, vxs), (self._vy, vys),
+        ):
+            array[start:start + first] = values[:first]
+            if first < count:
+                array[:count - first] = values[first:]
+        self._turn[start:start + first] = turn
+        if first < count:
+            self._turn[:count - first] = turn
+        self._rows_written += count
+
+        if self._retired:
+            self._release()
+
+    def __len__(self):
+        """
+        :return: Number of turns that can still be looked at.
+        """
+        return self._available_turns()
+
+    def _available_turns(self) -> int:
+        turns = min(self._turns_recorded, self.max_turns)
+        oldest_row = self._rows_written - self.max_rows
+        # Drop turns whose rows have been (partly) overwritten
+        while turns and self._turn_starts[(self._turns_recorded - turns) % self.max_turns] < oldest_row:
+            turns -= 1
+        return turns
+
+    def last_turns(self, turns: int) -> Rows:
+        """
+        :return: The rows of the last `turns` recorded turns (or of as many as are still kept), oldest first. They are
+            views on the ring unless they wrap around its end.
+        """
+        turns = min(turns, self._available_turns())
+        if turns <= 0:
+            return self._rows(self._rows_written, self._rows_written)
+        start = int(self._turn_starts[(self._turns_recorded - turns) % self.max_turns])
+        return self._rows(start, self._rows_written)
+
+    def _rows(self, start: int, end: int) -> Rows:
+        columns = (self._turn, self._id, self._type, self._flags, self._owner, self._x, self._y, self._vx, self._vy)
+        first = start % self.max_rows
+        count = end - start
+        if first + count <= self.max_rows:
+            return Rows(*(column[first:first + count] for column in columns))
+        wrapped = first + count - self.max_rows
+        return Rows(*(np.concatenate([column[first:], column[:wrapped]]) for column in columns))
+
+    def fired_by(self, tank_id: str, turns: int) -> Rows:
+        """
+        :return: The first sighting of every bullet the given tank fired in the last `turns` turns.
+        """
+        rows = self.last_turns(turns)
+        owner = self._ids.get(tank_id, -2)
+        return rows.where((rows.type == _BULLET) & ((rows.flags & NEW) != 0) & (rows.owner == owner))
+
+    def trail(self, object_id: str, turns: int) -> Rows:
+        """
+        :return: Every recorded change of the given object in the last `turns` turns.
+        """
+        rows = self.last_turns(turns)
+        return rows.where(rows.id == self._ids.get(object_id, -2))
@@ -0,0 +1,41 @@
+"""
+Hit probability table for hit_table.py, generated by tools/build_hit_table.py. Rebuild it, don't edit it.
+"""
+import base64
+
+
+# Bins the table was built with, see hit_table.LAYOUT
+LAYOUT = (50.0, 40, 15.0, 12, 37.5, 4)
+
+# Shots the table was built from
+SHOTS = 43116
+
+# One byte per cell, the probability times 255, in the order of hit_table.cell
+PROBABILITIES = base64.b64decode(
+    "trC+y7CwsLewsLC2sLCwt7CwsJ+wsLCdsLCwm7CwsLqwsLCtsLCwurCwsKnHsL6p9+Tf5N/k5ODfud/J39/fzui538Lo37m76N/f"
+    "xd/f387fud/W39/f5t/f3/Pv39/215y718a7u8e1qpyu1Jy7oNmcnJDDu7uL2bu7l727u5ecnLunzru7ws67u9W7u7vewJyCuaGs"
+    "gqSPnG+NtJyBepqcnHK3goJqtIKcZrScnHa4gpyFyJycmJycnLSUnJzCsGaaoE1vhHKxb1NtmZpvbI1vb2SphW9Pn2+FXoRvb1hv"
+    "hYVsk4WFgJOFhZHZhYWynGxflV9RX2V5X1FblHJfUZ9fckSEcnJGn19fQFFyX0ZncnJMlHJyXXZfcntncnKSkWRTgmxkPklTR1NL"
+    "Rz5kSTdkZEB+ZGQxfmRkPF5kZDVkZGRFZGRkTlNkZFpsZGR7dzhLf1paS0lLWlpEmFpLOIlaWiqHS1pCeVpaNVhaWjlaWlo4QFpa"
+    "SVpaWkh4Wlp+cVdJdl9XV1ZWV1c+X0lJOGNXVzdJV1cUc1dXOUlXV0dXV1c1SVdXLVdXV1hXV1dyb01NbE1BQS1NTU03QUFBMU1N"
+    "QTFNTU0NQU1NFE1NTTZrQU00TU1NNUFNTUhNTU1rb1BQYFBDUDRQUFAXUFBQJFBQUC9yUFAYUENQIkNQUC5QUFArUFBQRVBQUExQ"
+    "UFB5d0xMVkxMTDdvTEwaTExMFUxMTDUvTEw2TExMI0xMTCBMTEwgTExMI0xMTEZMTExlXVw8Qzw8PCwyPDwMPDw8FDw8PC48PDwe"
+    "PDw8JTw8PCE8PDwoPDw8JTw8PD88PDxBXUVFSkVFRTZFRUU1RUVFH0VFRTFFRUUiRUVFK0VFRTFFRUUYRUVFPkVFRTVFRUVUSkpK"
+    "R0pKSkVKSkouSkpKNUpKSi5KSkoiSkpKRUpKSiVKSko1SkpKLUpKSkRKSkpkQTs7LTs7Oyo7OzseOzs7Ozs7OyE7OzsxOzs7Kjs7"
+    "Oyo7OzsqOzs7FTs7OzE7OztRSUJCO0JCQklCQkI3QkJCL0JCQi9CQkI3QkJCSUJCQh5CQkIcQkJCSUJCQiNCQkJWMzk5GDk5OSQ5"
+    "OTkkOTk5KTk5OSQ5OTkpOTk5OTk5OS85OTkkOTk5FDk5OTM5OTlOQzg4Gjg4ODg4ODgvODg4Lzg4OCM4ODgoODg4Lzg4OCM4ODgj"
+    "ODg4Hzg4ODQ4ODhDQkNDVENDQ0NDQ0M4Q0NDVENDQyVDQ0NDQ0NDKkNDQyVDQ0MwQ0NDOENDQ1FDQ0NFUzo6JDo6OjE6OjoqOjo6"
+    "MTo6OiQ6OjoqOjo6Ojo6OiA6OjogOjo6IDo6OiM6OjpHPisrTisrKysrKysrKysrGysrKx4rKysbKysrGCsrKxsrKyskKysrHisr"
+    "KyArKysrLTMzKjMzMzMzMzMzMzMzSTMzMyQzMzMkMzMzJDMzMzMzMzMkMzMzGTMzMzAzMzM4Ujc3Ljc3Nzc3Nzc3Nzc3Nzc3NyM3"
+    "Nzc3Nzc3Izc3NyM3NzcuNzc3Jzc3Nx83Nzc9KysrTysrKysrKyskKysrKysrKyQrKysrKysrGCsrKxsrKytPKysrESsrKxkrKysx"
+    "MDAwKDAwMDAwMDAoMDAwMDAwMDAwMDAoMDAwKDAwMBswMDAwMDAwMDAwMBkwMDA3HzMzMzMzMzMzMzMrMzMzKzMzMzMzMzMrMzMz"
+    "JTMzMzMzMzNVMzMzIDMzMygzMzM4LCoqKioqKioqKioqKioqKioqKh4qKioqKioqIyoqKhEqKioaKioqDyoqKioqKiouOj4+Pj4+"
+    "Pj4+Pj4+Pj4+Pj4+Pj4+Pj4iPj4+LD4+PjQ+Pj4sPj4+Jz4+Ph8+Pj5XKzExMTExMTExMTExMTExMTExMTExMTExMTExKTExMSMx"
+    "MTEjMTExETExMRcxMTE4OzMzMzMzMyozMzMzMzMzKjMzMzMzMzMzMzMzGTMzMxUzMzMSMzMzIDMzMyAzMzNAIycnJycnJycnJycn"
+    "JycnJycnJycnJycnJycnGScnJxAnJycnJycnGScnJxAnJyc3FCUlJSUlJSUlJSUlJSUlJSUlJR8lJSUfJSUlFCUlJR8lJSUMJSUl"
+    "ICUlJSAlJSUrhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWF"
+    "hYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWF"
+    "hYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWF"
+    "hYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWF"
+    "hYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWF"
+)
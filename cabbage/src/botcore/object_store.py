@@ -0,0 +1,171 @@
+import typing
+
+from .object_types import ObjectTypes
+
+
+# Plain ints, comparing against these is a lot cheaper than going through the enum for every object
+TANK = ObjectTypes.TANK.value
+BULLET = ObjectTypes.BULLET.value
+CLOSING_BOUNDARY = ObjectTypes.CLOSING_BOUNDARY.value
+
+
+class Tank:
+    """
+    Compact record of a tank. Updated in place every turn the tank shows up in `updated_objects`.
+    """
+    __slots__ = ("id", "x", "y", "vx", "vy", "hp")
+
+    def __init__(self, object_id: str):
+        self.id = object_id
+        self.x = 0.0
+        self.y = 0.0
+        self.vx = 0.0
+        self.vy = 0.0
+        self.hp = 0.0
+
+    def update(self, game_object: dict):
+        position = game_object["position"]
+        velocity = game_object.get("velocity") or (0.0, 0.0)
+        self.x = float(position[0])
+        self.y = float(position[1])
+        self.vx = float(velocity[0])
+        self.vy = float(velocity[1])
+        self.hp = float(game_object.get("hp", self.hp))
+
+    @property
+    def position(self):
+        return [self.x, self.y]
+
+    def __repr__(self):
+        return f"Tank({self.id!r}, x={self.x}, y={self.y}, vx={self.vx}, vy={self.vy}, hp={self.hp})"
+
+
+class Bullet:
+    """
+    Compact record of a bullet. Updated in place every turn the bullet shows up in `updated_objects`.
+    """
+    __slots__ = ("id", "x", "y", "vx", "vy", "tank_id", "damage")
+
+    def __init__(self, object_id: str):
+        self.id = object_id
+        self.x = 0.0
+        self.y = 0.0
+        self.vx = 0.0
+        self.vy = 0.0
+        self.tank_id = None
+        self.damage = 0.0
+
+    def update(self, game_object: dict):
+        position = game_object["position"]
+        velocity = game_object.get("velocity") or (0.0, 0.0)
+        self.x = float(position[0])
+        self.y = float(position[1])
+        self.vx = float(velocity[0])
+        self.vy = float(velocity[1])
+        self.tank_id = game_object.get("tank_id", self.tank_id)
+        self.damage = float(game_object.get("damage", self.damage))
+
+    @property
+    def position(self):
+        return [self.x, self.y]
+
+    def __repr__(self):
+        return f"Bullet({self.id!r}, x={self.x}, y={self.y}, vx={self.vx}, vy={self.vy}, tank_id={self.tank_id!r})"
+
+
+class ObjectStore:
+    """
+    Keeps every game object both in one flat dict (like the server sends them) and in a bucket per object type, so
+    code that only cares about e.g. powerups never has to filter through all the walls.
+    Available attributes:
+    - objects: all raw object-dicts like {object-id: object-dict}.
+    - tanks / bullets: {object-id: Tank} / {object-id: Bullet} records.
+    - walls / destructible_walls / boundaries / powerups: {object-id: object-dict}.
+    - closing_boundary: the closing boundary object-dict or None.
+    Each turn's deltas are applied with `apply`, which only touches the deleted and updated objects.
+    """
+    def __init__(self):
+        self.objects = {}
+
+        self.tanks = {}
+        self.bullets = {}
+        self.walls = {}
+        self.destructible_walls = {}
+        self.boundaries = {}
+        self.powerups = {}
+        self.closing_boundary = None
+        self.closing_boundary_id = None
+
+        self._buckets = {
+            ObjectTypes.WALL.value: self.walls,
+            ObjectTypes.DESTRUCTIBLE_WALL.value: self.destructible_walls,
+            ObjectTypes.BOUNDARY.value: self.boundaries,
+            ObjectTypes.POWERUP.value: self.powerups,
+        }
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __contains__(self, object_id):
+        return object_id in self.objects
+
+    def __getitem__(self, object_id):
+        return self.objects[object_id]
+
+    def bucket(self, object_type: int) -> dict:
+        """
+        :return: The bucket that holds objects of the given type.
+        """
+        if object_type == TANK:
+            return self.tanks
+        if object_type == BULLET:
+            return self.bullets
+        if object_type == CLOSING_BOUNDARY:
+            if self.closing_boundary is None:
+                return {}
+            return {self.closing_boundary_id: self.closing_boundary}
+        return self._buckets[object_type]
+
+    def apply(self, deleted_objects: typing.Iterable[str], updated_objects: typing.Dict[str, dict]):
+        """
+        Applies one message worth of deltas.
+        :param deleted_objects: Ids of the objects that no longer exist. Unknown ids are ignored.
+        :param updated_objects: New or updated objects like {object-id: object-dict}.
+        """
+        for object_id in deleted_objects:
+            self.remove(object_id)
+
+        for object_id, game_object in updated_objects.items():
+            self.put(object_id, game_object)
+
+    def put(self, object_id: str, game_object: dict):
+        self.objects[object_id] = game_object
+        object_type = game_object["type"]
+
+        if object_type == TANK:
+            tank = self.tanks.get(object_id)
+            if tank is None:
+                tank = self.tanks[object_id] = Tank(object_id)
+            tank.update(game_object)
+        elif object_type == BULLET:
+            bullet = self.bullets.get(object_id)
+            if bullet is None:
+                bullet = self.bullets[object_id] = Bullet(object_id)
+            bullet.update(game_object)
+        elif object_type == CLOSING_BOUNDARY:
+            self.closing_boundary = game_object
+            self.closing_boundary_id = object_id
+        else:
+            self._buckets[object_type][object_id] = game_object
+
+    def remove(self, object_id: str):
+        game_object = self.objects.pop(object_id, None)
+        if game_object is None:
+            return
+
+        object_type = game_object["type"]
+        if object_type == CLOSING_BOUNDARY:
+            self.closing_boundary = None
+            self.closing_boundary_id = None
+        else:
+            self.bucket(object_type).pop(object_id, None)
@@ -0,0 +1,233 @@
+import math
+import typing
+
+from .boundary import ClosingBoundary
+from .constants import TANK_SPEED, TICK_DURATION
+from .navigation import NavigationGrid
+from .scheduler import Deadline
+
+
+# What a powerup is worth, in map units we'd be willing to walk for it
+POWERUP_VALUES = {
+    "HEALTH": 1200.0,
+    "DAMAGE": 1000.0,
+    "SPEED": 800.0,
+    "BULLET_SPEED": 800.0,
+}
+DEFAULT_POWERUP_VALUE = 800.0
+
+# Share of a powerup's value that's lost when the enemy is closer to it than we are
+ENEMY_RISK = 0.5
+
+# Only this many of the best powerups on their own are considered for a tour, and a tour has at most MAX_STOPS stops
+MAX_CANDIDATES = 6
+MAX_STOPS = 3
+
+# Distance a tank covers in one turn
+TANK_SPEED_PER_TURN = TANK_SPEED * TICK_DURATION
+
+
+class Route(typing.NamedTuple):
+    # Powerup ids in the order to pick them up, empty if no powerup is worth going for
+    stops: typing.List[str]
+    points: typing.List[typing.List[float]]
+    # Value of the powerups minus the walking to get them
+    score: float
+
+
+NO_ROUTE = Route([], [], 0.0)
+
+
+class RoutePlanner:
+    """
+    Decides which powerups to go for and in what order.
+    Every powerup is valued by its type, less if the enemy is closer to it than we are, and not at all if the closing
+    boundary gets to it before we can. The best few are then put in the order that gets the most value for the least
+    walking (a small travelling salesman problem, solved exactly with Held-Karp's dynamic programming over subsets).
+    Walking distances come from the navigation grid's distance fields. Distances between powerups are cached and only
+    worked out for new powerups, and the plan itself is only redone when the powerups or the walls change or our tank
+    moves into another cell. Otherwise the last route is handed out again.
+    """
+    def __init__(self, navigation: NavigationGrid, powerup_values: typing.Optional[typing.Dict[str, float]] = None):
+        self.navigation = navigation
+        self.powerup_values = POWERUP_VALUES if powerup_values is None else powerup_values
+
+        # {powerup-id: (x, y, value)}
+        self._powerups = {}
+        # Powerups whose distance field has been built, so walking distances to them are exact
+        self._exact = set()
+        # {(powerup-id, powerup-id): walking distance}
+        self._between = {}
+
+        self._route = NO_ROUTE
+        self._dirty = True
+        self._planned_cell = None
+        self._navigation_version = navigation.version
+
+    def add(self, object_id: str, x: float, y: float, powerup_type: typing.Optional[str] = None):
+        if object_id in self._powerups:
+            return
+        self._powerups[object_id] = (x, y, self.powerup_values.get(powerup_type, DEFAULT_POWERUP_VALUE))
+        self._dirty = True
+
+    def remove(self, object_id: str):
+        """
+        Forgets a powerup that was picked up. Unknown ids are ignored.
+        """
+        if self._powerups.pop(object_id, None) is None:
+            return
+        self._exact.discard(object_id)
+        for other in self._powerups:
+            self._between.pop((object_id, other), None)
+            self._between.pop((other, object_id), None)
+        self._dirty = True
+
+    def __len__(self):
+        return len(self._powerups)
+
+    def plan(self, x: float, y: float, enemy: typing.Optional[typing.Sequence[float]] = None,
+             boundary: typing.Optional[ClosingBoundary] = None,
+             deadline: typing.Optional[Deadline] = None) -> Route:
+        """
+        :param x, y: Where our tank is.
+        :param enemy: Where the enemy tank is, if known.
+        :param deadline: Building a distance field takes a while, so once it's close only the ones that are already
+            there are used and the rest of the distances are straight lines. They get built on a later turn.
+        :return: The best route from (x, y), possibly the one planned on an earlier turn.
+        """
+        if self.navigation.version != self._navigation_version:
+            # Walls were destroyed, paths may be shorter now
+            self._navigation_version = self.navigation.version
+            self._between.clear()
+            self._dirty = True
+
+        if self._build_fields(x, y, deadline):
+            self._dirty = True
+
+        cell = self.navigation.cell_of(x, y)
+        if not self._dirty and cell == self._planned_cell:
+            return self._route
+
+        self._route = self._solve(x, y, enemy, boundary)
+        self._planned_cell = cell
+        self._dirty = False
+        return self._route
+
+    def _build_fields(self, x: float, y: float, deadline: typing.Optional[Deadline]) -> bool:
+        """
+        Builds the distance fields of as many powerups as time allows, closest first.
+        :return: Whether any powerup's distances became exact.
+        """
+        missing = sorted(
+            (math.hypot(px - x, py - y), object_id)
+            for object_id, (px, py, _) in self._powerups.items()
+            if object_id not in self._exact
+        )
+        changed = False
+        for _, object_id in missing:
+            px, py, _ = self._powerups[object_id]
+            if (deadline is not None and deadline.remaining() <= self.navigation.field_build_time
+                    and not self.navigation.has_distance_field(px, py)):
+                break
+            self.navigation.distance_field(px, py)
+            self._exact.add(object_id)
+            for other in self._powerups:
+                self._between.pop((object_id, other), None)
+                self._between.pop((other, object_id), None)
+            changed = True
+        return changed
+
+    def _distance(self, from_x: float, from_y: float, object_id: str) -> float:
+        """
+        :return: Walking distance from a point to a powerup, or the straight line distance if that's all we have.
+        """
+        px, py, _ = self._powerups[object_id]
+        if object_id in self._exact:
+            return self.navigation.path_distance(from_x, from_y, px, py)
+        return math.hypot(px - from_x, py - from_y)
+
+    def _between_powerups(self, first: str, second: str) -> float:
+        distance = self._between.get((first, second))
+        if distance is None:
+            if second not in self._exact and first in self._exact:
+                # Paths on the grid are the same both ways
+                first, second = second, first
+            fx, fy, _ = self._powerups[first]
+            distance = self._between[(first, second)] = self._between[(second, first)] = self._distance(fx, fy, second)
+        return distance
+
+    def _solve(self, x: float, y: float, enemy: typing.Optional[typing.Sequence[float]],
+               boundary: typing.Optional[ClosingBoundary]) -> Route:
+        # What each powerup is worth to us and how long the boundary leaves it up (in map units we can walk until then)
+        candidates = []
+        for object_id, (px, py, value) in self._powerups.items():
+            distance = self._distance(x, y, object_id)
+            if math.isinf(distance):
+                continue
+            reach = math.inf
+            if boundary is not None:
+                reach = boundary.turns_until_outside(px, py) * TANK_SPEED_PER_TURN
+                if reach <= distance:
+                    continue
+            if enemy is not None and self._distance(enemy[0], enemy[1], object_id) < distance:
+                value *= 1 - ENEMY_RISK
+            candidates.append((value - distance, object_id, value, distance, reach))
+
+        if not candidates:
+            return NO_ROUTE
+
+        candidates.sort(reverse=True)
+        candidates = candidates[:MAX_CANDIDATES]
+        ids = [candidate[1] for candidate in candidates]
+        values = [candidate[2] for candidate in candidates]
+        reach = [candidate[4] for candidate in candidates]
+        count = len(ids)
+
+        # Held-Karp: shortest walk that picks up the powerups in `mask` and ends at `last`, for every mask and last.
+        # {(mask, last): (distance, previous last or -1)}
+        best = {}
+        for index, candidate in enumerate(candidates):
+            best[(1 << index, index)] = (candidate[3], -1)
+
+        layer = list(best)
+        for _ in range(MAX_STOPS - 1):
+            next_layer = []
+            for mask, last in layer:
+                distance = best[(mask, last)][0]
+                for following in range(count):
+                    if mask & (1 << following):
+                        continue
+                    arrival = distance + self._between_powerups(ids[last], ids[following])
+                    # Gone by the time we get there
+                    if arrival >= reach[following]:
+                        continue
+                    key = (mask | (1 << following), following)
+                    known = best.get(key)
+                    if known is None:
+                        next_layer.append(key)
+                    if known is None or arrival < known[0]:
+                        best[key] = (arrival, last)
+            layer = next_layer
+
+        def score(key):
+            mask, _ = key
+            return sum(values[index] for index in range(count) if mask & (1 << index)) - best[key][0]
+
+        final = max(best, key=score)
+        if score(final) <= 0:
+            return NO_ROUTE
+
+        order = []
+        mask, last = final
+        while last != -1:
+            order.append(last)
+            previous = best[(mask, last)][1]
+            mask &= ~(1 << last)
+            last = previous
+        order.reverse()
+
+        return Route(
+            [ids[index] for index in order],
+            [[self._powerups[ids[index]][0], self._powerups[ids[index]][1]] for index in order],
+            score(final),
+        )
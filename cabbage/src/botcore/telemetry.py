@@ -0,0 +1,193 @@
+"""
+Structured logging for the bot, kept out of stdout (that's where the game server reads our responses from) and off the
+hot path.
+
+Records are plain dicts, buffered here and written in batches as JSON lines by a background thread. What gets recorded
+depends on the level:
+- OFF: nothing. Call sites check `telemetry.level` before building a record, so this costs a single comparison.
+- TURNS: one record per turn with stage timings, object counts and the response we sent.
+- DEBUG: everything in TURNS plus whatever the bot logs with `debug`.
+
+Profiling mode wraps a class's methods with timers and prints how long each took in total to stderr on `close`.
+
+Everything is off by default. Set it up from the environment with `configure_from_environment`:
+- CODEQUEST_TELEMETRY: off, turns or debug.
+- CODEQUEST_TELEMETRY_FILE: where records are written, telemetry.jsonl by default.
+- CODEQUEST_PROFILE: set to 1 to turn profiling mode on.
+"""
+import functools
+import os
+import queue
+import sys
+import threading
+import time
+import typing
+
+from . import comms
+
+
+OFF = 0
+TURNS = 1
+DEBUG = 2
+
+LEVELS = {
+    "off": OFF,
+    "turns": TURNS,
+    "debug": DEBUG,
+}
+
+DEFAULT_PATH = "telemetry.jsonl"
+
+# How many records are buffered before they're handed to the writer thread
+BATCH_SIZE = 64
+
+level = OFF
+profiling = False
+
+_buffer = []
+_writer = None
+# {method name: [calls, total seconds, slowest call in seconds]}
+_timings = {}
+
+
+class _Writer(threading.Thread):
+    """
+    Encodes and appends batches of records to the telemetry file, so the bot's thread only ever appends to a list.
+    """
+    def __init__(self, path: str):
+        super().__init__(name="telemetry", daemon=True)
+        self._path = path
+        self._batches = queue.SimpleQueue()
+
+    def submit(self, batch: typing.List[dict]):
+        self._batches.put(batch)
+
+    def close(self):
+        self._batches.put(None)
+        self.join()
+
+    def run(self):
+        dumps = comms.codec.dumps
+        with open(self._path, "ab") as output:
+            while True:
+                batch = self._batches.get()
+                if batch is None:
+                    return
+                output.write(b"".join(dumps(record) + b"\n" for record in batch))
+                output.flush()
+
+
+def configure(new_level: int = OFF, path: str = DEFAULT_PATH, profile: bool = False):
+    """
+    :param new_level: One of OFF, TURNS or DEBUG.
+    :param path: File the records are appended to. Only opened if the level isn't OFF.
+    :param profile: Whether `profile_methods` should actually wrap anything.
+    """
+    global level, profiling, _writer
+    close()
+
+    level = new_level
+    profiling = profile
+    if level > OFF:
+        _writer = _Writer(path)
+        _writer.start()
+
+
+def configure_from_environment():
+    configure(
+        LEVELS.get(os.environ.get("CODEQUEST_TELEMETRY", "off").lower(), OFF),
+        os.environ.get("CODEQUEST_TELEMETRY_FILE", DEFAULT_PATH),
+        os.environ.get("CODEQUEST_PROFILE", "") not in ("", "0"),
+    )
+
+
+def record(fields: dict):
+    """
+    Queues a record to be written. Check `level` before building the record, this only drops it if telemetry is off.
+    """
+    if level == OFF:
+        return
+    _buffer.append(fields)
+    if len(_buffer) >= BATCH_SIZE:
+        flush()
+
+
+def debug(message: str, **fields):
+    """
+    Records a debug message along with any fields given. Does nothing unless the level is DEBUG.
+    """
+    if level >= DEBUG:
+        fields["debug"] = message
+        record(fields)
+
+
+def flush():
+    """
+    Hands everything buffered so far to the writer thread.
+    """
+    global _buffer
+    if _buffer and _writer is not None:
+        _writer.submit(_buffer)
+    _buffer = []
+
+
+def profile_methods(cls: type) -> type:
+    """
+    Wraps every method of the class, including the ones it inherits, with a timer if profiling mode is on. Call it
+    before creating any instances. Returns the class so it can be used as a decorator.
+    """
+    if not profiling:
+        return cls
+
+    methods = {}
+    for klass in reversed(cls.__mro__[:-1]):
+        methods.update(vars(klass))
+    for name, method in methods.items():
+        if callable(method) and not isinstance(method, type):
+            setattr(cls, name, _timed(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def _timed(name: str, method: typing.Callable) -> typing.Callable:
+    timing = _timings.setdefault(name, [0, 0.0, 0.0])
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            timing[0] += 1
+            timing[1] += elapsed
+            if elapsed > timing[2]:
+                timing[2] = elapsed
+
+    return timed
+
+
+def summary() -> str:
+    """
+    :return: A table of how long each profiled method took, slowest in total first.
+    """
+    lines = [f"{'method':<40} {'calls':>8} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+    for name, (calls, total, slowest) in sorted(_timings.items(), key=lambda item: -item[1][1]):
+        if calls:
+            lines.append(
+                f"{name:<40} {calls:>8} {total * 1000:>10.2f} {total / calls * 1000:>9.3f} {slowest * 1000:>9.3f}"
+            )
+    return "\n".join(lines)
+
+
+def close():
+    """
+    Writes out everything still buffered and, in profiling mode, prints the summary to stderr. Call it at the end of
+    the game.
+    """
+    global _writer
+    flush()
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+    if profiling and _timings:
+        print(summary(), file=sys.stderr)
@@ -0,0 +1,279 @@
+"""
+A pool of worker processes that play search rollouts alongside the bot, so the search can use more than one core.
+
+The workers are started once, after the game has been set up, and live until the end of the match. They don't get the
+turn's problem sent to them: it sits in one `multiprocessing.shared_memory` block that the bot overwrites in place every
+turn (our candidate paths and shots played forward, the enemy's estimated state, the odds that it fires). All that goes
+through the pipes is a few numbers to say "there's a new problem, play this many batches of it" and "done". Each worker
+writes its hit counts to its own slot of the same block.
+
+The bot never waits on the workers past the turn's deadline: whatever they haven't finished by then is left out, and
+their answer is thrown away once it's in, since the problem it was for is gone.
+
+The number of workers comes from CODEQUEST_WORKERS, by default one less than the number of cores. With 0 (like on a
+single core) there's no pool and the search runs in the bot's process only.
+"""
+import multiprocessing
+import multiprocessing.connection
+import os
+import typing
+
+import numpy as np
+
+from .scheduler import Deadline
+from .search import BATCH_ROLLOUTS, play_batch
+
+
+ENVIRONMENT_VARIABLE = "CODEQUEST_WORKERS"
+
+# Most workers started by default, however many cores there are
+DEFAULT_MAX_WORKERS = 3
+
+# Largest problem that fits in the shared block
+MAX_PATHS = 64
+MAX_ANGLES = 64
+MAX_TICKS = 64
+
+# Problem header, one float64 each
+(
+    _SEQUENCE, _PATHS, _ANGLES, _TICKS, _ENEMY_X, _ENEMY_Y, _ENEMY_VX, _ENEMY_VY, _FIRE_PROBABILITY, _WIDTH, _HEIGHT,
+) = range(11)
+_HEADER_SIZE = 16
+
+# Per worker result slot: sequence, rollouts, hits dealt per angle, hits taken per path
+_SLOT_SIZE = 2 + MAX_ANGLES + MAX_PATHS
+
+
+def default_workers() -> int:
+    """
+    :return: How many workers to start, from CODEQUEST_WORKERS or the number of cores.
+    """
+    configured = os.environ.get(ENVIRONMENT_VARIABLE)
+    if configured:
+        try:
+            return max(int(configured), 0)
+        except ValueError:
+            pass
+    return min(max((os.cpu_count() or 1) - 1, 0), DEFAULT_MAX_WORKERS)
+
+
+class _Layout:
+    """
+    Where everything is in the shared block, as float64 views on it.
+    """
+    def __init__(self, buffer, workers: int):
+        values = np.ndarray((self.size(workers) // 8,), dtype=np.float64, buffer=buffer)
+        self.header = values[:_HEADER_SIZE]
+        offset = _HEADER_SIZE
+        self.steps = values[offset:offset + MAX_TICKS]
+        offset += MAX_TICKS
+        self.positions = values[offset:offset + MAX_PATHS * MAX_TICKS * 2].reshape(MAX_PATHS, MAX_TICKS, 2)
+        offset += MAX_PATHS * MAX_TICKS * 2
+        self.bullets = values[offset:offset + MAX_ANGLES * MAX_TICKS * 2].reshape(MAX_ANGLES, MAX_TICKS, 2)
+        offset += MAX_ANGLES * MAX_TICKS * 2
+        self.slots = values[offset:offset + workers * _SLOT_SIZE].reshape(workers, _SLOT_SIZE)
+
+    @staticmethod
+    def size(workers: int) -> int:
+        return 8 * (_HEADER_SIZE + MAX_TICKS + (MAX_PATHS + MAX_ANGLES) * MAX_TICKS * 2 + workers * _SLOT_SIZE)
+
+
+class WorkerPool:
+    """
+    See the module's docstring. Use `dispatch` to hand the turn's problem out and `collect` to get the hit counts
+    back. Workers that are still starting up (importing NumPy takes a while) are left out until they're ready.
+    """
+    def __init__(self, workers: int, seed: typing.Optional[int] = None):
+        from multiprocessing import shared_memory
+
+        self.workers = workers
+        self._memory = shared_memory.SharedMemory(create=True, size=_Layout.size(workers))
+        self._layout = _Layout(self._memory.buf, workers)
+        self._layout.header[_SEQUENCE] = 0
+        self._sequence = 0
+
+        # Spawned rather than forked, the bot has threads running by the time the pool starts
+        context = multiprocessing.get_context("spawn")
+        self._connections = []
+        self._processes = []
+        self._ready = set()
+        # Workers busy with a problem, the ones given the current problem, and the ones that died
+        self._busy = set()
+        self._assigned = set()
+        self._dead = set()
+        for index in range(workers):
+            ours, theirs = context.Pipe()
+            process = context.Process(
+                target=_work, args=(theirs, self._memory.name, workers, index, seed), name=f"search-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            theirs.close()
+            self._connections.append(ours)
+            self._processes.append(process)
+
+    @property
+    def idle_workers(self) -> int:
+        """
+        Number of workers that are up and not busy, which is how many a `dispatch` now would go to.
+        """
+        self._poll(0.0)
+        return len(self._ready - self._busy)
+
+    def dispatch(self, positions: np.ndarray, bullets: np.ndarray, enemy_state: typing.Sequence[float],
+                 steps: np.ndarray, fire_probability: float, width: float, height: float, batches: int) -> int:
+        """
+        Writes the problem into the shared block and has every idle worker play `batches` batches of it.
+        Arguments are as for `search.play_batch`.
+        :return: How many workers got it. Problems bigger than the block get none.
+        """
+        paths, ticks = positions.shape[:2]
+        angles = len(bullets)
+        self._poll(0.0)
+        idle = self._ready - self._busy
+        if not idle or paths > MAX_PATHS or angles > MAX_ANGLES or ticks > MAX_TICKS:
+            return 0
+
+        layout = self._layout
+        self._sequence += 1
+        # Tell workers still busy with the last problem that it's gone before anything is overwritten
+        layout.header[_SEQUENCE] = -1
+        layout.steps[:ticks] = steps
+        layout.positions[:paths, :ticks] = positions
+        layout.bullets[:angles, :ticks] = bullets
+        layout.header[_PATHS:_HEIGHT + 1] = (
+            paths, angles, ticks, *enemy_state, fire_probability, width, height,
+        )
+        layout.header[_SEQUENCE] = self._sequence
+
+        for index in idle:
+            self._connections[index].send((self._sequence, batches))
+        self._busy |= idle
+        self._assigned = idle
+        return len(idle)
+
+    def collect(self, deadline: typing.Optional[Deadline] = None) -> typing.Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Waits for the workers given the current problem, until they're all done or the deadline.
+        :return: (hits dealt per angle, hits taken per path, rollouts) summed over the workers that finished.
+        """
+        layout = self._layout
+        paths, angles = int(layout.header[_PATHS]), int(layout.header[_ANGLES])
+        hits_dealt = np.zeros(angles)
+        hits_taken = np.zeros(paths)
+        rollouts = 0
+
+        finished = []
+        while True:
+            # Workers leave `_busy` as they finish or die
+            waiting = self._assigned & self._busy
+            if not waiting or (deadline is not None and deadline.expired()):
+                break
+            finished.extend(self._poll(deadline.remaining() if deadline is not None else None, waiting))
+        self._assigned = set()
+
+        for index in finished:
+            slot = layout.slots[index]
+            if slot[0] != self._sequence:
+                continue
+            rollouts += int(slot[1])
+            hits_dealt += slot[2:2 + angles]
+            hits_taken += slot[2 + MAX_ANGLES:2 + MAX_ANGLES + paths]
+        return hits_dealt, hits_taken, rollouts
+
+    def _poll(self, timeout: typing.Optional[float], only: typing.Optional[typing.Set[int]] = None) -> typing.List[int]:
+        """
+        Reads whatever the workers have sent, waiting up to `timeout` for at least one message.
+        :return: The workers that finished a problem, among `only` if given.
+        """
+        connections = {
+            self._connections[index]: index for index in range(self.workers) if index not in self._dead
+        }
+        finished = []
+        if not connections:
+            return finished
+        for connection in multiprocessing.connection.wait(list(connections), timeout):
+            index = connections[connection]
+            try:
+                message = connection.recv()
+            except (EOFError, OSError):
+                # The worker died, stop using it
+                self._dead.add(index)
+                self._ready.discard(index)
+                self._busy.discard(index)
+                continue
+            if message == "ready":
+                self._ready.add(index)
+            else:
+                self._busy.discard(index)
+                if only is None or index in only:
+                    finished.append(index)
+        return finished
+
+    def close(self):
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+        for process in self._processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        self._layout = None
+        self._memory.close()
+        self._memory.unlink()
+
+
+def _work(connection, memory_name: str, workers: int, index: int, seed: typing.Optional[int]):
+    """
+    A worker process: plays the problems it's told about until it's sent None or the bot goes away.
+    """
+    from multiprocessing import shared_memory
+
+    # Spawned workers share the bot's resource tracker, so the block stays registered once and the bot unlinks it
+    memory = shared_memory.SharedMemory(name=memory_name)
+    layout = _Layout(memory.buf, workers)
+    rng = np.random.default_rng(None if seed is None else [seed, index])
+    connection.send("ready")
+
+    try:
+        while True:
+            try:
+                task = connection.recv()
+            except (EOFError, OSError):
+                return
+            if task is None:
+                return
+            sequence, batches = task
+
+            header = layout.header
+            paths, angles, ticks = int(header[_PATHS]), int(header[_ANGLES]), int(header[_TICKS])
+            steps = layout.steps[:ticks].copy()
+            positions = layout.positions[:paths, :ticks].copy()
+            bullets = layout.bullets[:angles, :ticks].copy()
+            enemy_state = tuple(header[_ENEMY_X:_ENEMY_VY + 1])
+            fire_probability, width, height = header[_FIRE_PROBABILITY], header[_WIDTH], header[_HEIGHT]
+
+            hits_dealt = np.zeros(angles)
+            hits_taken = np.zeros(paths)
+            played = 0
+            for _ in range(batches):
+                if header[_SEQUENCE] != sequence:
+                    # A newer problem has been written over this one
+                    break
+                dealt, taken = play_batch(rng, positions, bullets, enemy_state, steps, fire_probability, width, height)
+                hits_dealt += dealt
+                hits_taken += taken
+                played += 1
+
+            slot = layout.slots[index]
+            # Only counts if the problem didn't change while it was being read
+            slot[0] = sequence if header[_SEQUENCE] == sequence else -1
+            slot[1] = played * BATCH_ROLLOUTS
+            slot[2:2 + angles] = hits_dealt
+            slot[2 + MAX_ANGLES:2 + MAX_ANGLES + paths] = hits_taken
+            connection.send(sequence)
+    finally:
+        # The arrays still point into the block, so it's left to be unmapped when the process exits
+        connection.close()
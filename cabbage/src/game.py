@@ -1,362 +1,227 @@
-import random
+from botcore import geometry
+from botcore.constants import BULLET_SPEED
+from botcore.game import BaseGame
+from botcore.line_of_sight import BLOCKED_BY_DESTRUCTIBLE_WALL
+from botcore.scheduler import Deadline, Stage
+from botcore.search import DEFAULT_HORIZON_TICKS, FIRE_PROBABILITY
 
-import comms
-from object_types import ObjectTypes
 
-import sys
-import math
+# Angles tried around the lead angle when searching for a shot
+AIM_SPREAD = (-4.0, -2.0, 0.0, 2.0, 4.0)
 
+# Only shoot what the search came up with if it hit in at least this share of the rollouts
+MIN_HIT_PROBABILITY = 0.2
 
-class Game:
+# How many turns back the enemy's shots are counted to guess how often it fires
+FIRE_RATE_TURNS = 90
+
+
+class Game(BaseGame):
     """
-    Stores all information about the game and manages the communication cycle.
-    Available attributes after initialization will be:
-    - tank_id: your tank id
-    - objects: a dict of all objects on the map like {object-id: object-dict}.
-    - width: the width of the map as a floating point number.
-    - height: the height of the map as a floating point number.
-    - current_turn_message: a copy of the message received this turn. It will be updated everytime `read_next_turn_data`
-        is called and will be available to be used in `respond_to_turn` if needed.
+    Cabbage's strategy. Everything the bot knows about the game comes from `BaseGame`, on top of that it keeps:
+    - last_path_requested: the path the server is taking us along, kept up with unless something more important comes
+        up. Paths close to it aren't sent at all, see `ActionOutput`.
     """
     def __init__(self):
+        super().__init__()
         self.last_path_requested = None
-        
-        tank_id_message: dict = comms.read_message()
-        self.tank_id = tank_id_message["message"]["your-tank-id"]
-        
-        self.enemy_tank_id = tank_id_message["message"]["enemy-tank-id"]
-
-        self.current_turn_message = None
-
-        # We will store all game objects here
-        self.objects = {}
-
-        next_init_message = comms.read_message()
-        while next_init_message != comms.END_INIT_SIGNAL:
-            # At this stage, there won't be any "events" in the message. So we only care about the object_info.
-            object_info: dict = next_init_message["message"]["updated_objects"]
-
-            # Store them in the objects dict
-            self.objects.update(object_info)
-
-            # Read the next message
-            next_init_message = comms.read_message()
-
-        # We are outside the loop, which means we must've received the END_INIT signal
-
-        # Let's figure out the map size based on the given boundaries
-
-        # Read all the objects and find the boundary objects
-        boundaries = []
-
-        #walls
-        self.walls = []
-        for game_object in self.objects.values():
-            if game_object["type"] == ObjectTypes.BOUNDARY.value:
-                boundaries.append(game_object)
-            # If the game obj is wall
-            if game_object["type"] == ObjectTypes.WALL.value:
-                self.walls.append(game_object["position"])    
 
-        # The biggest X and the biggest Y among all Xs and Ys of boundaries must be the top right corner of the map.
-
-        # Let's find them. This might seem complicated, but you will learn about its details in the tech workshop.
-        biggest_x, biggest_y = [
-            max([max(map(lambda single_position: single_position[i], boundary["position"])) for boundary in boundaries])
-            for i in range(2)
-        ]
-
-        self.width = biggest_x
-        self.height = biggest_y
-
-    def read_next_turn_data(self):
+    def find_powerup(self, deadline=None):
         """
-        It's our turn! Read what the game has sent us and update the game info.
-        :returns True if the game continues, False if the end game signal is received and the bot should be terminated
+        Find the powerup to go for next: the first stop of the route planner's best route through the powerups.
+        :return: Its position, or None if no powerup is worth the walk.
         """
-        # Read and save the message
-        self.current_turn_message = comms.read_message()
-
-        if self.current_turn_message == comms.END_SIGNAL:
-            return False
-
-        # Delete the objects that have been deleted
-        # NOTE: You might want to do some additional logic here. For example check if a powerup you were moving towards
-        # is already deleted, etc.
-        for deleted_object_id in self.current_turn_message["message"]["deleted_objects"]:
-            try:
-                del self.objects[deleted_object_id]
-            except KeyError:
-                pass
-
-        # Update your records of the new and updated objects in the game
-        # NOTE: you might want to do some additional logic here. For example check if a new bullet has been shot or a
-        # new powerup is now spawned, etc.
-        self.objects.update(self.current_turn_message["message"]["updated_objects"])
-
-        return True
-    
-    def find_powerup(self):
-        """
-        Find existing powerups and return the closest one.
-        """
-        closest_powerup = None
-        min_distance = float('inf')
-        for game_object in self.objects.values():
-            if game_object["type"] == ObjectTypes.POWERUP.value:
-                # If in boudnary 
-                if self.in_boundary(game_object["position"][0],  game_object["position"][1]):
-                    object_x = game_object["position"][0]
-                    object_y = game_object["position"][1]
-                    self_x = self.objects[self.tank_id]["position"][0]
-                    self_y = self.objects[self.tank_id]["position"][1]
-                    distance = math.sqrt(abs(object_x - self_x) ** 2 + abs(object_y - self_y) ** 2)
-                    if min_distance > distance:
-                        min_distance = distance
-                        closest_powerup = game_object["position"]
-        return closest_powerup
-
-    def find_distance(point_one, point_two):
-        return math.sqrt(abs(point_one[0] - point_two[0]) ** 2 + abs(point_one[1] - point_two[1]) ** 2)
+        my_tank = self.store.tanks[self.tank_id]
+        enemy_tank = self.store.tanks.get(self.enemy_tank_id)
+        route = self.routes.plan(
+            my_tank.x, my_tank.y, enemy_tank.position if enemy_tank is not None else None, self.boundary, deadline,
+        )
+        if not route.points:
+            return None
+        return route.points[0]
+
+    def find_distance(self, point_one, point_two):
+        return geometry.distance(point_one[0], point_one[1], point_two[0], point_two[1])
     
     def find_angle(self, mine, enemy):
-        x1 = mine[0]
-        y1 = mine[1]
-        x2 = enemy[0]
-        y2 = enemy[1]
-        
-        return math.atan2(y2 - y1, x2 - x1) * 180 / math.pi
+        return geometry.angle(mine[0], mine[1], enemy[0], enemy[1])
 
     def check_clear(self, mine):
         # Only shoot if enemy is in view
         pass    
 
     def bouncing_shot(self):
-        pass
-
-    def are_points_on_line(self, x1, y1, x2, y2, epsilon=1e-6):
-        # Step 1: Calculate the slope (m)
-        if x2 - x1 != 0:
-            m = (y2 - y1) / (x2 - x1)
-        else:
-            m = float('inf')  # Handle vertical lines (infinite slope)
-
-        # Step 2: Calculate the y-intercept (b)
-        b = y1 - m * x1
-
-        # Step 3: Write the equation of the line
-        def line_equation(x):
-            return m * x + b
-
-        # Step 4: Check if any points lie on the line
-        for x, y in self.walls:
-            if abs(y - line_equation(x)) < epsilon:
-                return True
-
-        return False
+        """
+        Find a shot that reaches the enemy after bouncing off one or two walls.
+        :return: The angle to shoot at or None if there is no such shot.
+        """
+        my_tank = self.store.tanks[self.tank_id]
+        enemy_tank = self.store.tanks[self.enemy_tank_id]
+        shot = self.bounce_solver.solve(my_tank.x, my_tank.y, enemy_tank.x, enemy_tank.y)
+        if shot is None:
+            return None
+        return shot.angle
 
         # CREATED FUNCTIONS
-    def in_boundary(self, x, y):
-        for game_object in self.objects.values():
-            if game_object["type"] == ObjectTypes.CLOSING_BOUNDARY.value:
-                bounds = game_object
-
-                x_bound_lower = bounds["position"][0][0]
-                x_bound_upper = bounds["position"][2][0]
-                y_bound_lower = bounds["position"][1][1]
-                y_bound_upper = bounds["position"][3][1]
+    def plan_search(self, deadline):
+        """
+        Try out a handful of moves and shots against a few guesses at what the enemy will do, and take the best.
+        Picking the powerup to head for gets up to half of the time left, the search up to half of what remains after
+        that, and the stages after it the rest.
+        """
+        my_tank = self.store.tanks[self.tank_id]
+        enemy_tank = self.store.tanks[self.enemy_tank_id]
+
+        goal = self.find_powerup(Deadline.after(deadline.remaining() / 2))
+        if goal is None and my_tank.hp < enemy_tank.hp:
+            # Losing the exchange, hide until something worth coming out for shows up
+            goal = self.cover.nearest_cover(my_tank.x, my_tank.y, enemy_tank.x, enemy_tank.y)
+        if goal is None:
+            goal = enemy_tank.position
+        paths = self.search.movement_candidates(my_tank.x, my_tank.y, [goal, self.last_path_requested])
+
+        angles = []
+        if self.line_of_sight.has_line_of_sight(my_tank.x, my_tank.y, enemy_tank.x, enemy_tank.y):
+            lead_angle = self.enemy_tracker.lead_angle(my_tank.x, my_tank.y, BULLET_SPEED)
+            if lead_angle is not None:
+                angles = [lead_angle + offset for offset in AIM_SPREAD]
+
+        result = self.search.plan(
+            my_tank.x, my_tank.y, self.enemy_tracker, paths, angles, Deadline.after(deadline.remaining() / 2),
+            goal=goal, boundary=self.boundary, fire_probability=self.enemy_fire_probability(),
+        )
+        response = {"path": result.path}
+        if result.shoot is not None and result.hit_probability >= MIN_HIT_PROBABILITY:
+            response["shoot"] = result.shoot
+        return response
+
+    def enemy_fire_probability(self):
+        """
+        Chance that the enemy shoots within the ticks the search plays forward, going by how often it fired lately.
+        """
+        if self.turn < FIRE_RATE_TURNS:
+            return FIRE_PROBABILITY
+        shots = len(self.history.fired_by(self.enemy_tank_id, FIRE_RATE_TURNS))
+        return min(shots * DEFAULT_HORIZON_TICKS / FIRE_RATE_TURNS, 1.0)
 
-                       # Check for need to dodge   
-                print("mine: " + str(x_bound_lower) + " upper" + str(x_bound_upper) + str(y_bound_lower) + " upper" + str(y_bound_upper), file=sys.stderr)
+    def plan_dodge(self, deadline):
+        """
+        Dodge incoming bullets, leaning towards where we were going anyway.
+        """
+        my_tank = self.store.tanks[self.tank_id]
+        dodge = self.threats.plan_dodge(my_tank.x, my_tank.y, self.navigation.is_walkable, self.last_path_requested)
+        if dodge is not None:
+            return {"path": dodge}
+        return None
 
-                if (x >= x_bound_lower and x <= x_bound_upper and y >= y_bound_lower and y <= y_bound_upper):
-                    return True
+    def plan_aim(self, deadline):
+        """
+        Shoot at the enemy if nothing is in the way and the shot is likely enough to hit, going by the hit table.
+        """
+        my_tank = self.store.tanks[self.tank_id]
+        enemy_tank = self.store.tanks[self.enemy_tank_id]
+        my_tank_position = my_tank.position
+        enemy_tank_position = enemy_tank.position
+
+        # Judged on the velocity the lead angle below aims with, the server doesn't always send one
+        worth_it = self.hit_table.should_shoot(
+            my_tank.x, my_tank.y, enemy_tank.x, enemy_tank.y, self.enemy_tracker.vx, self.enemy_tracker.vy,
+        )
+        if worth_it and self.line_of_sight.has_line_of_sight(my_tank.x, my_tank.y, enemy_tank.x, enemy_tank.y):
+            # Lead the shot to where the enemy will be when the bullet gets there
+            angle = self.enemy_tracker.lead_angle(my_tank.x, my_tank.y, BULLET_SPEED)
+            if angle is None:
+                angle = self.find_angle(my_tank_position, enemy_tank_position)
+            return {"shoot": angle}
+        return None
+
+    def plan_bounce_shot(self, deadline):
+        """
+        No direct shot, try to get one in off the walls.
+        """
+        my_tank = self.store.tanks[self.tank_id]
+        enemy_tank = self.store.tanks[self.enemy_tank_id]
+        my_tank_position = my_tank.position
+        enemy_tank_position = enemy_tank.position
 
-        return False
+        # Distance
+        distance = self.find_distance(my_tank_position, enemy_tank_position)
 
+        blocked = not self.line_of_sight.has_line_of_sight(my_tank.x, my_tank.y, enemy_tank.x, enemy_tank.y)
+        if distance < 500 and blocked:
+            bounce_angle = self.bouncing_shot()
+            if bounce_angle is not None:
+                return {"shoot": bounce_angle}
+        return None
 
-    def respond_to_turn(self):
+    def plan_breach(self, deadline):
         """
-        This is where you should write your bot code to process the data and respond to the game.
+        Nothing to shoot at, so shoot down the destructible wall between us and where we're going if that's quicker than
+        walking around it.
         """
+        if self.last_path_requested is None:
+            return None
+        my_tank = self.store.tanks[self.tank_id]
+        target_x, target_y = self.last_path_requested
+        if self.line_of_sight.trace(my_tank.x, my_tank.y, target_x, target_y) != BLOCKED_BY_DESTRUCTIBLE_WALL:
+            return None
+
+        wall_id = self.cover.blocking_wall(my_tank.x, my_tank.y, target_x, target_y)
+        if wall_id is None or not self.cover.should_breach(wall_id, my_tank.x, my_tank.y, target_x, target_y):
+            return None
+        wall = self.store.destructible_walls[wall_id]
+        return {"shoot": self.find_angle(my_tank.position, wall["position"])}
+
+    def precompute_map(self, deadline):
+        """
+        Use half of whatever time is left to build more of the cover map (unless it came from the map cache), the rest
+        is there in case the turn ran late.
+        """
+        self.precompute(Deadline.after(deadline.remaining() / 2))
+        return None
 
-        # Write your code here... For demonstration, this bot just shoots randomly every turn.
-
-        # Enemy
-        enemy_tank = self.objects[self.enemy_tank_id]
-        enemy_tank_position = enemy_tank["position"]
-        # Mine
-        my_tank = self.objects[self.tank_id]
-        my_tank_position = my_tank["position"]
-        
-        # Cleared Response
-        my_response = {}
-        
-        # Moves towards Enemy
-        # if self.last_path_requested is None or self.last_path_requested != enemy_tank_position:
-        #     my_response = {"path": enemy_tank_position}
-        #     self.last_path_requested = enemy_tank_position
-        
-        # Checking for powerup
-        dest_x = self.width // 2
-        dest_y = self.height // 2
-        powerup = self.find_powerup()
+    def plan_path(self, deadline):
+        """
+        Go for the best powerup, or after the enemy if there isn't one.
+        """
+        powerup = self.find_powerup(deadline)
 
-        # Movement 
+        # Movement
         if powerup is not None:
-            dest_x = powerup[0]
-            dest_y = powerup[1]
-             # Updates Powerup Seeking
-            my_response.update(
-                {
-                    "path": [dest_x, dest_y]
-                }
-            )
-
-        else: 
-            dest_x = enemy_tank_position[0]
-            dest_y = enemy_tank_position[1]
-            # Updates Seeking Enemy
-            my_response.update(
-                {
-                    "path": [dest_x, dest_y]
-                }
-            )
+            # Updates Powerup Seeking
+            return {"path": [powerup[0], powerup[1]]}
 
-        self.in_boundary(1,2)
+        # Updates Seeking Enemy
+        return {"path": self.store.tanks[self.enemy_tank_id].position}
 
-        # Distance
-        distance = abs(my_tank_position[0] - enemy_tank_position[0]) + abs(my_tank_position[1]) - abs(enemy_tank_position[1])
-
-        if distance < 500 and not self.are_points_on_line(my_tank_position[0], my_tank_position[1], enemy_tank_position[0], enemy_tank_position[1]):
-            # Updates the Response
-            my_response.update({
-                "shoot": self.find_angle(my_tank_position, enemy_tank_position),
-            })
+    def respond_to_turn(self):
+        """
+        This is where you should write your bot code to process the data and respond to the game.
+        The planning stages run in priority order until the turn's time is almost up; anything they didn't get to decide
+        comes from the fallback, which keeps us on the path we were already following. The search usually decides
+        everything, the simpler stages after it are there for when it runs out of time or has no good shot.
+        Whichever path comes out is only sent if it's far enough from the one we're on.
+        """
+        deadline = self.turn_deadline()
+
+        fallback = {}
+        if self.last_path_requested is not None:
+            fallback["path"] = self.last_path_requested
+
+        my_response = self.scheduler.run(
+            [
+                Stage("search", self.plan_search),
+                Stage("dodge", self.plan_dodge, decides=("path",)),
+                Stage("aim", self.plan_aim, decides=("shoot",)),
+                Stage("bounce_shot", self.plan_bounce_shot, background=True, decides=("shoot",)),
+                Stage("breach", self.plan_breach, decides=("shoot",)),
+                Stage("path", self.plan_path, decides=("path",)),
+                Stage("precompute", self.precompute_map),
+            ],
+            deadline,
+            fallback,
+        )
 
         # Final Post
-        comms.post_message(my_response)
-
-
-
-# import math
-# import random
-# import sys
-
-# import comms
-# from object_types import ObjectTypes
-
-
-# class Game:
-#     """
-#     Stores all information about the game and manages the communication cycle.
-#     Available attributes after initialization will be:
-#     - tank_id: your tank id
-#     - objects: a dict of all objects on the map like {object-id: object-dict}.
-#     - width: the width of the map as a floating point number.
-#     - height: the height of the map as a floating point number.
-#     - current_turn_message: a copy of the message received this turn. It will be updated everytime `read_next_turn_data`
-#         is called and will be available to be used in `respond_to_turn` if needed.
-#     """
-#     def __init__(self):
-#         tank_id_message: dict = comms.read_message()
-
-#         # Tanks ID
-#         self.tank_id = tank_id_message["message"]["your-tank-id"]
-#         self.enemy_tank_id = tank_id_message["message"]["enemy-tank-id"]
-
-#         self.current_turn_message = None
-
-#         # We will store all game objects here
-#         self.objects = {}
-
-#         next_init_message = comms.read_message()
-#         while next_init_message != comms.END_INIT_SIGNAL:
-#             # At this stage, there won't be any "events" in the message. So we only care about the object_info.
-#             object_info: dict = next_init_message["message"]["updated_objects"]
-
-#             # Store them in the objects dict
-#             self.objects.update(object_info)
-
-#             # Read the next message
-#             next_init_message = comms.read_message()
-
-#         # We are outside the loop, which means we must've received the END_INIT signal
-
-#         # Let's figure out the map size based on the given boundaries
-
-#         # Read all the objects and find the boundary objects
-#         boundaries = []
-#         for game_object in self.objects.values():
-#             if game_object["type"] == ObjectTypes.BOUNDARY.value:
-#                 boundaries.append(game_object)
-
-#         # The biggest X and the biggest Y among all Xs and Ys of boundaries must be the top right corner of the map.
-
-#         # Let's find them. This might seem complicated, but you will learn about its details in the tech workshop.
-#         biggest_x, biggest_y = [
-#             max([max(map(lambda single_position: single_position[i], boundary["position"])) for boundary in boundaries])
-#             for i in range(2)
-#         ]
-
-#         self.width = biggest_x
-#         self.height = biggest_y
-
-#     def read_next_turn_data(self):
-#         """
-#         It's our turn! Read what the game has sent us and update the game info.
-#         :returns True if the game continues, False if the end game signal is received and the bot should be terminated
-#         """
-#         # Read and save the message
-#         self.current_turn_message = comms.read_message()
-
-#         if self.current_turn_message == comms.END_SIGNAL:
-#             return False
-
-#         # Delete the objects that have been deleted
-#         # NOTE: You might want to do some additional logic here. For example check if a powerup you were moving towards
-#         # is already deleted, etc.
-#         for deleted_object_id in self.current_turn_message["message"]["deleted_objects"]:
-#             try:
-#                 del self.objects[deleted_object_id]
-#             except KeyError:
-#                 pass
-
-#         # Update your records of the new and updated objects in the game
-#         # NOTE: you might want to do some additional logic here. For example check if a new bullet has been shot or a
-#         # new powerup is now spawned, etc.
-#         self.objects.update(self.current_turn_message["message"]["updated_objects"])
-
-#         return True
-
-#     def calculate_angle(self, mine, enemy):
-#         x1 = mine[0]
-#         x2 = mine[1]
-#         y1 = enemy[0]
-#         y2 = enemy[1]
-#         return math.atan2(y2 - y1, x2 - x1) * 100 / math.pi
-    
-#     def calculate_distance(self, mine, enemy): 
-#         return abs(mine[0] - enemy[0]) + abs(mine[1] - abs(enemy[1]) )
-
-
-#     def respond_to_turn(self):
-#         # Find your tank's position
-#         my_tank_position = self.objects[self.tank_id]["position"]
-#         enemey_tank_position =  self.objects[self.enemy_tank_id]["position"]
-
-#         # Print
-#         print("mine" + str(my_tank_position) + "enemy" + str(enemey_tank_position), file=sys.stderr)
-
-#         # Move towards the middle
-#         comms.post_message({
-#             "shoot": self.calculate_angle(my_tank_position, enemey_tank_position)
-#         })
-
-#         # my_response = {}
-#         # print("mine: " + self.objects[self.tank_id], file=sys.stderr)
-#         # comms.post_message(my_response)
-        
-
-
-
+        self.post_response(my_response)
+        self.last_path_requested = self.actions.path
@@ -0,0 +1,49 @@
+import io
+import json
+import os
+import sys
+
+import pytest
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from botcore import comms
+from botcore.game import BaseGame
+from botcore.object_types import ObjectTypes
+
+
+WIDTH = 1800.0
+HEIGHT = 1000.0
+
+
+@pytest.fixture
+def start_game(monkeypatch):
+    """
+    :return: A function that builds a BaseGame from the init messages for a map with the given walls, with no worker
+        processes and no map cache. Any messages given after the walls are left in the stream for the game to read.
+    """
+    monkeypatch.setenv("CODEQUEST_WORKERS", "0")
+    monkeypatch.setenv("CODEQUEST_MAP_CACHE", "off")
+
+    def start(walls=(), messages_after_init=()):
+        corners = [[0, HEIGHT], [0, 0], [WIDTH, 0], [WIDTH, HEIGHT]]
+        objects = {
+            "boundary": {"type": ObjectTypes.BOUNDARY.value, "position": corners},
+            "tank-1": {"type": ObjectTypes.TANK.value, "position": [100, 100], "hp": 5},
+            "tank-2": {"type": ObjectTypes.TANK.value, "position": [1700, 900], "hp": 5},
+        }
+        for index, (x, y) in enumerate(walls):
+            objects[f"wall-{index}"] = {"type": ObjectTypes.WALL.value, "position": [x, y]}
+        messages = [
+            {"message": {"your-tank-id": "tank-1", "enemy-tank-id": "tank-2"}},
+            {"message": {"updated_objects": objects}},
+            comms.END_INIT_SIGNAL,
+            *messages_after_init,
+        ]
+        stream = b"".join(json.dumps(message).encode() + b"\n" for message in messages)
+        comms.set_transport(io.BytesIO(stream), io.BytesIO())
+        return BaseGame()
+
+    return start
@@ -0,0 +1,57 @@
+from botcore.actions import (
+    ARRIVED_DISTANCE, BLOCKED, MOVED, NEW, REPATH_DISTANCE, STUCK_TURNS, TURNED, ActionOutput,
+)
+
+
+def test_first_path_is_sent():
+    actions = ActionOutput()
+    message = actions.prepare({"path": [500, 500], "shoot": None}, 100.0, 100.0)
+    assert message == {"path": [500.0, 500.0]}
+    assert actions.last_reason == NEW
+
+
+def test_nearby_target_keeps_path():
+    actions = ActionOutput()
+    actions.prepare({"path": [500, 500]}, 100.0, 100.0)
+    # A few units further along the same direction
+    message = actions.prepare({"path": [505, 505], "shoot": 45.0}, 110.0, 110.0)
+    assert message == {"shoot": 45.0}
+    assert actions.path == [500.0, 500.0]
+    assert actions.kept == 1
+
+
+def test_far_target_repaths():
+    actions = ActionOutput()
+    actions.prepare({"path": [500, 500]}, 100.0, 100.0)
+    target = [500 + REPATH_DISTANCE + 1, 500]
+    message = actions.prepare({"path": target}, 110.0, 110.0)
+    assert message["path"] == target
+    assert actions.last_reason == MOVED
+
+
+def test_turned_target_repaths():
+    actions = ActionOutput()
+    actions.prepare({"path": [500, 500]}, 480.0, 480.0)
+    # Close to the old target, but off to the side of where we're heading
+    message = actions.prepare({"path": [500 + REPATH_DISTANCE / 2, 500 - REPATH_DISTANCE / 2]}, 480.0, 481.5)
+    assert "path" in message
+    assert actions.last_reason == TURNED
+
+
+def test_stuck_tank_repaths():
+    actions = ActionOutput()
+    actions.prepare({"path": [500, 500]}, 100.0, 100.0)
+    reasons = []
+    for _ in range(STUCK_TURNS):
+        actions.prepare({"path": [500, 500]}, 100.0, 100.0)
+        reasons.append(actions.last_reason)
+    assert reasons[:-1] == [None] * (STUCK_TURNS - 1)
+    assert reasons[-1] == BLOCKED
+
+
+def test_new_target_once_arrived():
+    actions = ActionOutput()
+    actions.prepare({"path": [500, 500]}, 100.0, 100.0)
+    message = actions.prepare({"path": [503, 500]}, 500.0, 500.0 + ARRIVED_DISTANCE / 2)
+    assert message["path"] == [503.0, 500.0]
+    assert actions.summary()["repaths"] == {NEW: 1, MOVED: 1, TURNED: 0, BLOCKED: 0}
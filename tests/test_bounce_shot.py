@@ -0,0 +1,96 @@
+import math
+
+from botcore.bounce_shot import BounceShotSolver
+from botcore.constants import TANK_SIZE, WALL_SIZE
+from botcore.line_of_sight import LineOfSight
+
+
+WIDTH = 1800.0
+HEIGHT = 1000.0
+
+# Map edges only, every solver has these
+EDGE_FACES = 4
+
+
+def solver_with_walls(walls):
+    line_of_sight = LineOfSight(WIDTH, HEIGHT)
+    for x, y in walls:
+        line_of_sight.add_wall(x, y)
+    return BounceShotSolver(line_of_sight, WIDTH, HEIGHT)
+
+
+def fly(line_of_sight, x, y, angle, distance, step=0.25):
+    """
+    Moves a bullet from (x, y) at the angle in small steps, bouncing off wall cells and the map edges.
+    :return: [(x, y, bounces so far)] of every step.
+    """
+    dx, dy = math.cos(math.radians(angle)) * step, math.sin(math.radians(angle)) * step
+    points, bounces = [(x, y, 0)], 0
+    for _ in range(int(distance / step)):
+        next_x, next_y = x + dx, y + dy
+        flip_x = not 0 <= next_x <= WIDTH
+        flip_y = not 0 <= next_y <= HEIGHT
+        if line_of_sight.is_wall(next_x, next_y, include_destructible=False):
+            flip_x = line_of_sight.is_wall(next_x, y, include_destructible=False)
+            flip_y = line_of_sight.is_wall(x, next_y, include_destructible=False)
+            if not flip_x and not flip_y:
+                # Straight into a corner
+                flip_x = flip_y = True
+        if flip_x or flip_y:
+            dx, dy = -dx if flip_x else dx, -dy if flip_y else dy
+            bounces += 1
+            continue
+        x, y = next_x, next_y
+        points.append((x, y, bounces))
+    return points
+
+
+def test_one_bounce_around_a_wall():
+    # A wall between the shooter and the target, and a long one above them both to bounce off
+    blocking = [(600 + WALL_SIZE / 2, 420 + WALL_SIZE * row) for row in range(10)]
+    mirror = [(300 + WALL_SIZE * column, 200 + WALL_SIZE / 2) for column in range(35)]
+    solver = solver_with_walls(blocking + mirror)
+    assert not solver.line_of_sight.has_line_of_sight(400, 500, 800, 500)
+
+    shot = solver.solve(400, 500, 800, 500)
+    assert shot is not None
+    assert shot.bounces == 1
+    # Off the wall above, not the map edge further away
+    assert 200 < shot.points[0][1] < 240
+
+    points = fly(solver.line_of_sight, 400, 500, shot.angle, shot.distance + TANK_SIZE)
+    arrival = min(range(len(points)), key=lambda index: math.hypot(points[index][0] - 800, points[index][1] - 500))
+    x, y, bounces = points[arrival]
+    assert math.hypot(x - 800, y - 500) < TANK_SIZE / 2
+    assert bounces == 1
+    assert not any(solver.line_of_sight.is_wall(px, py) for px, py, _ in points[:arrival + 1])
+
+
+def test_no_shot_when_boxed_in():
+    # The target is walled in on every side
+    walls = [
+        (800 + WALL_SIZE * column, 500 + WALL_SIZE * row)
+        for column in range(-3, 4) for row in range(-3, 4) if max(abs(column), abs(row)) == 3
+    ]
+    assert solver_with_walls(walls).solve(400, 500, 800, 500) is None
+
+
+def test_empty_map_has_only_edges():
+    assert len(solver_with_walls([])) == EDGE_FACES
+
+
+def test_lone_wall_has_four_faces():
+    assert len(solver_with_walls([(900, 500)])) == EDGE_FACES + 4
+
+
+def test_touching_walls_share_faces():
+    # Two walls side by side make one block: the sides they share aren't faces and the long sides merge
+    solver = solver_with_walls([(900, 500), (918, 500)])
+    assert len(solver) == EDGE_FACES + 4
+
+
+def test_game_solver_sees_map_walls(start_game):
+    walls = [(180 + 90 * column, 180 + 180 * row) for column in range(15) for row in range(4)]
+    game = start_game(walls)
+    assert len(game.bounce_solver) == len(solver_with_walls(walls))
+    assert len(game.bounce_solver) > EDGE_FACES + len(walls)
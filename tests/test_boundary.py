@@ -0,0 +1,54 @@
+import math
+
+from botcore.boundary import ClosingBoundary
+
+
+def boundary_object(x_min, y_min, x_max, y_max):
+    return {"type": 6, "position": [[x_min, y_max], [x_min, y_min], [x_max, y_min], [x_max, y_max]]}
+
+
+def test_unknown_boundary_contains_everything():
+    boundary = ClosingBoundary()
+    assert not boundary.known
+    assert boundary.contains(-1e6, 1e6)
+    assert boundary.turns_until_outside(100, 100) == math.inf
+
+
+def test_contains_edges():
+    boundary = ClosingBoundary()
+    boundary.update(boundary_object(0, 0, 1800, 1000), 0)
+    assert boundary.contains(0, 0) and boundary.contains(1800, 1000) and boundary.contains(900, 500)
+    assert not boundary.contains(-0.1, 500) and not boundary.contains(900, 1000.1)
+    assert boundary.corners() == boundary_object(0, 0, 1800, 1000)["position"]
+
+
+def test_predicts_shrinking():
+    boundary = ClosingBoundary()
+    boundary.update(boundary_object(0, 0, 1800, 1000), 0)
+    # Every edge moves 1 unit in per turn, the update comes every 10 turns
+    for turn in range(10, 60, 10):
+        boundary.update(boundary_object(turn, turn, 1800 - turn, 1000 - turn), turn)
+    assert math.isclose(boundary.x_min_rate, 1.0) and math.isclose(boundary.y_max_rate, 1.0)
+
+    # 50 units from the left edge, which is at 50 and closing in
+    assert math.isclose(boundary.turns_until_outside(100, 500), 50.0)
+    assert boundary.contains_after(100, 500, 49)
+    assert not boundary.contains_after(100, 500, 51)
+    # The middle is 450 units from the top and bottom edges
+    assert math.isclose(boundary.turns_until_outside(900, 500), 450.0)
+    assert boundary.turns_until_outside(10, 500) == 0.0
+
+
+def test_brute_force_prediction():
+    boundary = ClosingBoundary()
+    boundary.update(boundary_object(0, 0, 1800, 1000), 0)
+    boundary.update(boundary_object(20, 10, 1790, 970), 10)
+    for x in range(0, 1801, 100):
+        for y in range(0, 1001, 100):
+            turns = boundary.turns_until_outside(x, y)
+            if turns == 0.0:
+                assert not boundary.contains(x, y)
+                continue
+            # Still inside just before, outside just after
+            assert boundary.contains_after(x, y, turns - 0.01)
+            assert not boundary.contains_after(x, y, turns + 0.01)
@@ -0,0 +1,93 @@
+import io
+import json
+import queue
+import time
+
+import pytest
+
+from botcore import comms
+from botcore.game import MAX_SKIPPED_TURNS
+
+
+def stream_of(messages):
+    return io.BytesIO(b"".join(json.dumps(message).encode() + b"\n" for message in messages))
+
+
+def turn(number, seconds):
+    return {"message": {"deleted_objects": [], "updated_objects": {}}, "time": seconds, "turn": number}
+
+
+def test_background_reader_keeps_order_and_stops_at_end():
+    reader = comms.BackgroundReader(stream_of([turn(1, 0.1), turn(2, 0.1), comms.END_SIGNAL, turn(3, 0.1)]))
+    assert reader.get()[0]["turn"] == 1
+    assert reader.get()[0]["turn"] == 2
+    assert reader.get()[0] == comms.END_SIGNAL
+    # Nothing after END is read
+    reader._thread.join(1.0)
+    assert not reader._thread.is_alive()
+    with pytest.raises(queue.Empty):
+        reader.get(block=False)
+
+
+def test_background_reader_reports_closed_connection():
+    reader = comms.BackgroundReader(stream_of([turn(1, 0.1)]))
+    assert reader.get()[0]["turn"] == 1
+    with pytest.raises(EOFError):
+        reader.get()
+    # And keeps reporting it
+    with pytest.raises(EOFError):
+        reader.get()
+
+
+def read_until_queued(count, timeout=5.0):
+    """
+    :return: `count` messages from the waiting queue, once the background reader has got to them.
+    """
+    messages = []
+    give_up = time.perf_counter() + timeout
+    while len(messages) < count and time.perf_counter() < give_up:
+        messages += comms.read_waiting_messages(count - len(messages))
+    return messages
+
+
+def wait_until_read(timeout=5.0):
+    """
+    Waits for the background reader to get to the end of the stream.
+    """
+    comms._reader._thread.join(timeout)
+
+
+def test_waiting_messages_limit():
+    comms.set_transport(stream_of([turn(number, 0.1) for number in range(5)]), io.BytesIO())
+    comms.start_background_reader()
+    assert [message["turn"] for message in read_until_queued(2)] == [0, 1]
+    assert comms.read_message()["turn"] == 2
+    assert [message["turn"] for message in read_until_queued(2)] == [3, 4]
+
+
+def test_answers_every_turn_in_time(start_game):
+    game = start_game(messages_after_init=[turn(1, 1.0), turn(2, 1.0), comms.END_SIGNAL])
+    comms.start_background_reader()
+    assert game.read_next_turn_data() and game.turn == 1
+    assert game.read_next_turn_data() and game.turn == 2
+    assert not game.read_next_turn_data()
+
+
+def test_skips_turns_that_are_already_over(start_game):
+    turns = MAX_SKIPPED_TURNS + 3
+    # No time at all to answer, so every turn is over as soon as it arrives
+    game = start_game(messages_after_init=[turn(number, 0.0) for number in range(1, turns + 1)] + [comms.END_SIGNAL])
+    comms.start_background_reader()
+    # Everything has arrived before we get to the first turn
+    wait_until_read()
+
+    assert game.read_next_turn_data()
+    # Each waiting turn replaced the one before it, but no more than MAX_SKIPPED_TURNS of them
+    assert game.turn == MAX_SKIPPED_TURNS + 1
+    assert game.current_turn_message["turn"] == MAX_SKIPPED_TURNS + 1
+
+    # The last turn still gets answered even though END came right after it
+    while game.turn < turns:
+        assert game.read_next_turn_data()
+    assert game.current_turn_message["turn"] == turns
+    assert not game.read_next_turn_data()
@@ -0,0 +1,144 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from botcore.constants import WALL_SIZE
+from botcore.cover import CoverMap
+from botcore.line_of_sight import LineOfSight
+from botcore.navigation import NavigationGrid
+from botcore.scheduler import Deadline
+
+
+WIDTH = 900.0
+HEIGHT = 500.0
+
+
+def random_walls(seed):
+    """
+    :return: (random generator, static walls, {id: destructible wall}), every wall in a cell of its own of the wall
+        grid, like on the server's maps.
+    """
+    rng = random.Random(seed)
+    cells = rng.sample(range(int(WIDTH // WALL_SIZE) * int(HEIGHT // WALL_SIZE)), 80)
+    positions = [
+        ((cell % int(WIDTH // WALL_SIZE) + 0.5) * WALL_SIZE, (cell // int(WIDTH // WALL_SIZE) + 0.5) * WALL_SIZE)
+        for cell in cells
+    ]
+    destructible_walls = {f"wall-{number}": position for number, position in enumerate(positions[40:])}
+    return rng, positions[:40], destructible_walls
+
+
+def cover_map(walls, destructible_walls):
+    """
+    :return: A CoverMap that isn't built yet, with the walls in its line of sight and navigation grids too.
+    """
+    line_of_sight = LineOfSight(WIDTH, HEIGHT)
+    navigation = NavigationGrid(WIDTH, HEIGHT)
+    cover = CoverMap(line_of_sight, navigation, WIDTH, HEIGHT)
+    for x, y in walls:
+        line_of_sight.add_wall(x, y)
+        navigation.add_wall(x, y)
+    for object_id, (x, y) in destructible_walls.items():
+        line_of_sight.add_destructible_wall(object_id, x, y)
+        navigation.add_destructible_wall(object_id, x, y)
+        cover.update_wall(object_id, x, y, 3)
+    return cover
+
+
+def remove_wall(cover, object_id):
+    cover.line_of_sight.remove_destructible_wall(object_id)
+    cover.navigation.remove_destructible_wall(object_id)
+    cover.remove_wall(object_id)
+
+
+def test_blocked_by_walls():
+    # A column of static walls between the left and right of the map, with a destructible wall in its gap
+    walls = [(450.0, y) for y in np.arange(9.0, HEIGHT, 18.0) if abs(y - 261.0) > 1]
+    cover = cover_map(walls, {"gap": (450.0, 261.0)})
+    assert cover.build()
+    assert not cover.visible(100.0, 250.0, 800.0, 250.0)
+    assert cover.visible(100.0, 100.0, 300.0, 400.0)
+    assert cover.blocking_wall(100.0, 261.0, 800.0, 261.0) == "gap"
+
+    remove_wall(cover, "gap")
+    assert cover.blocking_wall(100.0, 261.0, 800.0, 261.0) is None
+    assert cover.visible(100.0, 250.0, 800.0, 250.0)
+    assert not cover.visible(100.0, 50.0, 800.0, 50.0)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_batched_build_matches_one_go(seed):
+    _, walls, destructible_walls = random_walls(seed)
+    whole = cover_map(walls, destructible_walls)
+    assert whole.build()
+    batched = cover_map(walls, destructible_walls)
+    batches = 0
+    while not batched.build(Deadline(0.0)):
+        batches += 1
+    assert batches > 0
+    assert np.array_equal(batched._visible, whole._visible)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_removed_walls_match_fresh_build(seed):
+    rng, walls, destructible_walls = random_walls(seed)
+    removed = rng.sample(sorted(destructible_walls), 20)
+    cover = cover_map(walls, destructible_walls)
+    assert cover.build()
+    for object_id in removed:
+        remove_wall(cover, object_id)
+
+    fresh = cover_map(walls, {key: value for key, value in destructible_walls.items() if key not in removed})
+    assert fresh.build()
+    assert np.array_equal(cover._visible, fresh._visible)
+    assert np.array_equal(cover._visible, cover._visible.T)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_restore_matches_build(seed):
+    rng, walls, destructible_walls = random_walls(seed)
+    built = cover_map(walls, destructible_walls)
+    assert built.export() is None
+    assert built.build()
+    remove_wall(built, "wall-0")
+    arrays = built.export()
+
+    # Same walls under other ids, in another order
+    renamed = {f"other-{object_id}": position for object_id, position in reversed(list(destructible_walls.items()))}
+    restored = cover_map(walls, renamed)
+    assert restored.restore(arrays)
+    assert restored.ready
+    # The export is of the map at the start, before wall-0 was destroyed
+    remove_wall(restored, "other-wall-0")
+    assert np.array_equal(restored._visible, built._visible)
+    standing = [object_id for object_id in sorted(renamed) if object_id != "other-wall-0"]
+    for object_id in rng.sample(standing, 10):
+        remove_wall(restored, object_id)
+        remove_wall(built, object_id[len("other-"):])
+    assert np.array_equal(restored._visible, built._visible)
+
+    assert not cover_map(walls, dict(list(destructible_walls.items())[1:])).restore(arrays)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_nearest_cover_matches_brute_force(seed):
+    rng, walls, destructible_walls = random_walls(seed)
+    cover = cover_map(walls, destructible_walls)
+    assert cover.build()
+    for _ in range(20):
+        x, y = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+        enemy_x, enemy_y = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+        hidden = [
+            (cell_x, cell_y) for cell_x, cell_y in cover._centers.tolist()
+            if not cover.visible(cell_x, cell_y, enemy_x, enemy_y) and cover.navigation.is_walkable(cell_x, cell_y)
+        ]
+        found = cover.nearest_cover(x, y, enemy_x, enemy_y)
+        if not hidden:
+            assert found is None
+            continue
+        center = cover._centers[cover.cell_of(x, y)]
+        closest = min(math.hypot(cell_x - center[0], cell_y - center[1]) for cell_x, cell_y in hidden)
+        assert found in [list(cell) for cell in hidden]
+        assert math.isclose(math.hypot(found[0] - center[0], found[1] - center[1]), closest, rel_tol=1e-5)
@@ -0,0 +1,123 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from botcore import geometry
+
+
+WIDTH = 1800.0
+HEIGHT = 1000.0
+
+# Points, segments and rectangles per trial
+SIZE = 50
+
+SEEDS = range(20)
+
+
+def random_point(rng):
+    return [rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)]
+
+
+def random_segment(rng):
+    """
+    :return: A segment on the map, sometimes a degenerate one: zero length, vertical or horizontal.
+    """
+    start = random_point(rng)
+    kind = rng.random()
+    if kind < 0.1:
+        return start, list(start)
+    if kind < 0.2:
+        return start, [start[0], rng.uniform(0, HEIGHT)]
+    if kind < 0.3:
+        return start, [rng.uniform(0, WIDTH), start[1]]
+    return start, random_point(rng)
+
+
+def random_rect(rng):
+    x, y = random_point(rng)
+    size = rng.uniform(0, 200)
+    return [x, y, x + size * rng.random(), y + size * rng.random()]
+
+
+def random_polygon(rng):
+    """
+    :return: A star shaped polygon around a random center, so it's simple but usually not convex.
+    """
+    center_x, center_y = random_point(rng)
+    corners = rng.randint(3, 10)
+    return [
+        [
+            center_x + radius * math.cos(2 * math.pi * index / corners),
+            center_y + radius * math.sin(2 * math.pi * index / corners),
+        ]
+        for index, radius in ((index, rng.uniform(20, 300)) for index in range(corners))
+    ]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_distance_and_angle_are_symmetric(seed):
+    rng = random.Random(seed)
+    for _ in range(SIZE):
+        (x1, y1), (x2, y2) = random_point(rng), random_point(rng)
+        assert math.isclose(geometry.distance(x1, y1, x2, y2), geometry.distance(x2, y2, x1, y1))
+        turned = (geometry.angle(x1, y1, x2, y2) - geometry.angle(x2, y2, x1, y1)) % 360
+        assert math.isclose(turned, 180, abs_tol=1e-9)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_segments_into_a_rect_touch_it(seed):
+    rng = random.Random(seed)
+    for _ in range(SIZE):
+        rect = random_rect(rng)
+        (x1, y1), (x2, y2) = random_segment(rng)
+        # A segment with an end on a corner or inside the rectangle always touches it
+        assert geometry.segment_intersects_rect(rect[0], rect[1], x2, y2, *rect)
+        middle_x, middle_y = (rect[0] + rect[2]) / 2, (rect[1] + rect[3]) / 2
+        assert geometry.segment_intersects_rect(x1, y1, middle_x, middle_y, *rect)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_rect_as_polygon(seed):
+    rng = random.Random(seed)
+    for _ in range(SIZE):
+        rect = random_rect(rng)
+        x, y = random_point(rng)
+        corners = [[rect[0], rect[1]], [rect[2], rect[1]], [rect[2], rect[3]], [rect[0], rect[3]]]
+        strictly_inside = rect[0] < x < rect[2] and rect[1] < y < rect[3]
+        strictly_outside = not (rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3])
+        # Points on an edge can go either way
+        if strictly_inside or strictly_outside:
+            assert geometry.point_in_polygon(x, y, corners) == strictly_inside
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batched_distances_and_angles_match_scalar(seed):
+    rng = random.Random(seed)
+    points = [random_point(rng) for _ in range(SIZE)]
+    others = [random_point(rng) for _ in range(SIZE)]
+    expected = [[geometry.distance(x1, y1, x2, y2) for x2, y2 in others] for x1, y1 in points]
+    assert np.allclose(geometry.distances(points, others), expected)
+    expected = [[geometry.angle(x1, y1, x2, y2) for x2, y2 in others] for x1, y1 in points]
+    assert np.allclose(geometry.angles(points, others), expected)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batched_segments_intersect_rects_match_scalar(seed):
+    rng = random.Random(seed)
+    segments = [random_segment(rng) for _ in range(SIZE)]
+    rects = [random_rect(rng) for _ in range(SIZE)]
+    starts = [segment[0] for segment in segments]
+    ends = [segment[1] for segment in segments]
+    expected = [[geometry.segment_intersects_rect(*start, *end, *rect) for rect in rects] for start, end in segments]
+    assert np.array_equal(geometry.segments_intersect_rects(starts, ends, rects), np.array(expected))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batched_points_in_polygon_match_scalar(seed):
+    rng = random.Random(seed)
+    points = [random_point(rng) for _ in range(SIZE)]
+    polygon = random_polygon(rng)
+    expected = [geometry.point_in_polygon(x, y, polygon) for x, y in points]
+    assert np.array_equal(geometry.points_in_polygon(points, polygon), expected)
@@ -0,0 +1,65 @@
+from botcore.history import DELETED, NEW, WorldHistory
+from botcore.object_types import ObjectTypes
+
+
+TANK = ObjectTypes.TANK.value
+BULLET = ObjectTypes.BULLET.value
+
+MAX_TURNS = 8
+
+
+def bullet(x, tank_id="tank-1"):
+    return {"type": BULLET, "position": [x, 100.0], "velocity": [300.0, 0.0], "tank_id": tank_id}
+
+
+def play(history, turns):
+    """
+    Every turn a new bullet is fired and the one from the turn before is deleted, while the tank stays put.
+    """
+    for turn in range(turns):
+        updated = {f"bullet-{turn}": bullet(float(turn))}
+        if turn == 0:
+            updated["tank-1"] = {"type": TANK, "position": [50.0, 50.0], "hp": 5}
+        history.record(turn, [f"bullet-{turn - 1}"] if turn else [], updated)
+
+
+def test_id_tables_stay_bounded():
+    history = WorldHistory(max_turns=MAX_TURNS)
+    play(history, 5000)
+    # The tank, the live bullet and the bullets that still show up in the kept turns
+    assert len(history._names) <= MAX_TURNS + 4
+    assert len(history._ids) <= MAX_TURNS + 4
+
+
+def test_queries_after_recycling():
+    history = WorldHistory(max_turns=MAX_TURNS)
+    turns = 1000
+    play(history, turns)
+
+    fired = history.fired_by("tank-1", MAX_TURNS)
+    assert [history.name(index) for index in fired.id] == [f"bullet-{turn}" for turn in range(turns - MAX_TURNS, turns)]
+    assert list(fired.turn) == list(range(turns - MAX_TURNS, turns))
+    assert all(history.name(owner) == "tank-1" for owner in fired.owner)
+
+    trail = history.trail(f"bullet-{turns - 3}", MAX_TURNS)
+    assert list(trail.turn) == [turns - 3, turns - 2]
+    assert list(trail.flags) == [NEW, DELETED]
+
+    rows = history.last_turns(MAX_TURNS)
+    names = {history.name(index) for index in rows.id}
+    assert len(names) == len(set(rows.id))
+    assert history.trail("bullet-0", MAX_TURNS).turn.size == 0
+
+
+def test_revived_object_keeps_its_id():
+    history = WorldHistory(max_turns=2)
+    history.record(0, [], {"bullet": bullet(0.0)})
+    history.record(1, ["bullet"], {})
+    history.record(2, [], {"bullet": bullet(5.0)})
+    index = history.intern("bullet")
+    # Back in view, so its id isn't handed out again while other bullets come and go
+    for turn in range(3, 20):
+        history.record(turn, [f"other-{turn - 1}"], {f"other-{turn}": bullet(float(turn))})
+        assert history.intern(f"other-{turn}") != index
+    assert history.intern("bullet") == index
+    assert history.name(index) == "bullet"
@@ -0,0 +1,61 @@
+import math
+
+import pytest
+
+from botcore import hit_table
+from botcore.constants import TANK_SPEED, TICK_DURATION
+from botcore.hit_table import FALLBACK_RANGE, HitTable
+from botcore.tracker import MotionTracker
+
+
+# Close range: a stationary tank this near with nothing in the way is always worth a shot
+CLOSE_RANGE = 300.0
+
+X, Y = 900.0, 500.0
+
+
+def around(distance, directions=24):
+    """
+    :return: Points at the given distance from (X, Y), all the way round.
+    """
+    angles = [2 * math.pi * index / directions for index in range(directions)]
+    return [(X + distance * math.cos(angle), Y + distance * math.sin(angle)) for angle in angles]
+
+
+@pytest.mark.parametrize("table", [HitTable.load(), HitTable()], ids=["table", "fallback"])
+def test_stationary_target_at_close_range_passes(table):
+    for distance in range(20, int(CLOSE_RANGE) + 1, 10):
+        for enemy_x, enemy_y in around(distance):
+            assert table.should_shoot(X, Y, enemy_x, enemy_y, 0.0, 0.0), (distance, enemy_x, enemy_y)
+
+
+def test_fallback_is_by_range():
+    table = HitTable()
+    assert not table.available
+    assert table.should_shoot(X, Y, X + FALLBACK_RANGE - 1, Y, TANK_SPEED, 0.0)
+    assert not table.should_shoot(X, Y, X + FALLBACK_RANGE + 1, Y, 0.0, 0.0)
+
+
+def test_situation():
+    distance, bearing, speed = hit_table.situation(0.0, 0.0, 100.0, 0.0, 0.0, TANK_SPEED)
+    assert (distance, bearing, speed) == (100.0, 90.0, TANK_SPEED)
+    assert hit_table.situation(0.0, 0.0, 100.0, 0.0, -TANK_SPEED, 0.0)[1] == 180.0
+    assert hit_table.situation(0.0, 0.0, 100.0, 0.0, 0.0, 0.0)[1:] == (0.0, 0.0)
+
+
+def test_gate_agrees_with_the_lead():
+    # A tank crossing in front of us at full speed, sent without a velocity like the bots sometimes get it
+    tracker = MotionTracker()
+    for turn in range(30):
+        tracker.update(X - 50.0 + TANK_SPEED * turn * TICK_DURATION, Y + 150.0, turn)
+    enemy_x, enemy_y = tracker.x, tracker.y
+
+    # The lead aims ahead of the tank, so the gate has to see it moving, not the server's missing velocity as 0
+    aim_x, aim_y, _ = tracker.intercept(X, Y)
+    assert aim_x > enemy_x
+    _, bearing, speed = hit_table.situation(X, Y, enemy_x, enemy_y, tracker.vx, tracker.vy)
+    assert math.isclose(speed, TANK_SPEED, rel_tol=0.05)
+    assert 45.0 < bearing < 135.0
+
+    # And a crossing tank this close is still worth leading a shot at
+    assert HitTable.load().should_shoot(X, Y, enemy_x, enemy_y, tracker.vx, tracker.vy)
@@ -0,0 +1,90 @@
+import math
+import random
+
+import pytest
+
+from botcore.line_of_sight import (
+    BLOCKED_BY_DESTRUCTIBLE_WALL, BLOCKED_BY_WALL, CLEAR, DESTRUCTIBLE_FLAG, WALL_FLAG, LineOfSight,
+)
+
+
+WIDTH = 1800.0
+HEIGHT = 1000.0
+
+
+def brute_force_trace(line_of_sight, x1, y1, x2, y2, include_destructible=True):
+    """
+    Same answer as LineOfSight.trace, worked out the slow way: split the segment wherever it crosses a grid line, and
+    look at the cell around the middle of every piece in order, except the first and the last piece.
+    """
+    size = line_of_sight.cell_size
+    crossings = {0.0, 1.0}
+    for start, end in ((x1, x2), (y1, y2)):
+        if start != end:
+            low, high = sorted((start, end))
+            for line in range(math.ceil(low / size), math.floor(high / size) + 1):
+                crossings.add((line * size - start) / (end - start))
+    crossings = sorted(t for t in crossings if 0.0 <= t <= 1.0)
+    mask = WALL_FLAG | DESTRUCTIBLE_FLAG if include_destructible else WALL_FLAG
+    for t1, t2 in list(zip(crossings, crossings[1:]))[1:-1]:
+        t = (t1 + t2) / 2
+        cell_x, cell_y = int((x1 + t * (x2 - x1)) // size), int((y1 + t * (y2 - y1)) // size)
+        if 0 <= cell_x < line_of_sight.columns and 0 <= cell_y < line_of_sight.rows:
+            flags = line_of_sight.flags[cell_y * line_of_sight.columns + cell_x] & mask
+            if flags:
+                return BLOCKED_BY_WALL if flags & WALL_FLAG else BLOCKED_BY_DESTRUCTIBLE_WALL
+    return CLEAR
+
+
+def random_map(rng, walls=150, destructible_walls=50):
+    line_of_sight = LineOfSight(WIDTH, HEIGHT)
+    for _ in range(walls):
+        line_of_sight.add_wall(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+    for number in range(destructible_walls):
+        line_of_sight.add_destructible_wall(f"wall-{number}", rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+    return line_of_sight
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_trace_matches_brute_force(seed):
+    rng = random.Random(seed)
+    line_of_sight = random_map(rng)
+    for _ in range(300):
+        x1, y1 = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+        if rng.random() < 0.2:
+            # Straight along a row or a column
+            x2, y2 = (x1, rng.uniform(0, HEIGHT)) if rng.random() < 0.5 else (rng.uniform(0, WIDTH), y1)
+        else:
+            x2, y2 = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+        for include_destructible in (True, False):
+            expected = brute_force_trace(line_of_sight, x1, y1, x2, y2, include_destructible)
+            assert line_of_sight.trace(x1, y1, x2, y2, include_destructible) == expected, (x1, y1, x2, y2)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_destroyed_walls_clear_the_way(seed):
+    rng = random.Random(seed)
+    line_of_sight = random_map(rng)
+    segments = [
+        (rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT), rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+        for _ in range(200)
+    ]
+    # Fill the cache first, removing walls has to drop it
+    for segment in segments:
+        line_of_sight.trace(*segment)
+    for number in range(0, 50, 2):
+        line_of_sight.remove_destructible_wall(f"wall-{number}")
+    line_of_sight.remove_destructible_wall("unknown")
+    for segment in segments:
+        assert line_of_sight.trace(*segment) == brute_force_trace(line_of_sight, *segment)
+
+
+def test_overlapping_destructible_walls():
+    line_of_sight = LineOfSight(WIDTH, HEIGHT)
+    line_of_sight.add_destructible_wall("first", 900, 500)
+    line_of_sight.add_destructible_wall("second", 905, 500)
+    line_of_sight.remove_destructible_wall("first")
+    # The cells both walls covered are still blocked by the one that's left
+    assert line_of_sight.trace(800, 500, 1000, 500) == BLOCKED_BY_DESTRUCTIBLE_WALL
+    line_of_sight.remove_destructible_wall("second")
+    assert line_of_sight.has_line_of_sight(800, 500, 1000, 500)
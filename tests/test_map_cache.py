@@ -0,0 +1,47 @@
+import numpy as np
+
+from botcore import map_cache
+
+
+WALLS = [(9.0, 9.0), (27.0, 9.0), (900.0, 500.0)]
+DESTRUCTIBLE_WALLS = [(450.0, 450.0), (468.0, 450.0)]
+
+
+def test_same_map_in_any_order_has_same_key():
+    first = map_cache.fingerprint(1800, 1000, WALLS, DESTRUCTIBLE_WALLS, "cover", 18.0)
+    second = map_cache.fingerprint(1800.0, 1000.0, reversed(WALLS), reversed(DESTRUCTIBLE_WALLS), "cover", 18.0)
+    assert first == second
+
+
+def test_moved_wall_changes_key():
+    moved = [(9.0, 9.0), (27.0, 9.0), (918.0, 500.0)]
+    assert (
+        map_cache.fingerprint(1800, 1000, WALLS, DESTRUCTIBLE_WALLS)
+        != map_cache.fingerprint(1800, 1000, moved, DESTRUCTIBLE_WALLS)
+    )
+
+
+def test_wall_kind_and_settings_change_key():
+    key = map_cache.fingerprint(1800, 1000, WALLS, DESTRUCTIBLE_WALLS, "cover", 18.0)
+    # The same positions, but one of them destructible
+    assert key != map_cache.fingerprint(1800, 1000, WALLS[:-1], DESTRUCTIBLE_WALLS + WALLS[-1:], "cover", 18.0)
+    assert key != map_cache.fingerprint(1800, 1000, WALLS, DESTRUCTIBLE_WALLS, "cover", 36.0)
+    assert key != map_cache.fingerprint(1000, 1800, WALLS, DESTRUCTIBLE_WALLS, "cover", 18.0)
+
+
+def test_saved_arrays_load_back(tmp_path, monkeypatch):
+    monkeypatch.setenv(map_cache.ENVIRONMENT_VARIABLE, str(tmp_path))
+    key = map_cache.fingerprint(1800, 1000, WALLS, DESTRUCTIBLE_WALLS)
+    arrays = {"cover": np.arange(12, dtype=np.float32).reshape(3, 4), "flags": np.array([1, 0, 1], dtype=np.uint8)}
+    assert map_cache.save(key, arrays) is not None
+    loaded = map_cache.load(key)
+    assert loaded.keys() == arrays.keys()
+    for name, array in arrays.items():
+        assert loaded[name].dtype == array.dtype
+        assert np.array_equal(loaded[name], array)
+
+
+def test_cache_off(monkeypatch):
+    monkeypatch.setenv(map_cache.ENVIRONMENT_VARIABLE, "off")
+    assert map_cache.directories() == []
+    assert map_cache.load(map_cache.fingerprint(1800, 1000, WALLS, DESTRUCTIBLE_WALLS)) is None
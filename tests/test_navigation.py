@@ -0,0 +1,76 @@
+import math
+import random
+
+import pytest
+
+from botcore.constants import WALL_SIZE
+from botcore.navigation import NavigationGrid
+
+
+WIDTH = 900.0
+HEIGHT = 500.0
+
+
+def build(walls, destructible_walls):
+    navigation = NavigationGrid(WIDTH, HEIGHT)
+    for x, y in walls:
+        navigation.add_wall(x, y)
+    for object_id, (x, y) in destructible_walls.items():
+        navigation.add_destructible_wall(object_id, x, y)
+    return navigation
+
+
+def assert_same_field(patched, fresh):
+    assert len(patched) == len(fresh)
+    for cell, (patched_distance, fresh_distance) in enumerate(zip(patched, fresh)):
+        if math.isinf(fresh_distance):
+            assert math.isinf(patched_distance), cell
+        else:
+            assert math.isclose(patched_distance, fresh_distance), cell
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_patched_fields_match_fresh_build(seed):
+    rng = random.Random(seed)
+    walls = [(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for _ in range(150)]
+    destructible_walls = {
+        f"wall-{number}": (rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for number in range(60)
+    }
+    navigation = build(walls, destructible_walls)
+    # Targets anywhere, including under the destructible walls themselves
+    targets = [(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for _ in range(6)]
+    targets += [destructible_walls[f"wall-{number}"] for number in range(0, 60, 10)]
+    for x, y in targets:
+        navigation.distance_field(x, y)
+
+    destroyed = rng.sample(sorted(destructible_walls), 30)
+    for object_id in destroyed:
+        navigation.remove_destructible_wall(object_id)
+    left = {object_id: position for object_id, position in destructible_walls.items() if object_id not in destroyed}
+    fresh = build(walls, left)
+    for x, y in targets:
+        assert navigation.has_distance_field(x, y)
+        assert_same_field(navigation.distance_field(x, y), fresh.distance_field(x, y))
+
+
+def test_target_under_destroyed_wall():
+    navigation = NavigationGrid(WIDTH, HEIGHT)
+    x, y = 450.0 + WALL_SIZE / 2, 250.0 + WALL_SIZE / 2
+    navigation.add_destructible_wall("wall", x, y)
+    assert math.isinf(navigation.path_distance(100, 250, x, y))
+
+    navigation.remove_destructible_wall("wall")
+    distance = navigation.path_distance(100, 250, x, y)
+    assert math.isclose(distance, NavigationGrid(WIDTH, HEIGHT).path_distance(100, 250, x, y))
+    assert distance < math.inf
+
+
+def test_walls_make_paths_longer():
+    navigation = NavigationGrid(WIDTH, HEIGHT)
+    straight = navigation.path_distance(100, 250, 800, 250)
+    assert math.isclose(straight, round((800 - 100) / WALL_SIZE) * WALL_SIZE, abs_tol=WALL_SIZE)
+    # A wall across the middle, with a gap at the top
+    for y in range(int(WALL_SIZE), int(HEIGHT), int(WALL_SIZE)):
+        navigation.add_wall(450, y + WALL_SIZE / 2)
+    around = navigation.path_distance(100, 250, 800, 250)
+    assert straight < around < math.inf
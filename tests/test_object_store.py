@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from botcore.object_store import ObjectStore
+from botcore.object_types import ObjectTypes
+
+
+TANK = ObjectTypes.TANK.value
+BULLET = ObjectTypes.BULLET.value
+CLOSING_BOUNDARY = ObjectTypes.CLOSING_BOUNDARY.value
+
+BUCKETS = {
+    ObjectTypes.WALL.value: "walls",
+    ObjectTypes.DESTRUCTIBLE_WALL.value: "destructible_walls",
+    ObjectTypes.BOUNDARY.value: "boundaries",
+    ObjectTypes.POWERUP.value: "powerups",
+    TANK: "tanks",
+    BULLET: "bullets",
+}
+
+
+def random_object(rng, object_type):
+    game_object = {"type": object_type, "position": [rng.uniform(0, 1800), rng.uniform(0, 1000)]}
+    if object_type in (TANK, BULLET):
+        game_object["velocity"] = [rng.uniform(-150, 150), rng.uniform(-150, 150)]
+    return game_object
+
+
+def check_buckets(store):
+    """
+    Every bucket holds exactly the objects of its type, the same ones as the flat dict.
+    """
+    for object_type, name in BUCKETS.items():
+        expected = {object_id for object_id, game_object in store.objects.items() if game_object["type"] == object_type}
+        assert set(getattr(store, name)) == expected, name
+        assert set(store.bucket(object_type)) == expected, name
+    closing = [object_id for object_id, game_object in store.objects.items()
+               if game_object["type"] == CLOSING_BOUNDARY]
+    assert closing == ([store.closing_boundary_id] if store.closing_boundary is not None else [])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_buckets_follow_deltas(seed):
+    rng = random.Random(seed)
+    store = ObjectStore()
+    types = list(BUCKETS) + [CLOSING_BOUNDARY]
+    next_id = 0
+    for _ in range(50):
+        existing = list(store.objects)
+        deleted = rng.sample(existing, min(len(existing), rng.randint(0, 3))) + ["never-seen"]
+        updated = {object_id: random_object(rng, store[object_id]["type"]) for object_id in existing[:5]}
+        for _ in range(rng.randint(0, 5)):
+            object_type = rng.choice(types)
+            # There's only ever one closing boundary, sent again when it moves
+            object_id = "closing-boundary" if object_type == CLOSING_BOUNDARY else f"object-{next_id}"
+            updated[object_id] = random_object(rng, object_type)
+            next_id += 1
+        store.apply(deleted, updated)
+        check_buckets(store)
+        assert len(store) == len(store.objects)
+
+
+def test_tank_and_bullet_records_update_in_place():
+    store = ObjectStore()
+    store.apply((), {
+        "tank": {"type": TANK, "position": [10, 20], "velocity": [1, 2], "hp": 5},
+        "bullet": {"type": BULLET, "position": [30, 40], "velocity": [3, 4], "tank_id": "tank", "damage": 1},
+    })
+    tank, bullet = store.tanks["tank"], store.bullets["bullet"]
+    store.apply((), {"tank": {"type": TANK, "position": [11, 21]}})
+    assert store.tanks["tank"] is tank
+    # No velocity sent means standing still, and the hp is kept from before
+    assert (tank.x, tank.y, tank.vx, tank.vy, tank.hp) == (11.0, 21.0, 0.0, 0.0, 5.0)
+    assert (bullet.x, bullet.y, bullet.vx, bullet.vy, bullet.tank_id) == (30.0, 40.0, 3.0, 4.0, "tank")
+    store.apply(["bullet"], {})
+    assert "bullet" not in store and "bullet" not in store.bullets
@@ -0,0 +1,119 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from botcore.boundary import ClosingBoundary
+from botcore.navigation import NavigationGrid
+from botcore.routes import ENEMY_RISK, MAX_CANDIDATES, MAX_STOPS, NO_ROUTE, TANK_SPEED_PER_TURN, RoutePlanner
+
+
+WIDTH = 900.0
+HEIGHT = 500.0
+
+POWERUP_TYPES = ("HEALTH", "DAMAGE", "SPEED", "BULLET_SPEED")
+
+
+def powerup_values(navigation, planner, powerups, x, y, enemy=None):
+    """
+    :param powerups: {powerup-id: (x, y, type)}
+    :return: {powerup-id: what it's worth to a tank at (x, y)}
+    """
+    values = {}
+    for object_id, (px, py, powerup_type) in powerups.items():
+        value = planner.powerup_values[powerup_type]
+        if enemy is not None and navigation.path_distance(*enemy, px, py) < navigation.path_distance(x, y, px, py):
+            value *= 1 - ENEMY_RISK
+        values[object_id] = value
+    return values
+
+
+def brute_force_score(navigation, powerups, values, x, y, boundary=None):
+    """
+    :return: The best value minus walking distance over every order of every few powerups, at least 0.
+    """
+    best = 0.0
+    for stops in range(1, MAX_STOPS + 1):
+        for order in itertools.permutations(powerups, stops):
+            walked = 0.0
+            at_x, at_y = x, y
+            for object_id in order:
+                px, py, _ = powerups[object_id]
+                walked += navigation.path_distance(at_x, at_y, px, py)
+                if boundary is not None and walked >= boundary.turns_until_outside(px, py) * TANK_SPEED_PER_TURN:
+                    walked = math.inf
+                at_x, at_y = px, py
+            best = max(best, sum(values[object_id] for object_id in order) - walked)
+    return best
+
+
+def random_setup(seed):
+    rng = random.Random(seed)
+    navigation = NavigationGrid(WIDTH, HEIGHT)
+    for _ in range(60):
+        navigation.add_wall(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+    planner = RoutePlanner(navigation)
+    powerups = {}
+    while len(powerups) < MAX_CANDIDATES:
+        px, py = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+        if navigation.is_walkable(px, py):
+            powerups[f"powerup-{len(powerups)}"] = (px, py, rng.choice(POWERUP_TYPES))
+    for object_id, (px, py, powerup_type) in powerups.items():
+        planner.add(object_id, px, py, powerup_type)
+    return rng, navigation, planner, powerups
+
+
+def assert_route(navigation, route, values, x, y, expected):
+    assert math.isclose(route.score, expected)
+    if not expected:
+        assert route == NO_ROUTE
+        return
+    assert 1 <= len(route.stops) <= MAX_STOPS
+    assert len(set(route.stops)) == len(route.stops)
+    walked = 0.0
+    for px, py in route.points:
+        walked += navigation.path_distance(x, y, px, py)
+        x, y = px, py
+    assert math.isclose(route.score, sum(values[object_id] for object_id in route.stops) - walked)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_brute_force(seed):
+    rng, navigation, planner, powerups = random_setup(seed)
+    x, y = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+    values = powerup_values(navigation, planner, powerups, x, y)
+    route = planner.plan(x, y)
+    assert_route(navigation, route, values, x, y, brute_force_score(navigation, powerups, values, x, y))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_enemy_halves_value(seed):
+    rng, navigation, planner, powerups = random_setup(seed)
+    x, y = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+    enemy = (rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+    values = powerup_values(navigation, planner, powerups, x, y, enemy)
+    route = planner.plan(x, y, enemy=enemy)
+    assert_route(navigation, route, values, x, y, brute_force_score(navigation, powerups, values, x, y))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_boundary_excludes_late_stops(seed):
+    rng, navigation, planner, powerups = random_setup(seed)
+    x, y = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+    boundary = ClosingBoundary()
+    boundary.update({"type": 6, "position": [[0, HEIGHT], [0, 0], [WIDTH, 0], [WIDTH, HEIGHT]]}, 0)
+    boundary.update({"type": 6, "position": [[5, HEIGHT - 5], [5, 5], [WIDTH - 5, 5], [WIDTH - 5, HEIGHT - 5]]}, 1)
+    values = powerup_values(navigation, planner, powerups, x, y)
+    route = planner.plan(x, y, boundary=boundary)
+    expected = brute_force_score(navigation, powerups, values, x, y, boundary)
+    assert_route(navigation, route, values, x, y, expected)
+
+
+def test_no_route_when_not_worth_walking():
+    navigation = NavigationGrid(WIDTH, HEIGHT)
+    planner = RoutePlanner(navigation, {"SPEED": 10.0})
+    planner.add("powerup", 800.0, 400.0, "SPEED")
+    assert planner.plan(50.0, 50.0) == NO_ROUTE
+    planner.remove("powerup")
+    assert len(planner) == 0
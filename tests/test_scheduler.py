@@ -0,0 +1,83 @@
+import threading
+import time
+
+from botcore.object_types import ObjectTypes
+from botcore.scheduler import Deadline, Stage, TurnScheduler
+
+
+# Long enough past a short deadline that the scheduler gives up on a stage
+OVERRUN = 0.2
+
+
+def test_higher_priority_wins_and_fallback_fills_the_rest():
+    scheduler = TurnScheduler()
+    action = scheduler.run(
+        [
+            Stage("first", lambda deadline: {"path": [1, 1]}),
+            Stage("second", lambda deadline: {"path": [2, 2], "shoot": 90}),
+            Stage("skipped", lambda deadline: {"shoot": 0}, decides=("shoot",)),
+        ],
+        Deadline.after(1.0),
+        {"path": [0, 0], "shoot": None, "other": 1},
+    )
+    assert action == {"path": [1, 1], "shoot": 90, "other": 1}
+    assert "skipped" not in scheduler.stage_times
+    scheduler.shutdown()
+
+
+def test_failing_stage_is_skipped():
+    def broken(deadline):
+        raise ValueError("bug")
+
+    scheduler = TurnScheduler()
+    action = scheduler.run([Stage("broken", broken), Stage("fine", lambda deadline: {"shoot": 1})], Deadline.after(1.0))
+    assert action == {"shoot": 1}
+    assert scheduler.failed_stages["broken"] == 1
+    scheduler.shutdown()
+
+
+def test_overrunning_background_stage():
+    finished = threading.Event()
+
+    def slow(deadline):
+        time.sleep(OVERRUN)
+        finished.set()
+        return {"shoot": 1}
+
+    scheduler = TurnScheduler()
+    started = time.perf_counter()
+    action = scheduler.run([Stage("slow", slow, background=True)], Deadline.after(0.02))
+    assert time.perf_counter() - started < OVERRUN
+    assert action == {}
+    assert scheduler.missed_stages["slow"] == 1
+
+    # The next turn doesn't start another one while it's busy
+    scheduler.run([Stage("slow", slow, background=True)], Deadline.after(0.01))
+    assert scheduler.missed_stages["slow"] == 2
+
+    scheduler.wait_for_background()
+    assert finished.is_set()
+    assert scheduler.background_waits == 1
+    scheduler.shutdown()
+
+
+def test_next_turn_waits_for_overrunning_stage(start_game):
+    game = start_game()
+    enemy = game.store.tanks[game.enemy_tank_id]
+    seen = []
+
+    def slow(deadline):
+        # Reads the state, takes too long, and reads it again
+        seen.append((enemy.x, enemy.y))
+        time.sleep(OVERRUN)
+        seen.append((enemy.x, enemy.y))
+
+    game.scheduler.run([Stage("slow", slow, background=True)], Deadline.after(0.02))
+    assert len(seen) == 1
+
+    moved = {"type": ObjectTypes.TANK.value, "position": [1600, 800], "hp": 5}
+    game.apply_turn_message({"message": {"deleted_objects": [], "updated_objects": {game.enemy_tank_id: moved}}})
+    # The stage saw the same state from start to end, and the turn's changes came after it
+    assert seen[0] == seen[1]
+    assert (enemy.x, enemy.y) == (1600.0, 800.0)
+    game.scheduler.shutdown()
@@ -0,0 +1,84 @@
+import math
+import random
+
+import pytest
+
+from botcore.spatial_index import BRUTE_FORCE_LIMIT, SpatialIndex
+
+
+WIDTH = 1800.0
+HEIGHT = 1000.0
+
+WALL, POWERUP = 3, 7
+
+
+def filled_index(rng, count):
+    """
+    :return: (index, {object_id: (x, y)}) with `count` powerups and as many walls at random positions.
+    """
+    index = SpatialIndex()
+    powerups = {}
+    for number in range(count):
+        position = (rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+        index.insert(f"powerup-{number}", POWERUP, *position)
+        powerups[f"powerup-{number}"] = position
+        index.insert(f"wall-{number}", WALL, rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+    return index, powerups
+
+
+@pytest.mark.parametrize("count", [BRUTE_FORCE_LIMIT // 2, 200])
+@pytest.mark.parametrize("seed", range(5))
+def test_nearest_matches_brute_force(seed, count):
+    rng = random.Random(seed)
+    index, powerups = filled_index(rng, count)
+    for _ in range(50):
+        x, y = rng.uniform(-100, WIDTH + 100), rng.uniform(-100, HEIGHT + 100)
+        expected = min(math.hypot(px - x, py - y) for px, py in powerups.values())
+        object_id, position, distance = index.nearest(POWERUP, x, y)
+        assert math.isclose(distance, expected)
+        assert powerups[object_id] == position
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nearest_with_predicate(seed):
+    rng = random.Random(seed)
+    index, powerups = filled_index(rng, 200)
+
+    def inside(px, py):
+        # Like the closing boundary: only the middle of the map counts
+        return 600 <= px <= 1200 and 300 <= py <= 700
+
+    for _ in range(50):
+        x, y = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+        candidates = [math.hypot(px - x, py - y) for px, py in powerups.values() if inside(px, py)]
+        found = index.nearest(POWERUP, x, y, inside)
+        assert math.isclose(found[2], min(candidates))
+        assert inside(*found[1])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_range_and_rect_match_brute_force(seed):
+    rng = random.Random(seed)
+    index, powerups = filled_index(rng, 200)
+    for _ in range(50):
+        x, y, radius = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT), rng.uniform(0, 400)
+        expected = {object_id for object_id, (px, py) in powerups.items() if math.hypot(px - x, py - y) <= radius}
+        assert {object_id for object_id, _ in index.query_range(POWERUP, x, y, radius)} == expected
+
+        x_max, y_max = x + rng.uniform(0, 500), y + rng.uniform(0, 500)
+        expected = {object_id for object_id, (px, py) in powerups.items() if x <= px <= x_max and y <= py <= y_max}
+        assert {object_id for object_id, _ in index.query_rect(POWERUP, x, y, x_max, y_max)} == expected
+
+
+def test_move_and_remove():
+    index = SpatialIndex()
+    assert index.nearest(POWERUP, 0, 0) is None
+    index.insert("powerup", POWERUP, 100, 100)
+    index.insert("powerup", POWERUP, 900, 500)
+    assert len(index) == 1
+    assert index.nearest(POWERUP, 0, 0)[1] == (900, 500)
+    assert index.query_range(POWERUP, 100, 100, 50) == []
+    index.remove("powerup")
+    index.remove("unknown")
+    assert "powerup" not in index
+    assert index.nearest(POWERUP, 0, 0) is None
@@ -0,0 +1,127 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from botcore.constants import BULLET_SPEED, TICK_DURATION
+from botcore.line_of_sight import DESTRUCTIBLE_FLAG, WALL_FLAG, LineOfSight
+from botcore.threats import HIT_RADIUS, BulletThreats
+
+
+WIDTH = 900.0
+HEIGHT = 500.0
+TICKS = 30
+
+
+def random_map(rng):
+    line_of_sight = LineOfSight(WIDTH, HEIGHT)
+    for _ in range(40):
+        line_of_sight.add_wall(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+    for number in range(15):
+        line_of_sight.add_destructible_wall(f"wall-{number}", rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+    return line_of_sight
+
+
+def flags_at(line_of_sight, cell_x, cell_y):
+    cell_x = min(max(cell_x, 0), line_of_sight.columns - 1)
+    cell_y = min(max(cell_y, 0), line_of_sight.rows - 1)
+    return line_of_sight.flags[cell_y * line_of_sight.columns + cell_x]
+
+
+def scalar_project(line_of_sight, x, y, vx, vy, ticks=TICKS):
+    """
+    One bullet moved one tick at a time in plain Python, by the same rules as BulletThreats.project.
+    :return: [(x, y) or None once it's destroyed] per tick.
+    """
+    size = line_of_sight.cell_size
+    alive = True
+    positions = []
+    for _ in range(ticks):
+        moved_x, moved_y = x + vx * TICK_DURATION, y + vy * TICK_DURATION
+        outside = False
+        if not 0 <= moved_x <= WIDTH:
+            vx, outside = -vx, True
+        if not 0 <= moved_y <= HEIGHT:
+            vy, outside = -vy, True
+        old_x, old_y = int(x // size), int(y // size)
+        new_x, new_y = int(moved_x // size), int(moved_y // size)
+        flags = flags_at(line_of_sight, new_x, new_y)
+        hit_wall = bool(flags & WALL_FLAG)
+        if hit_wall:
+            along_x = bool(flags_at(line_of_sight, new_x, old_y) & WALL_FLAG)
+            along_y = bool(flags_at(line_of_sight, old_x, new_y) & WALL_FLAG)
+            if along_x or not along_y:
+                vx = -vx
+            if along_y or not along_x:
+                vy = -vy
+        if hit_wall or outside:
+            moved_x, moved_y = x + vx * TICK_DURATION, y + vy * TICK_DURATION
+        if flags & DESTRUCTIBLE_FLAG:
+            alive = False
+        x, y = moved_x, moved_y
+        positions.append((x, y) if alive else None)
+    return positions
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_projection_matches_scalar(seed):
+    rng = random.Random(seed)
+    line_of_sight = random_map(rng)
+    threats = BulletThreats(line_of_sight, WIDTH, HEIGHT, "me", capacity=4)
+    bullets = {}
+    for number in range(20):
+        angle = rng.uniform(0, 2 * math.pi)
+        bullet = (rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT), BULLET_SPEED * math.cos(angle),
+                  BULLET_SPEED * math.sin(angle))
+        bullets[f"bullet-{number}"] = bullet
+        threats.update(f"bullet-{number}", *bullet, "enemy")
+    # Removing some moves others into their rows, which has to keep every bullet's state with its id
+    for number in range(0, 20, 3):
+        threats.remove(f"bullet-{number}")
+        del bullets[f"bullet-{number}"]
+    threats.remove("unknown")
+    assert len(threats) == len(bullets)
+
+    trajectory = threats.project(TICKS)
+    assert trajectory.shape == (TICKS, len(bullets), 2)
+    # Columns are in no particular order, every bullet has to match one of them
+    unmatched = list(range(len(bullets)))
+    for bullet in bullets.values():
+        expected = np.array([
+            (np.nan, np.nan) if position is None else position
+            for position in scalar_project(line_of_sight, *bullet)
+        ])
+        matches = [column for column in unmatched if np.allclose(trajectory[:, column], expected, equal_nan=True)]
+        assert matches, bullet
+        unmatched.remove(matches[0])
+
+
+def test_own_bullets_are_not_threats():
+    threats = BulletThreats(LineOfSight(WIDTH, HEIGHT), WIDTH, HEIGHT, "me")
+    threats.update("mine", 100, 250, BULLET_SPEED, 0, "me")
+    assert threats.project(TICKS).shape == (TICKS, 0, 2)
+    assert threats.project(TICKS, hostile_only=False).shape == (TICKS, 1, 2)
+    assert threats.time_to_impact(300, 250) == math.inf
+
+
+def test_time_to_impact():
+    threats = BulletThreats(LineOfSight(WIDTH, HEIGHT), WIDTH, HEIGHT, "me")
+    threats.update("incoming", 100, 250, BULLET_SPEED, 0, "enemy")
+    seconds = threats.time_to_impact(300, 250)
+    # It hits once it's within HIT_RADIUS of our center, one tick at a time
+    expected = math.ceil((200 - HIT_RADIUS) / (BULLET_SPEED * TICK_DURATION)) * TICK_DURATION
+    assert math.isclose(seconds, expected)
+    # Off to the side it misses
+    assert threats.time_to_impact(300, 250 + 2 * HIT_RADIUS) == math.inf
+
+
+def test_dodge_gets_out_of_the_way():
+    threats = BulletThreats(LineOfSight(WIDTH, HEIGHT), WIDTH, HEIGHT, "me")
+    threats.update("incoming", 100, 250, BULLET_SPEED, 0, "enemy")
+    dodge = threats.plan_dodge(400, 250)
+    assert dodge is not None
+    assert threats.time_to_impact(*dodge) == math.inf
+    # Nothing coming, nothing to dodge
+    threats.remove("incoming")
+    assert threats.plan_dodge(400, 250) is None
@@ -0,0 +1,100 @@
+import math
+import types
+
+from botcore.constants import TANK_SPEED, TICK_DURATION
+from botcore.game import BaseGame
+from botcore.object_store import ObjectStore
+from botcore.object_types import ObjectTypes
+from botcore.tracker import HISTORY_SIZE, MAX_GAP, MotionTracker
+
+
+ENEMY = "enemy"
+
+
+def enemy_game():
+    """
+    :return: Just enough of a BaseGame for `track_objects` to follow the enemy tank.
+    """
+    return types.SimpleNamespace(
+        enemy_tank_id=ENEMY, store=ObjectStore(), enemy_tracker=MotionTracker(), turn=0,
+        TRACKED_TYPES=BaseGame.TRACKED_TYPES,
+    )
+
+
+def drive(game, turns, vx, vy, send_velocity):
+    """
+    Moves the enemy at a constant velocity for the given number of turns, one tick each.
+    """
+    for turn in range(turns):
+        game.turn = turn
+        enemy = {
+            "type": ObjectTypes.TANK.value,
+            "position": [100.0 + vx * turn * TICK_DURATION, 200.0 + vy * turn * TICK_DURATION],
+            "hp": 5,
+        }
+        if send_velocity:
+            enemy["velocity"] = [vx, vy]
+        game.store.apply((), {ENEMY: enemy})
+        BaseGame.track_objects(game, {ENEMY: enemy})
+
+
+def test_estimates_velocity_without_velocity_field():
+    game = enemy_game()
+    drive(game, 30, TANK_SPEED, 0.0, send_velocity=False)
+    tracker = game.enemy_tracker
+    assert math.isclose(tracker.vx, TANK_SPEED, rel_tol=0.05)
+    assert abs(tracker.vy) < 1.0
+
+
+def test_uses_velocity_field_when_sent():
+    game = enemy_game()
+    drive(game, 30, 0.0, -TANK_SPEED, send_velocity=True)
+    tracker = game.enemy_tracker
+    assert abs(tracker.vx) < 1.0
+    assert math.isclose(tracker.vy, -TANK_SPEED, rel_tol=0.01)
+
+
+def test_leads_a_moving_target():
+    tracker = MotionTracker()
+    for turn in range(30):
+        tracker.update(500.0 + TANK_SPEED * turn * TICK_DURATION, 500.0, turn)
+    aim_x, aim_y, seconds = tracker.intercept(tracker.x, 100.0)
+    assert seconds > 0
+    assert aim_x > tracker.x
+    assert math.isclose(aim_y, 500.0, abs_tol=1.0)
+
+
+def test_history_wraps_around():
+    tracker = MotionTracker()
+    turns = HISTORY_SIZE * 2 + 5
+    for turn in range(turns):
+        tracker.update(float(turn), -float(turn), turn)
+    assert tracker.count == HISTORY_SIZE
+    for ago in range(HISTORY_SIZE):
+        turn = turns - 1 - ago
+        assert tracker.position_ago(ago) == (float(turn), -float(turn), turn)
+    assert tracker.position_ago(HISTORY_SIZE) is None
+    assert tracker.position_ago(-1) is None
+
+
+def test_resets_after_a_long_gap():
+    tracker = MotionTracker()
+    for turn in range(20):
+        tracker.update(100.0 + TANK_SPEED * turn * TICK_DURATION, 100.0, turn)
+    assert tracker.vx > 0
+    turn = 19 + MAX_GAP + 1
+    tracker.update(900.0, 700.0, turn)
+    assert (tracker.x, tracker.y) == (900.0, 700.0)
+    assert (tracker.vx, tracker.vy, tracker.ax, tracker.ay) == (0.0, 0.0, 0.0, 0.0)
+    assert tracker.predict(1.0) == (900.0, 700.0)
+    # The old positions stay in the history
+    assert tracker.position_ago(1)[2] == 19
+
+
+def test_predicts_constant_velocity():
+    tracker = MotionTracker()
+    for turn in range(60):
+        tracker.update(100.0 + TANK_SPEED * turn * TICK_DURATION, 300.0, turn, TANK_SPEED, 0.0)
+    x, y = tracker.predict(1.0)
+    assert math.isclose(x, tracker.x + TANK_SPEED, rel_tol=0.01)
+    assert math.isclose(y, 300.0, abs_tol=1.0)
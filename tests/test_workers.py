@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+import pytest
+
+from botcore.scheduler import Deadline
+from botcore.search import BATCH_ROLLOUTS, play_batch
+from botcore.workers import MAX_PATHS, WorkerPool
+
+
+SEED = 7
+BATCHES = 3
+
+WIDTH = 1800.0
+HEIGHT = 1000.0
+
+# Workers are spawned and import NumPy, which can take a while on a busy machine
+START_TIMEOUT = 60.0
+
+
+def problem():
+    """
+    :return: The arguments of `search.play_batch` after the generator: a few straight paths and shots close to an enemy
+        moving right.
+    """
+    ticks = 20
+    steps = np.arange(1, ticks + 1) / 30.0
+    rng = np.random.default_rng(1)
+    directions = rng.uniform(-1, 1, (6, 1, 2))
+    positions = np.array([400.0, 500.0]) + directions * 150.0 * steps[None, :, None]
+    angles = np.linspace(-0.3, 0.3, 5)
+    bullets = np.array([400.0, 500.0]) + np.stack([np.cos(angles), np.sin(angles)], axis=1)[:, None, :] * (
+        450.0 * steps[None, :, None]
+    )
+    return positions, bullets, (600.0, 500.0, 100.0, 0.0), steps, 0.5, WIDTH, HEIGHT
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(1, seed=SEED)
+    started = time.perf_counter()
+    while not pool.idle_workers:
+        assert time.perf_counter() - started < START_TIMEOUT, "worker never got ready"
+        time.sleep(0.01)
+    yield pool
+    pool.close()
+
+
+def test_matches_play_batch(pool):
+    arguments = problem()
+    assert pool.dispatch(*arguments, batches=BATCHES) == 1
+    hits_dealt, hits_taken, rollouts = pool.collect(Deadline.after(START_TIMEOUT))
+
+    # The worker's generator is seeded with (seed, worker index), so the same batches can be played here
+    rng = np.random.default_rng([SEED, 0])
+    expected_dealt = np.zeros(len(arguments[1]))
+    expected_taken = np.zeros(len(arguments[0]))
+    for _ in range(BATCHES):
+        dealt, taken = play_batch(rng, *arguments)
+        expected_dealt += dealt
+        expected_taken += taken
+    assert rollouts == BATCHES * BATCH_ROLLOUTS
+    assert np.array_equal(hits_dealt, expected_dealt)
+    assert np.array_equal(hits_taken, expected_taken)
+    assert expected_dealt.any()
+    assert pool.idle_workers == 1
+
+
+def test_too_big_problem_is_not_dispatched(pool):
+    positions, *rest = problem()
+    too_many = np.repeat(positions, MAX_PATHS // len(positions) + 1, axis=0)
+    assert pool.dispatch(too_many, *rest, batches=BATCHES) == 0
+    assert pool.idle_workers == 1
+
+
+def test_dead_worker_is_left_out(pool):
+    pool._processes[0].kill()
+    pool._processes[0].join()
+    assert pool.idle_workers == 0
+    assert pool.dispatch(*problem(), batches=BATCHES) == 0
+    hits_dealt, hits_taken, rollouts = pool.collect(Deadline.after(1.0))
+    assert rollouts == 0
@@ -0,0 +1,65 @@
+"""
+Measures how long each installed comms codec takes to parse a recorded message stream.
+
+Usage: python tools/bench_codec.py <recorded-stream.jsonl> [--bot cabbage] [--repeat 5]
+
+The stream is what the game server sends a bot: one JSON message per line, the same thing the bot reads on stdin.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("stream", help="Recorded message stream, one JSON message per line")
+    parser.add_argument("--bot", default="cabbage", help="Which bot's comms module to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="How many times to parse the whole stream")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(REPO_ROOT, args.bot, "src"))
+    from botcore import comms
+
+    with open(args.stream, "rb") as stream:
+        lines = [line for line in stream if line.strip()]
+    total_bytes = sum(len(line) for line in lines)
+    print(f"{len(lines)} messages, {total_bytes / 1024:.1f} KiB")
+
+    for name in comms.CODEC_FACTORIES:
+        try:
+            codec = comms.get_codec(name)
+        except ImportError:
+            print(f"{name:>8}: not installed")
+            continue
+
+        parse_times = []
+        for _ in range(args.repeat):
+            for line in lines:
+                start = time.perf_counter_ns()
+                codec.loads(line)
+                parse_times.append(time.perf_counter_ns() - start)
+
+        messages = [codec.loads(line) for line in lines]
+        start = time.perf_counter_ns()
+        for _ in range(args.repeat):
+            for message in messages:
+                codec.dumps(message)
+        dump_time = (time.perf_counter_ns() - start) / (args.repeat * len(messages))
+
+        parse_times.sort()
+        print(
+            f"{name:>8}: parse mean {statistics.fmean(parse_times) / 1000:8.1f} us"
+            f"  p50 {parse_times[len(parse_times) // 2] / 1000:8.1f} us"
+            f"  max {parse_times[-1] / 1000:8.1f} us"
+            f"  | dump mean {dump_time / 1000:8.1f} us"
+            f"  | {total_bytes * args.repeat / (sum(parse_times) / 1e9) / 2 ** 20:6.1f} MiB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Measures how fast botcore.geometry's batched functions are compared to the scalar ones.
+
+Usage: python tools/bench_geometry.py [--size 200] [--seed 0]
+
+Each function is timed on an N x N problem of random points, segments, rectangles and a polygon on the map, in both
+forms. That both forms agree is checked by tests/test_geometry.py.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+from botcore import geometry
+
+
+WIDTH = 1800.0
+HEIGHT = 1000.0
+
+
+def random_point(rng):
+    return [rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)]
+
+
+def random_segment(rng):
+    start = random_point(rng)
+    kind = rng.random()
+    if kind < 0.1:
+        return start, list(start)
+    if kind < 0.2:
+        return start, [start[0], rng.uniform(0, HEIGHT)]
+    if kind < 0.3:
+        return start, [rng.uniform(0, WIDTH), start[1]]
+    return start, random_point(rng)
+
+
+def random_rect(rng):
+    x, y = random_point(rng)
+    size = rng.uniform(0, 200)
+    return [x, y, x + size * rng.random(), y + size * rng.random()]
+
+
+def random_polygon(rng):
+    """
+    :return: A star shaped polygon around a random center, so it's simple but usually not convex.
+    """
+    center_x, center_y = random_point(rng)
+    corners = rng.randint(3, 10)
+    return [
+        [
+            center_x + radius * math.cos(2 * math.pi * index / corners),
+            center_y + radius * math.sin(2 * math.pi * index / corners),
+        ]
+        for index, radius in ((index, rng.uniform(20, 300)) for index in range(corners))
+    ]
+
+
+def timed(function, repeat=3):
+    """
+    :return: The best of `repeat` runs, in seconds.
+    """
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def benchmark(rng, size):
+    points = [random_point(rng) for _ in range(size)]
+    others = [random_point(rng) for _ in range(size)]
+    segments = [random_segment(rng) for _ in range(size)]
+    rects = [random_rect(rng) for _ in range(size)]
+    polygon = random_polygon(rng)
+    starts = np.array([segment[0] for segment in segments])
+    ends = np.array([segment[1] for segment in segments])
+    many_points = np.array([random_point(rng) for _ in range(size * size)])
+
+    cases = (
+        ("distance", lambda: [geometry.distance(*a, *b) for a in points for b in others],
+         lambda: geometry.distances(points, others)),
+        ("angle", lambda: [geometry.angle(*a, *b) for a in points for b in others],
+         lambda: geometry.angles(points, others)),
+        ("segment_intersects_rect",
+         lambda: [geometry.segment_intersects_rect(*start, *end, *rect) for start, end in segments for rect in rects],
+         lambda: geometry.segments_intersect_rects(starts, ends, rects)),
+        ("point_in_polygon", lambda: [geometry.point_in_polygon(x, y, polygon) for x, y in many_points.tolist()],
+         lambda: geometry.points_in_polygon(many_points, polygon)),
+    )
+    pairs = size * size
+    print(f"{size} x {size} = {pairs} pairs per call")
+    for name, scalar, batched in cases:
+        scalar_time = timed(scalar)
+        batched_time = timed(batched)
+        print(
+            f"  {name:>24}: scalar {pairs / scalar_time / 1e6:7.2f} M/s  batched {pairs / batched_time / 1e6:8.2f} M/s"
+            f"  ({scalar_time / batched_time:5.1f}x)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=200, help="N, the number of points / segments per side")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    benchmark(random.Random(args.seed), args.size)
+
+
+if __name__ == "__main__":
+    main()
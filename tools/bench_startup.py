@@ -0,0 +1,95 @@
+"""
+Measures a bot's cold start: the time from spawning `python src/main.py` to its first response.
+
+Usage: python tools/bench_startup.py <stream.jsonl> [--bot cabbage] [--runs 10] [--delay 0.0]
+
+The bot is fed the stream's tank id message, init messages, END_INIT and first turn, like the game server would, and
+timed until it writes its response to that turn. --delay holds the messages back for that many seconds after the
+spawn, like a server that waits for both bots to connect, to see how much start up work overlaps with the wait.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def first_turn(path):
+    """
+    :return: The lines of the stream up to and including the first turn message.
+    """
+    lines = []
+    after_init = False
+    with open(path, "rb") as stream:
+        for line in stream:
+            if not line.strip():
+                continue
+            lines.append(line if line.endswith(b"\n") else line + b"\n")
+            message = json.loads(line)
+            if after_init:
+                break
+            after_init = message == "END_INIT"
+    return b"".join(lines)
+
+
+def measure(bot, messages, delay):
+    """
+    :return: (seconds from spawn to first response, seconds from sending the messages to first response)
+    """
+    spawned = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join("src", "main.py")],
+        cwd=os.path.join(REPO_ROOT, bot),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        if delay:
+            time.sleep(delay)
+        sent = time.perf_counter()
+        process.stdin.write(messages)
+        process.stdin.flush()
+        if not process.stdout.readline():
+            raise RuntimeError(f"{bot} exited without responding")
+        responded = time.perf_counter()
+    finally:
+        process.kill()
+        process.wait()
+    return responded - spawned, responded - sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("stream", help="Recorded message stream, one JSON message per line")
+    parser.add_argument("--bot", default="cabbage", help="Bot directory to start (cabbage or zoe)")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before sending the messages")
+    args = parser.parse_args()
+
+    messages = first_turn(args.stream)
+
+    # One run to warm up the disk cache and write the bytecode, like the image build does
+    measure(args.bot, messages, 0.0)
+
+    results = [measure(args.bot, messages, args.delay) for _ in range(args.runs)]
+    from_spawn = sorted(result[0] for result in results)
+    from_messages = sorted(result[1] for result in results)
+    print(f"{args.bot}: {args.runs} runs, messages sent {args.delay * 1000:.0f} ms after spawn")
+    print(
+        f"  spawn to first response:    min {from_spawn[0] * 1000:7.1f} ms  median"
+        f" {statistics.median(from_spawn) * 1000:7.1f} ms  max {from_spawn[-1] * 1000:7.1f} ms"
+    )
+    print(
+        f"  messages to first response: min {from_messages[0] * 1000:7.1f} ms  median"
+        f" {statistics.median(from_messages) * 1000:7.1f} ms  max {from_messages[-1] * 1000:7.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
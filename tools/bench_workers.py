@@ -0,0 +1,131 @@
+"""
+Measures how much faster search rollouts get played with botcore.workers' pool, and what handing a turn's problem to
+the pool costs.
+
+Usage: python tools/bench_workers.py [--workers 3] [--rollouts 1024] [--problems 20] [--seed 0]
+
+For 0 to --workers workers, plays --problems random problems of --rollouts rollouts each, split between the workers and
+this process the way ActionSearch.plan splits them, and prints rollouts per second and the speedup over this process
+alone. Then times a round trip that plays nothing (dispatch + collect), which is what using the pool adds to every turn.
+Speedups only show with more than one core.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+from botcore.constants import BULLET_SPEED, TANK_SPEED, TICK_DURATION
+from botcore.search import BATCH_ROLLOUTS, DEFAULT_HORIZON_TICKS, FIRE_PROBABILITY, play_batch
+from botcore.workers import WorkerPool
+
+
+WIDTH = 1800.0
+HEIGHT = 1000.0
+PATHS = 9
+ANGLES = 16
+
+
+def random_problem(rng):
+    """
+    :return: Arguments for `play_batch` shaped like a turn of ActionSearch.plan: straight paths out from a random
+        point, and shots all around it.
+    """
+    steps = np.arange(1, DEFAULT_HORIZON_TICKS + 1) * TICK_DURATION
+    start = rng.uniform([0, 0], [WIDTH, HEIGHT])
+    headings = rng.uniform(0, 2 * math.pi, PATHS)
+    directions = np.stack([np.cos(headings), np.sin(headings)], axis=1)
+    positions = np.clip(start + directions[:, None, :] * (TANK_SPEED * steps)[None, :, None], 0, [WIDTH, HEIGHT])
+    angles = np.linspace(0, 2 * math.pi, ANGLES, endpoint=False)
+    directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    bullets = start + directions[:, None, :] * (BULLET_SPEED * steps)[None, :, None]
+    enemy = rng.uniform([0, 0], [WIDTH, HEIGHT])
+    enemy_state = (enemy[0], enemy[1], *rng.uniform(-TANK_SPEED, TANK_SPEED, 2))
+    return positions, bullets, enemy_state, steps, FIRE_PROBABILITY, WIDTH, HEIGHT
+
+
+def wait_until_ready(pool, workers, timeout=30.0):
+    started = time.perf_counter()
+    while pool.idle_workers < workers:
+        if time.perf_counter() - started > timeout:
+            raise RuntimeError(f"only {pool.idle_workers} of {workers} workers came up")
+        time.sleep(0.01)
+
+
+def play(pool, rng, problem, rollouts):
+    """
+    Plays `rollouts` rollouts of the problem, in this process alone or shared with the pool like ActionSearch.plan.
+    :return: How many rollouts were played.
+    """
+    helpers = pool.idle_workers if pool is not None else 0
+    if helpers:
+        share = max(rollouts // (helpers + 1), BATCH_ROLLOUTS)
+        helpers = pool.dispatch(*problem, share // BATCH_ROLLOUTS)
+        if helpers:
+            rollouts = share
+    played = 0
+    while played < rollouts:
+        play_batch(rng, *problem)
+        played += BATCH_ROLLOUTS
+    if helpers:
+        played += pool.collect()[2]
+    return played
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=3, help="Most workers to try")
+    parser.add_argument("--rollouts", type=int, default=1024, help="Rollouts per problem")
+    parser.add_argument("--problems", type=int, default=20, help="Problems played per worker count")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    problems = [random_problem(rng) for _ in range(args.problems)]
+    print(
+        f"{os.cpu_count()} cores, {args.problems} problems of {args.rollouts} rollouts,"
+        f" {PATHS} paths x {ANGLES} angles"
+    )
+
+    baseline = None
+    round_trips = {}
+    for workers in range(args.workers + 1):
+        pool = WorkerPool(workers, seed=args.seed) if workers else None
+        try:
+            if pool is not None:
+                wait_until_ready(pool, workers)
+            # One problem first so every process has warmed up
+            play(pool, rng, problems[0], BATCH_ROLLOUTS)
+            started = time.perf_counter()
+            played = sum(play(pool, rng, problem, args.rollouts) for problem in problems)
+            rate = played / (time.perf_counter() - started)
+            baseline = baseline or rate
+            print(f"  {workers} workers: {rate:9.0f} rollouts/s  ({rate / baseline:4.2f}x)")
+
+            if pool is not None:
+                times = []
+                for problem in problems:
+                    started = time.perf_counter()
+                    pool.dispatch(*problem, 0)
+                    pool.collect()
+                    times.append(time.perf_counter() - started)
+                round_trips[workers] = sorted(times)
+        finally:
+            if pool is not None:
+                pool.close()
+
+    for workers, times in round_trips.items():
+        print(
+            f"  round trip with {workers} workers: median {times[len(times) // 2] * 1e6:7.1f} us"
+            f"  max {times[-1] * 1e6:7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
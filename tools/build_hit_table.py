@@ -0,0 +1,307 @@
+"""
+Rebuilds botcore's hit probability table (see botcore/hit_table.py) from recorded and simulated matches, and reports
+how well calibrated it is.
+
+Usage: python tools/build_hit_table.py [<stream.jsonl> ...] [--simulate 200] [--ticks 1800] [--holdout 0.2]
+                                       [--threshold 0.3] [--seed 0] [--dry-run]
+
+Shots come from two places:
+- Recorded message streams, as the game server sent them to one of our bots. Both tanks' shots are used.
+- Simulated matches on the simulator's rules (tools/simulator.py) and an open map, played right here with scripted
+  tanks instead of bots: both wander to random points, mostly near each other, and fire at each other at the lead
+  angle whenever they can, like our bots aim.
+Only shots fired with a clear line of sight count. A shot hit if the target lost hp on the turn the bullet went away
+and the bullet was right next to it.
+
+A share of the matches (--holdout) is kept out of the table and used to measure it: Brier score and log loss against
+just using the overall hit rate, predicted against observed hit rate in bands of predicted probability, and what
+gating shots at --threshold would do compared to the old "closer than 500" rule. Then the table is rebuilt from every
+match and written to botcore/hit_table_data.py, run tools/sync_core.py afterwards.
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import random
+import sys
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, "tools"))
+
+import numpy as np
+
+import simulator
+from botcore import hit_table
+from botcore.constants import BULLET_SPEED, TANK_SIZE, TICK_DURATION
+from botcore.line_of_sight import LineOfSight
+from botcore.tracker import MotionTracker
+
+
+OUTPUT = os.path.join(REPO_ROOT, "botcore", "hit_table_data.py")
+
+TANK, BULLET, WALL, DESTRUCTIBLE_WALL, BOUNDARY = 1, 2, 3, 4, 5
+
+# A bullet that went away this close to a tank that lost hp on the same turn hit it: the hit radius plus a tick of
+# the bullet's and the tank's movement, since positions are only known from the turn before
+HIT_DISTANCE = TANK_SIZE + (BULLET_SPEED + simulator.TANK_SPEED) * TICK_DURATION
+
+# Cells with few shots lean on the hit rate at their distance, as if they had this many more shots at that rate
+PRIOR_SHOTS = 5.0
+
+# Simulated tanks pick a new point to go to this often on average: some of the time a point near the enemy, some of the
+# time where they are, otherwise anywhere
+REPATH_CHANCE = 1 / 30
+CHASE_CHANCE = 0.6
+CHASE_RADIUS = 400.0
+STAND_STILL_CHANCE = 0.15
+
+# Simulated tanks never die, so they keep shooting for the whole match
+IMMORTAL_HP = 1e9
+
+# The rule the table replaces, for comparison
+OLD_RANGE = 500.0
+
+RELIABILITY_BANDS = 10
+
+
+def shots_from_stream(messages):
+    """
+    :param messages: One match's messages, decoded, in the order the server sent them.
+    :return: [(distance, bearing, speed, hit)] for every shot fired with a clear line of sight whose outcome is known.
+    """
+    objects = {}
+    line_of_sight = None
+    # {bullet id: (target tank id, situation)} for shots still flying
+    flying = {}
+    shots = []
+
+    for message in messages:
+        if message == "END":
+            break
+        if message == "END_INIT":
+            width = max(x for item in objects.values() if item["type"] == BOUNDARY for x, _ in item["position"])
+            height = max(y for item in objects.values() if item["type"] == BOUNDARY for _, y in item["position"])
+            line_of_sight = LineOfSight(width, height)
+            for object_id, item in objects.items():
+                if item["type"] == WALL:
+                    line_of_sight.add_wall(*item["position"])
+                elif item["type"] == DESTRUCTIBLE_WALL:
+                    line_of_sight.add_destructible_wall(object_id, *item["position"])
+            continue
+        body = message["message"]
+        if "updated_objects" not in body:
+            continue
+        if line_of_sight is None:
+            objects.update(body["updated_objects"])
+            continue
+
+        deleted, updated = body["deleted_objects"], body["updated_objects"]
+        tanks = [object_id for object_id, item in objects.items() if item["type"] == TANK]
+        previous = {tank_id: dict(objects[tank_id]) for tank_id in tanks}
+        for object_id in deleted:
+            line_of_sight.remove_destructible_wall(object_id)
+        new_bullets = [
+            object_id for object_id, item in updated.items() if item["type"] == BULLET and object_id not in objects
+        ]
+
+        # Shots that ended this turn, judged by where the bullet was last seen
+        for object_id in deleted:
+            if object_id in flying:
+                target, situation = flying.pop(object_id)
+                bullet_x, bullet_y = objects[object_id]["position"]
+                tank = updated.get(target, previous[target])
+                target_x, target_y = previous[target]["position"]
+                hit = (
+                    tank["hp"] < previous[target]["hp"]
+                    and math.hypot(bullet_x - target_x, bullet_y - target_y) <= HIT_DISTANCE
+                )
+                shots.append((*situation, hit))
+            objects.pop(object_id, None)
+        objects.update(updated)
+
+        for object_id in new_bullets:
+            shooter = objects[object_id]["tank_id"]
+            targets = [tank_id for tank_id in tanks if tank_id != shooter]
+            if shooter not in objects or not targets:
+                continue
+            shooter_x, shooter_y = objects[shooter]["position"]
+            target = objects[targets[0]]
+            target_x, target_y = target["position"]
+            if not line_of_sight.has_line_of_sight(shooter_x, shooter_y, target_x, target_y):
+                continue
+            flying[object_id] = (
+                targets[0], hit_table.situation(shooter_x, shooter_y, target_x, target_y, *target["velocity"]),
+            )
+    return shots
+
+
+def read_stream(path):
+    with open(path, "rb") as stream:
+        return [json.loads(line) for line in stream if line.strip()]
+
+
+def simulated_match(seed, ticks):
+    """
+    :return: The messages one bot would get in a simulated match between two scripted tanks, see the docstring.
+    """
+    rng = random.Random(seed)
+    tank_ids = ["tank-1", "tank-2"]
+    # Called on the rules' own time scale, so the closing boundary never gets anywhere
+    match = simulator.Match(seed, tank_ids, 10 ** 9)
+    # No walls: the simulator's tanks walk straight at their target and would spend the match stuck on them, and the
+    # table is only for shots with a clear line of sight anyway. No powerups either, they'd muddle the hit detection.
+    match.walls.clear()
+    match.destructible_walls.clear()
+    match._update_powerups = lambda: None
+    for tank in match.tanks.values():
+        tank["hp"] = IMMORTAL_HP
+    trackers = {tank_id: MotionTracker() for tank_id in tank_ids}
+
+    messages = [{"message": {"your-tank-id": tank_ids[0], "enemy-tank-id": tank_ids[1]}}]
+    messages.append({"message": {"updated_objects": match.init_objects()}})
+    messages.append("END_INIT")
+    for turn in range(ticks):
+        for tank_id, enemy_id in zip(tank_ids, reversed(tank_ids)):
+            tank, enemy = match.tanks[tank_id], match.tanks[enemy_id]
+            trackers[enemy_id].update(*enemy["position"], turn, *enemy["velocity"])
+            action = {}
+            if tank["path"] is None or rng.random() < REPATH_CHANCE:
+                choice = rng.random()
+                if choice < STAND_STILL_CHANCE:
+                    action["path"] = list(tank["position"])
+                elif choice < STAND_STILL_CHANCE + CHASE_CHANCE:
+                    action["path"] = [
+                        min(max(enemy["position"][0] + rng.uniform(-CHASE_RADIUS, CHASE_RADIUS), 0), simulator.WIDTH),
+                        min(max(enemy["position"][1] + rng.uniform(-CHASE_RADIUS, CHASE_RADIUS), 0), simulator.HEIGHT),
+                    ]
+                else:
+                    action["path"] = [rng.uniform(0, simulator.WIDTH), rng.uniform(0, simulator.HEIGHT)]
+            if tank["cooldown"] <= 0:
+                action["shoot"] = trackers[enemy_id].lead_angle(*tank["position"], BULLET_SPEED)
+            match.apply_action(tank_id, action)
+        match.step()
+        messages.append({"message": {"deleted_objects": match.deleted, "updated_objects": match.updated}})
+    messages.append("END")
+    # The match reuses its lists, so they're copied by going through JSON like they would be on the wire
+    return json.loads(json.dumps(messages))
+
+
+def cell_indices(shots):
+    return np.array([hit_table.cell(distance, bearing, speed) for distance, bearing, speed, _ in shots], dtype=int)
+
+
+def build(shots):
+    """
+    :return: Hit probability for every cell of the table, from the given shots.
+    """
+    cells = cell_indices(shots)
+    hits = np.array([hit for *_, hit in shots], dtype=float)
+    overall = hits.mean() if len(hits) else 0.0
+
+    shape = (hit_table.DISTANCE_BINS, hit_table.BEARING_BINS * hit_table.SPEED_BINS)
+    cell_shots = np.bincount(cells, minlength=hit_table.CELLS).reshape(shape)
+    cell_hits = np.bincount(cells, weights=hits, minlength=hit_table.CELLS).reshape(shape)
+    # Each distance's hit rate leans on the overall one, and each cell's on its distance's
+    distance_rate = (cell_hits.sum(axis=1) + PRIOR_SHOTS * overall) / (cell_shots.sum(axis=1) + PRIOR_SHOTS)
+    rate = (cell_hits + PRIOR_SHOTS * distance_rate[:, None]) / (cell_shots + PRIOR_SHOTS)
+    return rate.ravel()
+
+
+def quantize(probabilities):
+    return np.clip(np.round(probabilities * 255), 0, 255).astype(np.uint8)
+
+
+def report(train, test, threshold):
+    table = quantize(build(train)) / 255
+    hits = np.array([hit for *_, hit in test], dtype=float)
+    predicted = table[cell_indices(test)]
+    base_rate = np.mean([hit for *_, hit in train])
+
+    def scores(probabilities):
+        clipped = np.clip(probabilities, 1e-3, 1 - 1e-3)
+        brier = np.mean((probabilities - hits) ** 2)
+        log_loss = -np.mean(hits * np.log(clipped) + (1 - hits) * np.log(1 - clipped))
+        return brier, log_loss
+
+    print(f"{len(train)} shots to build from, {len(test)} held out, {hits.mean():.1%} of held out shots hit")
+    for name, probabilities in (("table", predicted), ("overall rate", np.full(len(hits), base_rate))):
+        brier, log_loss = scores(probabilities)
+        print(f"  {name:>12}: Brier {brier:.4f}  log loss {log_loss:.4f}")
+
+    print("  predicted      shots  mean predicted  hit")
+    bands = np.minimum((predicted * RELIABILITY_BANDS).astype(int), RELIABILITY_BANDS - 1)
+    for band in range(RELIABILITY_BANDS):
+        chosen = bands == band
+        if chosen.any():
+            print(
+                f"  {band / RELIABILITY_BANDS:.1f} - {(band + 1) / RELIABILITY_BANDS:.1f}  {chosen.sum():8d}"
+                f"  {predicted[chosen].mean():14.3f}  {hits[chosen].mean():.3f}"
+            )
+
+    distances = np.array([distance for distance, *_ in test])
+    for name, fired in (("distance < 500", distances < OLD_RANGE), (f"table >= {threshold}", predicted >= threshold)):
+        print(
+            f"  {name:>15}: fires {fired.mean():6.1%} of shots, {hits[fired].mean() if fired.any() else 0:6.1%} of"
+            f" them hit, keeps {hits[fired].sum() / max(hits.sum(), 1):6.1%} of hits"
+        )
+
+
+def write(probabilities, shots):
+    encoded = base64.b64encode(quantize(probabilities).tobytes()).decode()
+    lines = "\n".join(f'    "{encoded[start:start + 100]}"' for start in range(0, len(encoded), 100))
+    with open(OUTPUT, "w") as output:
+        output.write(
+            '"""\n'
+            "Hit probability table for hit_table.py, generated by tools/build_hit_table.py."
+            " Rebuild it, don't edit it.\n"
+            '"""\n'
+            "import base64\n"
+            "\n"
+            "\n"
+            "# Bins the table was built with, see hit_table.LAYOUT\n"
+            f"LAYOUT = {hit_table.LAYOUT!r}\n"
+            "\n"
+            "# Shots the table was built from\n"
+            f"SHOTS = {len(shots)}\n"
+            "\n"
+            "# One byte per cell, the probability times 255, in the order of hit_table.cell\n"
+            "PROBABILITIES = base64.b64decode(\n"
+            f"{lines}\n"
+            ")\n"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("streams", nargs="*", help="Recorded message streams, one JSON message per line")
+    parser.add_argument("--simulate", type=int, default=200, help="How many matches to simulate")
+    parser.add_argument("--ticks", type=int, default=1800, help="Ticks per simulated match")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of matches kept out to measure the table")
+    parser.add_argument("--threshold", type=float, default=hit_table.DEFAULT_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dry-run", action="store_true", help="Only report, don't write the table")
+    args = parser.parse_args()
+
+    matches = [shots_from_stream(read_stream(path)) for path in args.streams]
+    for index in range(args.simulate):
+        matches.append(shots_from_stream(simulated_match(args.seed + index, args.ticks)))
+        print(f"\rsimulated {index + 1}/{args.simulate}", end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+    held_out = set(random.Random(args.seed).sample(range(len(matches)), int(len(matches) * args.holdout)))
+    train = [shot for index, shots in enumerate(matches) if index not in held_out for shot in shots]
+    test = [shot for index, shots in enumerate(matches) if index in held_out for shot in shots]
+    if test:
+        report(train, test, args.threshold)
+
+    shots = train + test
+    if not args.dry_run:
+        write(build(shots), shots)
+        print(f"wrote {OUTPUT} from {len(shots)} shots, run tools/sync_core.py to copy it to the bots")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Replays a recorded message stream into a bot's Game and reports how long it took to respond to each turn.
+
+Usage: python tools/replay.py <stream.jsonl> [<stream.jsonl> ...] [--bot cabbage] [--responses out.jsonl] [--cprofile]
+
+The bot runs in this process, reading the stream through comms.set_transport instead of stdin. A turn's latency is the
+time from the bot reading the turn's message to it posting a response. A turn is a deadline miss if there was no
+response or the response took longer than the message's `time`.
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ReplayTransport:
+    """
+    Plays the part of stdin and stdout for a bot: hands out the recorded lines one at a time and times the responses.
+    """
+    def __init__(self, lines):
+        self._lines = lines
+        self._next = 0
+        self._turn = None
+        self._read_at = None
+
+        self.init_lines = 0
+        # One entry per turn message: [time budget, latency in seconds or None if it got no response]
+        self.turns = []
+        self.responses = []
+
+    def readline(self) -> bytes:
+        if self._next >= len(self._lines):
+            return b""
+
+        line, budget, is_turn = self._lines[self._next]
+        self._next += 1
+        if is_turn:
+            self._turn = len(self.turns)
+            self.turns.append([budget, None])
+        else:
+            self._turn = None
+            self.init_lines += 1
+        self._read_at = time.perf_counter()
+        return line
+
+    def write(self, data: bytes):
+        wrote_at = time.perf_counter()
+        self.responses.append(data)
+        if self._turn is not None and self.turns[self._turn][1] is None:
+            self.turns[self._turn][1] = wrote_at - self._read_at
+
+    def flush(self):
+        pass
+
+
+def load_stream(path):
+    """
+    :return: [(line, time budget, whether it's a turn message)] for every line of the stream.
+    """
+    lines = []
+    after_init = False
+    with open(path, "rb") as stream:
+        for line in stream:
+            if not line.strip():
+                continue
+            message = json.loads(line)
+            is_turn = after_init and isinstance(message, dict)
+            if message == "END_INIT":
+                after_init = True
+            budget = float(message.get("time", 0.1)) if isinstance(message, dict) else 0.1
+            lines.append((line, budget, is_turn))
+    return lines
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def replay(path, profiler=None):
+    """
+    Runs a fresh Game over one recorded stream.
+    :return: The ReplayTransport with everything that was measured, and the time Game() took.
+    """
+    from botcore import comms
+    import game
+
+    transport = ReplayTransport(load_stream(path))
+    comms.set_transport(transport, transport)
+
+    if profiler is not None:
+        profiler.enable()
+    started = time.perf_counter()
+    bot = game.Game()
+    init_time = time.perf_counter() - started
+    while bot.read_next_turn_data():
+        bot.respond_to_turn()
+    if profiler is not None:
+        profiler.disable()
+
+    return transport, init_time
+
+
+def report(path, transport, init_time):
+    answered = sorted(latency for _, latency in transport.turns if latency is not None)
+    unanswered = sum(1 for _, latency in transport.turns if latency is None)
+    late = sum(1 for budget, latency in transport.turns if latency is not None and latency > budget)
+
+    print(f"{path}")
+    print(f"  init:   {init_time * 1000:8.2f} ms over {transport.init_lines} messages")
+    print(f"  turns:  {len(transport.turns)}, answered {len(answered)}")
+    print(
+        f"  latency p50 {percentile(answered, 0.5) * 1000:.2f} ms"
+        f"  p99 {percentile(answered, 0.99) * 1000:.2f} ms"
+        f"  max {(answered[-1] if answered else float('nan')) * 1000:.2f} ms"
+    )
+    print(f"  deadline misses: {late + unanswered} ({late} late, {unanswered} unanswered)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("streams", nargs="+", help="Recorded message streams, one JSON message per line")
+    parser.add_argument("--bot", default="cabbage", help="Bot directory to load the Game from (cabbage or zoe)")
+    parser.add_argument("--responses", help="Write the bot's responses to this file")
+    parser.add_argument("--cprofile", action="store_true", help="Print the functions the bot spent the most time in")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(REPO_ROOT, args.bot, "src"))
+
+    profiler = cProfile.Profile() if args.cprofile else None
+    responses = []
+    for path in args.streams:
+        transport, init_time = replay(path, profiler)
+        report(path, transport, init_time)
+        responses.extend(transport.responses)
+
+    if args.responses:
+        with open(args.responses, "wb") as output:
+            output.writelines(responses)
+
+    if profiler is not None:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
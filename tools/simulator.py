@@ -0,0 +1,489 @@
+"""
+A small stand-in for the game server, to play lots of matches between two bots locally.
+
+Usage: python tools/simulator.py [--bots cabbage zoe] [--matches 100] [--workers 8] [--results results.jsonl]
+
+Each bot is started as `python src/main.py` from its own directory and spoken to over stdin/stdout with the same JSON
+messages as the real server: the tank id message, the init objects, END_INIT, one message per tick with the deleted and
+updated objects, then END. The rules are a simplified version of the real game: tanks walk straight at their path
+target sliding along walls, bullets bounce off walls and the map edges, destructible walls break after a few hits, the
+closing boundary shrinks and hurts tanks outside it, and powerups heal.
+Matches run in parallel over a process pool. Sides are swapped every other match.
+"""
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import queue
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WIDTH = 1800.0
+HEIGHT = 1000.0
+WALL_SIZE = 18.0
+TANK_SIZE = 20.0
+TANK_SPEED = 150.0
+TANK_HP = 5
+BULLET_SPEED = 450.0
+BULLET_LIFETIME = 3.0
+SHOT_COOLDOWN = 0.5
+DESTRUCTIBLE_WALL_HP = 3
+POWERUP_HEAL = 1
+POWERUP_SPAWN_CHANCE = 0.01
+MAX_POWERUPS = 5
+BOUNDARY_DAMAGE_PER_SECOND = 1.0
+TICK = 1 / 30
+TURN_TIME = 0.1
+
+
+def corners(x_min, y_min, x_max, y_max):
+    # Same order as the game server: top left, bottom left, bottom right, top right
+    return [[x_min, y_max], [x_min, y_min], [x_max, y_min], [x_max, y_max]]
+
+
+class BotProcess:
+    """
+    A running bot. Lines it prints are read on a thread and queued with the time they arrived.
+    """
+    def __init__(self, bot_dir):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join("src", "main.py")],
+            cwd=bot_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.responses = queue.Queue()
+        self.latencies = []
+        self.unanswered = 0
+        self.late = 0
+        self.invalid = 0
+        # Responses that gave the tank a new path, each one makes the server route again
+        self.paths = 0
+        self._sent_at = None
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            self.responses.put((line, time.perf_counter()))
+
+    def send(self, message):
+        try:
+            self.process.stdin.write(json.dumps(message).encode() + b"\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass
+        self._sent_at = time.perf_counter()
+
+    def drop_late_responses(self):
+        while True:
+            try:
+                self.responses.get_nowait()
+                self.late += 1
+            except queue.Empty:
+                return
+
+    def receive(self, deadline):
+        """
+        :return: The bot's response to the last message sent, or None if it didn't answer in time.
+        """
+        try:
+            line, received_at = self.responses.get(timeout=max(deadline - time.perf_counter(), 0))
+        except queue.Empty:
+            self.unanswered += 1
+            return None
+
+        self.latencies.append(received_at - self._sent_at)
+        try:
+            response = json.loads(line)
+        except ValueError:
+            self.invalid += 1
+            return None
+        if not isinstance(response, dict):
+            return None
+        if "path" in response:
+            self.paths += 1
+        return response
+
+    def finish(self):
+        """
+        Waits for the bot to exit (killing it if it takes too long).
+        :return: CPU seconds the bot used.
+        """
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+
+        killer = threading.Timer(5, self.process.kill)
+        killer.start()
+        # Reap it ourselves rather than through Popen.wait, to get its resource usage
+        _, status, usage = os.wait4(self.process.pid, 0)
+        killer.cancel()
+        self.process.returncode = os.waitstatus_to_exitcode(status)
+        return usage.ru_utime + usage.ru_stime
+
+
+class Match:
+    """
+    The game state of one match and the rules that move it forward a tick at a time.
+    """
+    def __init__(self, seed, tank_ids, max_ticks):
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.max_ticks = max_ticks
+        self.tank_ids = tank_ids
+        self.walls = set()
+        # {cell: [object-id, hp]}
+        self.destructible_walls = {}
+        self.tanks = {}
+        self.bullets = {}
+        self.powerups = {}
+        self.next_id = 0
+        self.boundary = [0.0, 0.0, WIDTH, HEIGHT]
+        self.deleted = []
+        self.updated = {}
+        self._generate_map()
+
+    def _new_id(self, prefix):
+        self.next_id += 1
+        return f"{prefix}-{self.next_id}"
+
+    def _generate_map(self):
+        columns, rows = int(WIDTH // WALL_SIZE), int(HEIGHT // WALL_SIZE)
+        # Mirror the layout through the center so neither side has an advantage
+        for _ in range(120):
+            cell_x, cell_y = self.rng.randrange(columns), self.rng.randrange(rows)
+            dx, dy = self.rng.choice([(1, 0), (0, 1)])
+            destructible = self.rng.random() < 0.3
+            for step in range(self.rng.randint(2, 8)):
+                for cell in ((cell_x + dx * step, cell_y + dy * step),
+                             (columns - 1 - cell_x - dx * step, rows - 1 - cell_y - dy * step)):
+                    if not (0 <= cell[0] < columns and 0 <= cell[1] < rows):
+                        continue
+                    if destructible:
+                        self.destructible_walls.setdefault(cell, [self._new_id("destructible-wall"),
+                                                                   DESTRUCTIBLE_WALL_HP])
+                    else:
+                        self.walls.add(cell)
+
+        starts = [(WIDTH * 0.1, HEIGHT * 0.1), (WIDTH * 0.9, HEIGHT * 0.9)]
+        for tank_id, (x, y) in zip(self.tank_ids, starts):
+            # Clear the spawn area
+            for cell_x in range(int(x // WALL_SIZE) - 3, int(x // WALL_SIZE) + 4):
+                for cell_y in range(int(y // WALL_SIZE) - 3, int(y // WALL_SIZE) + 4):
+                    self.walls.discard((cell_x, cell_y))
+                    self.destructible_walls.pop((cell_x, cell_y), None)
+            self.tanks[tank_id] = {
+                "position": [x, y], "velocity": [0.0, 0.0], "hp": float(TANK_HP), "path": None, "cooldown": 0.0,
+            }
+
+    def wall_object(self, cell):
+        return {"type": 3, "position": [(cell[0] + 0.5) * WALL_SIZE, (cell[1] + 0.5) * WALL_SIZE]}
+
+    def destructible_wall_object(self, cell):
+        return {
+            "type": 4, "position": [(cell[0] + 0.5) * WALL_SIZE, (cell[1] + 0.5) * WALL_SIZE],
+            "hp": self.destructible_walls[cell][1],
+        }
+
+    def tank_object(self, tank_id):
+        tank = self.tanks[tank_id]
+        return {"type": 1, "position": list(tank["position"]), "velocity": list(tank["velocity"]), "hp": tank["hp"],
+                "powerups": {}}
+
+    def bullet_object(self, bullet_id):
+        bullet = self.bullets[bullet_id]
+        return {"type": 2, "position": list(bullet["position"]), "velocity": list(bullet["velocity"]),
+                "tank_id": bullet["owner"], "damage": 1}
+
+    def boundary_object(self):
+        return {"type": 6, "position": corners(*self.boundary), "velocity": [[0, 0]] * 4}
+
+    def init_objects(self):
+        objects = {
+            "boundary-1": {"type": 5, "position": corners(0, 0, WIDTH, HEIGHT), "velocity": [[0, 0]] * 4},
+            "closing-boundary-1": self.boundary_object(),
+        }
+        for cell in self.walls:
+            objects[f"wall-{cell[0]}-{cell[1]}"] = self.wall_object(cell)
+        for cell, (object_id, _) in self.destructible_walls.items():
+            objects[object_id] = self.destructible_wall_object(cell)
+        for tank_id in self.tanks:
+            objects[tank_id] = self.tank_object(tank_id)
+        return objects
+
+    def is_blocked(self, x, y, half_size):
+        if x - half_size < 0 or y - half_size < 0 or x + half_size > WIDTH or y + half_size > HEIGHT:
+            return True
+        for corner_x in (x - half_size, x + half_size):
+            for corner_y in (y - half_size, y + half_size):
+                cell = (int(corner_x // WALL_SIZE), int(corner_y // WALL_SIZE))
+                if cell in self.walls or cell in self.destructible_walls:
+                    return True
+        return False
+
+    def apply_action(self, tank_id, action):
+        tank = self.tanks[tank_id]
+        if action is None:
+            return
+        path = action.get("path")
+        if isinstance(path, (list, tuple)) and len(path) == 2:
+            tank["path"] = [float(path[0]), float(path[1])]
+        shoot = action.get("shoot")
+        if isinstance(shoot, (int, float)) and tank["cooldown"] <= 0:
+            angle = math.radians(shoot)
+            bullet_id = self._new_id("bullet")
+            velocity = [math.cos(angle) * BULLET_SPEED, math.sin(angle) * BULLET_SPEED]
+            # Start just outside the tank so it doesn't shoot itself
+            offset = TANK_SIZE * 0.75
+            self.bullets[bullet_id] = {
+                "position": [tank["position"][0] + math.cos(angle) * offset,
+                             tank["position"][1] + math.sin(angle) * offset],
+                "velocity": velocity, "owner": tank_id, "age": 0.0,
+            }
+            tank["cooldown"] = SHOT_COOLDOWN
+
+    def step(self):
+        """
+        Moves the game forward one tick. The deltas end up in self.deleted / self.updated.
+        """
+        self.tick += 1
+        self.deleted, self.updated = [], {}
+
+        self._move_tanks()
+        self._move_bullets()
+        self._update_powerups()
+        self._shrink_boundary()
+
+        for tank_id in self.tanks:
+            self.updated[tank_id] = self.tank_object(tank_id)
+        for bullet_id in self.bullets:
+            self.updated[bullet_id] = self.bullet_object(bullet_id)
+
+    def _move_tanks(self):
+        half = TANK_SIZE / 2
+        for tank in self.tanks.values():
+            tank["cooldown"] -= TICK
+            tank["velocity"] = [0.0, 0.0]
+            if tank["path"] is None:
+                continue
+            x, y = tank["position"]
+            dx, dy = tank["path"][0] - x, tank["path"][1] - y
+            distance = math.hypot(dx, dy)
+            if distance < 1:
+                continue
+            step = min(TANK_SPEED * TICK, distance)
+            move_x, move_y = dx / distance * step, dy / distance * step
+            # Slide along walls if the straight move is blocked
+            for candidate_x, candidate_y in ((move_x, move_y), (move_x, 0.0), (0.0, move_y)):
+                if (candidate_x or candidate_y) and not self.is_blocked(x + candidate_x, y + candidate_y, half):
+                    tank["position"] = [x + candidate_x, y + candidate_y]
+                    tank["velocity"] = [candidate_x / TICK, candidate_y / TICK]
+                    break
+
+    def _move_bullets(self):
+        hit_radius = TANK_SIZE / 2
+        for bullet_id, bullet in list(self.bullets.items()):
+            bullet["age"] += TICK
+            x, y = bullet["position"]
+            vx, vy = bullet["velocity"]
+            new_x, new_y = x + vx * TICK, y + vy * TICK
+            old_cell = (int(x // WALL_SIZE), int(y // WALL_SIZE))
+            new_cell = (int(new_x // WALL_SIZE), int(new_y // WALL_SIZE))
+
+            removed = bullet["age"] > BULLET_LIFETIME
+            if not removed and new_cell in self.destructible_walls:
+                wall = self.destructible_walls[new_cell]
+                wall[1] -= 1
+                if wall[1] <= 0:
+                    self.deleted.append(wall[0])
+                    del self.destructible_walls[new_cell]
+                else:
+                    self.updated[wall[0]] = self.destructible_wall_object(new_cell)
+                removed = True
+            elif not removed:
+                bounced = False
+                if new_x < 0 or new_x > WIDTH:
+                    vx, bounced = -vx, True
+                if new_y < 0 or new_y > HEIGHT:
+                    vy, bounced = -vy, True
+                if new_cell in self.walls:
+                    along_x = (new_cell[0], old_cell[1]) in self.walls
+                    along_y = (old_cell[0], new_cell[1]) in self.walls
+                    if along_x or not along_y:
+                        vx = -vx
+                    if along_y or not along_x:
+                        vy = -vy
+                    bounced = True
+                if bounced:
+                    new_x, new_y = x + vx * TICK, y + vy * TICK
+                bullet["position"] = [new_x, new_y]
+                bullet["velocity"] = [vx, vy]
+
+                for tank in self.tanks.values():
+                    if (abs(tank["position"][0] - new_x) <= hit_radius
+                            and abs(tank["position"][1] - new_y) <= hit_radius):
+                        tank["hp"] -= 1
+                        removed = True
+                        break
+
+            if removed:
+                self.deleted.append(bullet_id)
+                del self.bullets[bullet_id]
+
+    def _update_powerups(self):
+        for powerup_id, position in list(self.powerups.items()):
+            for tank in self.tanks.values():
+                if math.hypot(tank["position"][0] - position[0], tank["position"][1] - position[1]) < TANK_SIZE:
+                    tank["hp"] = min(tank["hp"] + POWERUP_HEAL, TANK_HP)
+                    self.deleted.append(powerup_id)
+                    del self.powerups[powerup_id]
+                    break
+
+        if len(self.powerups) < MAX_POWERUPS and self.rng.random() < POWERUP_SPAWN_CHANCE:
+            x_min, y_min, x_max, y_max = self.boundary
+            x, y = self.rng.uniform(x_min, x_max), self.rng.uniform(y_min, y_max)
+            if not self.is_blocked(x, y, 1):
+                powerup_id = self._new_id("powerup")
+                self.powerups[powerup_id] = [x, y]
+                self.updated[powerup_id] = {"type": 7, "position": [x, y], "powerup_type": "HEALTH"}
+
+    def _shrink_boundary(self):
+        # Closes in to a small square around the center over the first two thirds of the match
+        shrink = (min(WIDTH, HEIGHT) / 2 - 100) / (self.max_ticks * 2 / 3)
+        x_min, y_min, x_max, y_max = self.boundary
+        if x_max - x_min > 200 and y_max - y_min > 200:
+            self.boundary = [x_min + shrink, y_min + shrink, x_max - shrink, y_max - shrink]
+            self.updated["closing-boundary-1"] = self.boundary_object()
+
+        x_min, y_min, x_max, y_max = self.boundary
+        for tank in self.tanks.values():
+            x, y = tank["position"]
+            if not (x_min <= x <= x_max and y_min <= y <= y_max):
+                tank["hp"] -= BOUNDARY_DAMAGE_PER_SECOND * TICK
+
+    def alive(self):
+        return [tank_id for tank_id, tank in self.tanks.items() if tank["hp"] > 0]
+
+
+def play_match(seed, bot_names, max_ticks):
+    """
+    Plays one match between the two bots (first one gets tank-1).
+    :return: A dict with the winner and per-bot stats.
+    """
+    tank_ids = ["tank-1", "tank-2"]
+    match = Match(seed, tank_ids, max_ticks)
+    bots = [BotProcess(os.path.join(REPO_ROOT, name)) for name in bot_names]
+
+    started = time.perf_counter()
+
+    for bot, tank_id, enemy_id in zip(bots, tank_ids, reversed(tank_ids)):
+        bot.send({"message": {"your-tank-id": tank_id, "enemy-tank-id": enemy_id}, "time": TURN_TIME})
+        objects = list(match.init_objects().items())
+        chunk = 200
+        for start in range(0, len(objects), chunk):
+            bot.send({"message": {"updated_objects": dict(objects[start:start + chunk])}, "time": TURN_TIME})
+        bot.send("END_INIT")
+
+    while match.tick < max_ticks and len(match.alive()) == 2:
+        message = {"message": {"deleted_objects": match.deleted, "updated_objects": match.updated}, "time": TURN_TIME}
+        for bot in bots:
+            bot.drop_late_responses()
+            bot.send(message)
+        deadline = time.perf_counter() + TURN_TIME
+        for bot, tank_id in zip(bots, tank_ids):
+            match.apply_action(tank_id, bot.receive(deadline))
+        match.step()
+
+    cpu_seconds = []
+    for bot in bots:
+        bot.send("END")
+        cpu_seconds.append(bot.finish())
+
+    alive = match.alive()
+    if len(alive) == 1:
+        winner = bot_names[tank_ids.index(alive[0])]
+    else:
+        hp = [match.tanks[tank_id]["hp"] for tank_id in tank_ids]
+        winner = None if hp[0] == hp[1] else bot_names[hp.index(max(hp))]
+
+    return {
+        "seed": seed,
+        "bots": bot_names,
+        "winner": winner,
+        "ticks": match.tick,
+        "seconds": time.perf_counter() - started,
+        "stats": {
+            name: {
+                "cpu_seconds": cpu,
+                "latencies": bot.latencies,
+                "unanswered": bot.unanswered,
+                "late": bot.late,
+                "invalid": bot.invalid,
+                "paths": bot.paths,
+            }
+            for name, bot, cpu in zip(bot_names, bots, cpu_seconds)
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bots", nargs=2, default=["cabbage", "zoe"], help="The two bot directories")
+    parser.add_argument("--matches", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--ticks", type=int, default=1800, help="Ticks before the match is called on hp")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results", help="Write one JSON line per match to this file")
+    args = parser.parse_args()
+
+    jobs = []
+    for index in range(args.matches):
+        names = args.bots if index % 2 == 0 else list(reversed(args.bots))
+        jobs.append((args.seed + index, names, args.ticks))
+
+    started = time.perf_counter()
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for result in pool.map(play_match, *zip(*jobs)):
+            results.append(result)
+            print(f"match {len(results)}/{args.matches}: winner {result['winner']} after {result['ticks']} ticks",
+                  file=sys.stderr)
+    elapsed = time.perf_counter() - started
+
+    if args.results:
+        with open(args.results, "w") as output:
+            for result in results:
+                output.write(json.dumps(result) + "\n")
+
+    print(f"{len(results)} matches in {elapsed:.1f} s ({len(results) / elapsed * 3600:.0f} matches/hour)")
+    for name in args.bots:
+        wins = sum(1 for result in results if result["winner"] == name)
+        latencies = sorted(latency for result in results for latency in result["stats"][name]["latencies"])
+        unanswered = sum(result["stats"][name]["unanswered"] for result in results)
+        late = sum(result["stats"][name]["late"] for result in results)
+        cpu = sum(result["stats"][name]["cpu_seconds"] for result in results)
+        paths = sum(result["stats"][name]["paths"] for result in results)
+        ticks = sum(result["ticks"] for result in results)
+        mean = statistics.fmean(latencies) if latencies else float("nan")
+        p99 = latencies[min(int(0.99 * len(latencies)), len(latencies) - 1)] if latencies else float("nan")
+        print(
+            f"  {name}: {wins} wins, latency mean {mean * 1000:.2f} ms p99 {p99 * 1000:.2f} ms,"
+            f" {unanswered} unanswered, {late} late, CPU {cpu:.1f} s ({cpu / max(len(results), 1):.2f} s/match),"
+            f" new path on {paths / max(ticks, 1):.0%} of ticks"
+        )
+    draws = sum(1 for result in results if result["winner"] is None)
+    print(f"  draws: {draws}")
+
+
+if __name__ == "__main__":
+    main()
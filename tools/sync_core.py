@@ -0,0 +1,76 @@
+"""
+Copies the shared bot core (botcore/ at the root of the repo) into every bot's src/botcore.
+
+Usage: python tools/sync_core.py [--check]
+
+A bot's Docker image is built from its own directory, so each bot needs its own copy of the core. Edit botcore/ and run
+this to update the copies. With --check nothing is written, it only reports copies that are out of date and exits
+with 1 if there are any.
+"""
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE = os.path.join(REPO_ROOT, "botcore")
+BOTS = ("cabbage", "zoe")
+
+
+def core_files():
+    return sorted(name for name in os.listdir(CORE) if name.endswith(".py"))
+
+
+def differences(bot):
+    """
+    :return: [(file name, what's wrong with the bot's copy of it)] for every file that isn't the same as in botcore/.
+    """
+    copy = os.path.join(REPO_ROOT, bot, "src", "botcore")
+    files = core_files()
+    problems = []
+    for name in files:
+        copied = os.path.join(copy, name)
+        if not os.path.exists(copied):
+            problems.append((name, "missing"))
+        elif not filecmp.cmp(os.path.join(CORE, name), copied, shallow=False):
+            problems.append((name, "out of date"))
+    if os.path.isdir(copy):
+        for name in sorted(os.listdir(copy)):
+            if name.endswith(".py") and name not in files:
+                problems.append((name, "not in botcore/"))
+    return problems
+
+
+def sync(bot):
+    copy = os.path.join(REPO_ROOT, bot, "src", "botcore")
+    os.makedirs(copy, exist_ok=True)
+    for name, problem in differences(bot):
+        if problem == "not in botcore/":
+            os.remove(os.path.join(copy, name))
+        else:
+            shutil.copyfile(os.path.join(CORE, name), os.path.join(copy, name))
+        print(f"{bot}: {name} ({problem})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Only report copies that are out of date")
+    args = parser.parse_args()
+
+    if not args.check:
+        for bot in BOTS:
+            sync(bot)
+        return
+
+    stale = False
+    for bot in BOTS:
+        for name, problem in differences(bot):
+            print(f"{bot}: {name} {problem}")
+            stale = True
+    sys.exit(1 if stale else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Writes a synthetic match as a recorded message stream, for replaying and benchmarking a bot offline.
+
+Usage: python tools/synthetic_match.py [--walls 3000] [--bullets 300] [--turns 500] [--seed 0] > match.jsonl
+
+The stream is what the game server would send one bot: the tank id message, the init objects, END_INIT, one message per
+turn with deleted and updated objects, then END. It isn't a real game (nothing reacts to the bot), it's there to put
+a realistic amount of walls, bullets and powerups in front of the bot's code.
+"""
+import argparse
+import json
+import math
+import random
+import sys
+
+
+WALL_SIZE = 18
+TANK_ID = "tank-1"
+ENEMY_TANK_ID = "tank-2"
+
+
+def message(body, turn_time):
+    return json.dumps({"message": body, "time": turn_time})
+
+
+def corners(x_min, y_min, x_max, y_max):
+    # Same order as the game server: top left, bottom left, bottom right, top right
+    return [[x_min, y_max], [x_min, y_min], [x_max, y_min], [x_max, y_max]]
+
+
+def generate(walls, destructible_walls, bullets, powerups, turns, width, height, turn_time, seed):
+    """
+    :return: The lines of the message stream.
+    """
+    rng = random.Random(seed)
+    lines = [message({"your-tank-id": TANK_ID, "enemy-tank-id": ENEMY_TANK_ID}, turn_time)]
+
+    def free_cell():
+        return (
+            rng.randrange(WALL_SIZE // 2, int(width), WALL_SIZE),
+            rng.randrange(WALL_SIZE // 2, int(height), WALL_SIZE),
+        )
+
+    objects = {
+        "boundary-1": {"type": 5, "position": corners(0, 0, width, height), "velocity": [[0, 0]] * 4},
+        "closing-boundary-1": {"type": 6, "position": corners(0, 0, width, height), "velocity": [[0, 0]] * 4},
+    }
+    # Walls come in short straight runs, like on the real maps
+    wall_count = 0
+    while wall_count < walls:
+        x, y = free_cell()
+        dx, dy = rng.choice([(1, 0), (0, 1)])
+        for step in range(rng.randint(1, 8)):
+            if wall_count >= walls:
+                break
+            objects[f"wall-{wall_count}"] = {
+                "type": 3, "position": [x + dx * step * WALL_SIZE, y + dy * step * WALL_SIZE],
+            }
+            wall_count += 1
+    for index in range(destructible_walls):
+        objects[f"destructible-wall-{index}"] = {"type": 4, "position": list(free_cell()), "hp": 3}
+
+    tanks = {
+        TANK_ID: [width * 0.1, height * 0.1],
+        ENEMY_TANK_ID: [width * 0.9, height * 0.9],
+    }
+    for tank_id, position in tanks.items():
+        objects[tank_id] = {"type": 1, "position": list(position), "velocity": [0, 0], "hp": 5, "powerups": {}}
+
+    live_powerups = set()
+    next_powerup = 0
+    for _ in range(powerups):
+        objects[f"powerup-{next_powerup}"] = {
+            "type": 7, "position": [rng.uniform(0, width), rng.uniform(0, height)], "powerup_type": "SPEED",
+        }
+        live_powerups.add(f"powerup-{next_powerup}")
+        next_powerup += 1
+
+    # Send the init objects in a few chunks like the server does
+    items = list(objects.items())
+    chunk = max(len(items) // 4, 1)
+    for start in range(0, len(items), chunk):
+        lines.append(message({"updated_objects": dict(items[start:start + chunk])}, turn_time))
+    lines.append(json.dumps("END_INIT"))
+
+    tick = 1 / 30
+    bullet_speed = 450
+    live_bullets = {}
+    next_bullet = 0
+    shrink = min(width, height) / (2.5 * turns)
+
+    for turn in range(turns):
+        deleted, updated = [], {}
+
+        for tank_id, position in tanks.items():
+            angle = rng.uniform(0, 2 * math.pi)
+            velocity = [math.cos(angle) * 150, math.sin(angle) * 150]
+            position[0] = min(max(position[0] + velocity[0] * tick, 0), width)
+            position[1] = min(max(position[1] + velocity[1] * tick, 0), height)
+            updated[tank_id] = {"type": 1, "position": list(position), "velocity": velocity, "hp": 5, "powerups": {}}
+
+        for bullet_id, (position, velocity) in list(live_bullets.items()):
+            position[0] += velocity[0] * tick
+            position[1] += velocity[1] * tick
+            if not (0 <= position[0] <= width and 0 <= position[1] <= height):
+                deleted.append(bullet_id)
+                del live_bullets[bullet_id]
+            else:
+                updated[bullet_id] = {
+                    "type": 2, "position": list(position), "velocity": list(velocity), "tank_id": ENEMY_TANK_ID,
+                    "damage": 1,
+                }
+
+        # Keep the bullet count near the target, fired from both tanks
+        while len(live_bullets) < bullets * min(1.0, (turn + 1) / 30):
+            shooter = rng.choice(list(tanks))
+            angle = rng.uniform(0, 2 * math.pi)
+            bullet_id = f"bullet-{next_bullet}"
+            next_bullet += 1
+            position = list(tanks[shooter])
+            velocity = [math.cos(angle) * bullet_speed, math.sin(angle) * bullet_speed]
+            live_bullets[bullet_id] = (position, velocity)
+            updated[bullet_id] = {
+                "type": 2, "position": list(position), "velocity": list(velocity), "tank_id": shooter, "damage": 1,
+            }
+
+        if live_powerups and rng.random() < 0.05:
+            taken = rng.choice(sorted(live_powerups))
+            live_powerups.discard(taken)
+            deleted.append(taken)
+        if len(live_powerups) < powerups and rng.random() < 0.05:
+            powerup_id = f"powerup-{next_powerup}"
+            next_powerup += 1
+            live_powerups.add(powerup_id)
+            updated[powerup_id] = {
+                "type": 7, "position": [rng.uniform(0, width), rng.uniform(0, height)], "powerup_type": "SPEED",
+            }
+
+        if destructible_walls and rng.random() < 0.02:
+            deleted.append(f"destructible-wall-{rng.randrange(destructible_walls)}")
+
+        inset = shrink * turn
+        updated["closing-boundary-1"] = {
+            "type": 6, "position": corners(inset, inset, width - inset, height - inset),
+            "velocity": [[shrink, -shrink], [shrink, shrink], [-shrink, shrink], [-shrink, -shrink]],
+        }
+
+        lines.append(message({"deleted_objects": deleted, "updated_objects": updated}, turn_time))
+
+    lines.append(json.dumps("END"))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--walls", type=int, default=3000)
+    parser.add_argument("--destructible-walls", type=int, default=300)
+    parser.add_argument("--bullets", type=int, default=300, help="Roughly how many bullets are in the air at once")
+    parser.add_argument("--powerups", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--width", type=float, default=1800)
+    parser.add_argument("--height", type=float, default=1000)
+    parser.add_argument("--time", type=float, default=0.1, help="Time to respond given in every message")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    lines = generate(
+        args.walls, args.destructible_walls, args.bullets, args.powerups, args.turns, args.width, args.height,
+        args.time, args.seed,
+    )
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    main()
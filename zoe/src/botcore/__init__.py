@@ -0,0 +1,9 @@
+"""
+Shared core of the bots: protocol I/O, the object store, the engines built on it (spatial index, line of sight,
+navigation, bullet threats, bounce shots, closing boundary, enemy tracker, powerup routes, cover, world history, hit
+table), the action search and its worker pool, the map cache, the turn scheduler, path output, telemetry and
+`BaseGame`, which ties them together. Each bot only adds its strategy on top.
+
+This directory is the one to edit. Every bot has a copy in its own src/botcore, because a bot's Docker image is built
+from its own directory only. Update the copies with `python tools/sync_core.py`.
+"""
@@ -0,0 +1,125 @@
+import math
+import typing
+
+from .constants import TANK_SIZE
+
+
+# A target that moved less than this is the same target
+SAME_TARGET_DISTANCE = 1.0
+
+# Path again once the target has moved further than this from the one we're on
+REPATH_DISTANCE = TANK_SIZE
+
+# ...or moved enough to change the direction we're heading in by more than this many degrees
+REPATH_ANGLE = 10.0
+
+# Closer than this to the path's target and we've got there, the server has stopped moving us
+ARRIVED_DISTANCE = TANK_SIZE / 2
+
+# Moving less than this in STUCK_TURNS turns while not there yet means the path is blocked
+STUCK_DISTANCE = 1.0
+STUCK_TURNS = 5
+
+# Why a path was sent again
+NEW, MOVED, TURNED, BLOCKED = "new", "moved", "turned", "blocked"
+
+
+class ActionOutput:
+    """
+    Sits between the bot's strategy and the game server, to stop the tank re-pathing every turn.
+    The server keeps following the last path it was given, and works out a new route every time it gets one, so
+    sending a slightly different target every turn (the powerup's or the enemy's latest position, a search candidate a
+    few units from the last one) makes it route again every tick and the tank jitters. Instead we stay committed to the
+    path we sent last and only send a new one when:
+    - the target is further than REPATH_DISTANCE from the one we're on, which includes going for a different
+      powerup or giving up on one,
+    - it's close, but in a direction more than REPATH_ANGLE degrees away from where we're heading,
+    - or we haven't moved for STUCK_TURNS turns without getting there, so the path is blocked.
+    Every other field is passed on unless it's None. Re-paths are counted by reason over the whole match.
+    """
+    def __init__(self):
+        # The path the server has, None until the first one is sent
+        self.path: typing.Optional[typing.List[float]] = None
+        self.requested = 0
+        self.repaths = {NEW: 0, MOVED: 0, TURNED: 0, BLOCKED: 0}
+        # Why the last response carried a path, None if it didn't
+        self.last_reason: typing.Optional[str] = None
+
+        self._anchor_x = None
+        self._anchor_y = None
+        self._still_turns = 0
+
+    def prepare(self, response: dict, x: float, y: float) -> dict:
+        """
+        Called once per turn with the response the strategy decided on.
+        :param x, y: Where our tank is this turn.
+        :return: The message to actually send.
+        """
+        stuck = self._update_stuck(x, y)
+        message = {field: value for field, value in response.items() if value is not None and field != "path"}
+        self.last_reason = None
+
+        target = response.get("path")
+        if target is None:
+            return message
+        self.requested += 1
+        target = [float(target[0]), float(target[1])]
+
+        reason = self._reason(target, x, y, stuck)
+        if reason is not None:
+            self.path = target
+            self.repaths[reason] += 1
+            self.last_reason = reason
+            self._still_turns = 0
+            message["path"] = target
+        return message
+
+    @property
+    def kept(self) -> int:
+        """
+        How many of the paths the strategy asked for weren't sent, because we were on one close enough already.
+        """
+        return self.requested - sum(self.repaths.values())
+
+    def summary(self) -> dict:
+        """
+        :return: Path counts for the match so far, for telemetry.
+        """
+        return {"paths_requested": self.requested, "paths_kept": self.kept, "repaths": dict(self.repaths)}
+
+    def _reason(self, target: typing.List[float], x: float, y: float, stuck: bool) -> typing.Optional[str]:
+        """
+        :return: Why the target should be sent, or None if we should stay on the path we're on.
+        """
+        if self.path is None:
+            return NEW
+        path_x, path_y = self.path
+        moved = math.hypot(target[0] - path_x, target[1] - path_y)
+        remaining = math.hypot(path_x - x, path_y - y)
+        if stuck and remaining > ARRIVED_DISTANCE:
+            return BLOCKED
+        if moved <= SAME_TARGET_DISTANCE:
+            return None
+        if moved > REPATH_DISTANCE or remaining <= ARRIVED_DISTANCE:
+            # Once we're there the server has stopped moving us, any new target counts
+            return MOVED
+        if math.hypot(target[0] - x, target[1] - y) <= ARRIVED_DISTANCE:
+            # Stopping short of the path's target
+            return MOVED
+        turned = math.degrees(abs(
+            math.atan2(target[1] - y, target[0] - x) - math.atan2(path_y - y, path_x - x)
+        ))
+        if min(turned, 360.0 - turned) > REPATH_ANGLE:
+            return TURNED
+        return None
+
+    def _update_stuck(self, x: float, y: float) -> bool:
+        """
+        :return: Whether we've stayed within STUCK_DISTANCE of the same spot for STUCK_TURNS turns.
+        """
+        if self._anchor_x is None or math.hypot(x - self._anchor_x, y - self._anchor_y) > STUCK_DISTANCE:
+            self._anchor_x, self._anchor_y = x, y
+            self._still_turns = 0
+            return False
+        self._still_turns += 1
+        return self._still_turns >= STUCK_TURNS
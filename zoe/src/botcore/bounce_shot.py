@@ -0,0 +1,218 @@
+import math
+import typing
+
+import numpy as np
+
+from .line_of_sight import LineOfSight, WALL_FLAG
+
+
+# Number of angular sectors used to work out which faces can be seen from a point
+SECTORS = 128
+
+# How far off a face bounce points are moved before checking line of sight, so they aren't inside the wall
+FACE_OFFSET = 0.5
+
+
+class BounceShot(typing.NamedTuple):
+    # Angle to shoot at in degrees, same convention as Game.find_angle
+    angle: float
+    bounces: int
+    # Total distance the bullet travels to reach the target
+    distance: float
+    # Where the bullet bounces, in order
+    points: typing.List[typing.Tuple[float, float]]
+
+
+class BounceShotSolver:
+    """
+    Finds shots that reach a target after bouncing off one or two walls or map edges.
+    The static walls are turned into a list of reflecting faces (axis aligned segments, merged along rows and columns)
+    once, when the solver is created. A bounce off a face is the same as a straight shot at the target mirrored in that
+    face, so every candidate shot is a single mirror + line/segment intersection, done for all faces (or face pairs) at
+    once with NumPy. Only faces that are the nearest in some angular sector around the shooter (or target) are
+    considered, which throws away faces hidden behind other walls before the pair search.
+    Candidates are tried shortest first and the first one that passes the line of sight checks is returned.
+    """
+    def __init__(self, line_of_sight: LineOfSight, width: float, height: float):
+        self.line_of_sight = line_of_sight
+        self.width = width
+        self.height = height
+
+        # Per face: which coordinate it's perpendicular to (0 = vertical face x=c, 1 = horizontal face y=c), c,
+        # its extent along the other axis, and which way it faces (+1 / -1 along its axis)
+        axis, position, low, high, normal = _wall_faces(line_of_sight)
+
+        # The map edges bounce bullets too
+        axis += [0, 0, 1, 1]
+        position += [0.0, width, 0.0, height]
+        low += [0.0, 0.0, 0.0, 0.0]
+        high += [height, height, width, width]
+        normal += [1, -1, 1, -1]
+
+        self.axis = np.array(axis, dtype=np.intp)
+        self.position = np.array(position, dtype=float)
+        self.low = np.array(low, dtype=float)
+        self.high = np.array(high, dtype=float)
+        self.normal = np.array(normal, dtype=float)
+
+        # Face end points and middles, used for the sector pruning
+        other = 1 - self.axis
+        samples = []
+        for along in (self.low, (self.low + self.high) / 2, self.high):
+            points = np.empty((len(self.axis), 2))
+            points[np.arange(len(self.axis)), self.axis] = self.position
+            points[np.arange(len(self.axis)), other] = along
+            samples.append(points)
+        self._samples = np.stack(samples)
+
+    def __len__(self):
+        return len(self.axis)
+
+    def visible_faces(self, x: float, y: float) -> np.ndarray:
+        """
+        :return: Indexes of the faces that face (x, y) and are the closest such face in at least one angular sector
+            around it.
+        """
+        facing = (np.where(self.axis == 0, x, y) - self.position) * self.normal > 0
+        candidates = np.flatnonzero(facing)
+        if len(candidates) == 0:
+            return candidates
+
+        offsets = self._samples[:, candidates, :] - (x, y)
+        distances = np.hypot(offsets[..., 0], offsets[..., 1]).ravel()
+        sectors = ((np.arctan2(offsets[..., 1], offsets[..., 0]).ravel() + math.pi) / (2 * math.pi) * SECTORS)
+        sectors = np.minimum(sectors.astype(np.intp), SECTORS - 1)
+        faces = np.tile(candidates, len(self._samples))
+
+        # Sort by sector then distance, and keep the first face of every sector
+        order = np.lexsort((distances, sectors))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sectors[order][1:] != sectors[order][:-1]
+        return np.unique(faces[order][first])
+
+    def _mirror(self, points: np.ndarray, faces: np.ndarray) -> np.ndarray:
+        mirrored = points.copy()
+        rows = np.arange(len(faces))
+        mirrored[rows, self.axis[faces]] = 2 * self.position[faces] - points[rows, self.axis[faces]]
+        return mirrored
+
+    def _hit_points(self, start: np.ndarray, end: np.ndarray, faces: np.ndarray):
+        """
+        Where the segments start -> end cross the given faces.
+        :return: (points, valid) where valid says whether the crossing is between the endpoints and on the face.
+        """
+        rows = np.arange(len(faces))
+        axis = self.axis[faces]
+        other = 1 - axis
+        start_along = start[rows, axis]
+        delta_along = end[rows, axis] - start_along
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (self.position[faces] - start_along) / delta_along
+        crossing = start[rows, other] + t * (end[rows, other] - start[rows, other])
+
+        points = np.empty((len(faces), 2))
+        points[rows, axis] = self.position[faces] + self.normal[faces] * FACE_OFFSET
+        points[rows, other] = crossing
+        valid = (t > 0) & (t < 1) & (crossing >= self.low[faces]) & (crossing <= self.high[faces])
+        return points, valid
+
+    def _is_clear(self, points: typing.Sequence[typing.Tuple[float, float]]) -> bool:
+        for (x1, y1), (x2, y2) in zip(points, points[1:]):
+            if not self.line_of_sight.has_line_of_sight(x1, y1, x2, y2):
+                return False
+        return True
+
+    def solve(self, x: float, y: float, target_x: float, target_y: float,
+              max_bounces: int = 2) -> typing.Optional[BounceShot]:
+        """
+        Finds the shortest shot from (x, y) that hits (target_x, target_y) after one or two bounces.
+        :return: The shot or None if there isn't one.
+        """
+        shooter = np.array([x, y], dtype=float)
+        target = np.array([target_x, target_y], dtype=float)
+
+        from_shooter = self.visible_faces(x, y)
+        from_target = self.visible_faces(target_x, target_y)
+
+        candidates = []
+
+        # One bounce: faces that both the shooter and the target can see
+        faces = np.intersect1d(from_shooter, from_target)
+        if len(faces):
+            mirrored = self._mirror(np.tile(target, (len(faces), 1)), faces)
+            points, valid = self._hit_points(np.tile(shooter, (len(faces), 1)), mirrored, faces)
+            lengths = np.hypot(*(mirrored - shooter).T)
+            for i in np.flatnonzero(valid):
+                candidates.append((lengths[i], mirrored[i], [(float(points[i][0]), float(points[i][1]))]))
+
+        # Two bounces: first face seen from the shooter, last face seen from the target
+        if max_bounces >= 2 and len(from_shooter) and len(from_target):
+            first, last = np.meshgrid(from_shooter, from_target, indexing="ij")
+            first, last = first.ravel(), last.ravel()
+            keep = first != last
+            first, last = first[keep], last[keep]
+
+            target_once = self._mirror(np.tile(target, (len(first), 1)), last)
+            target_twice = self._mirror(target_once, first)
+            first_points, first_valid = self._hit_points(np.tile(shooter, (len(first), 1)), target_twice, first)
+            last_points, last_valid = self._hit_points(first_points, target_once, last)
+            lengths = np.hypot(*(target_twice - shooter).T)
+            for i in np.flatnonzero(first_valid & last_valid):
+                candidates.append((lengths[i], target_twice[i], [
+                    (float(first_points[i][0]), float(first_points[i][1])),
+                    (float(last_points[i][0]), float(last_points[i][1])),
+                ]))
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        for length, aim, points in candidates:
+            if self._is_clear([(x, y)] + points + [(target_x, target_y)]):
+                angle = math.atan2(aim[1] - y, aim[0] - x) * 180 / math.pi
+                return BounceShot(angle, len(points), float(length), points)
+        return None
+
+
+def _wall_faces(line_of_sight: LineOfSight):
+    """
+    Finds every side of a wall cell that isn't against another wall cell, merging neighbouring sides into one face.
+    :return: (axis, position, low, high, normal) lists, one entry per face.
+    """
+    columns, rows, size = line_of_sight.columns, line_of_sight.rows, line_of_sight.cell_size
+    flags = line_of_sight.flags
+
+    def is_wall(cell_x, cell_y):
+        return 0 <= cell_x < columns and 0 <= cell_y < rows and flags[cell_y * columns + cell_x] & WALL_FLAG
+
+    axis, position, low, high, normal = [], [], [], [], []
+
+    def add(face_axis, face_position, face_low, face_high, face_normal):
+        axis.append(face_axis)
+        position.append(face_position)
+        low.append(face_low)
+        high.append(face_high)
+        normal.append(face_normal)
+
+    # Vertical faces (left and right sides of cells), walking down each column of cell borders
+    for cell_x in range(columns):
+        for side, neighbour_x, face_x in ((-1, cell_x - 1, cell_x * size), (1, cell_x + 1, (cell_x + 1) * size)):
+            run_start = None
+            for cell_y in range(rows + 1):
+                exposed = cell_y < rows and is_wall(cell_x, cell_y) and not is_wall(neighbour_x, cell_y)
+                if exposed and run_start is None:
+                    run_start = cell_y
+                elif not exposed and run_start is not None:
+                    add(0, face_x, run_start * size, cell_y * size, side)
+                    run_start = None
+
+    # Horizontal faces (top and bottom sides of cells), walking along each row of cell borders
+    for cell_y in range(rows):
+        for side, neighbour_y, face_y in ((-1, cell_y - 1, cell_y * size), (1, cell_y + 1, (cell_y + 1) * size)):
+            run_start = None
+            for cell_x in range(columns + 1):
+                exposed = cell_x < columns and is_wall(cell_x, cell_y) and not is_wall(cell_x, neighbour_y)
+                if exposed and run_start is None:
+                    run_start = cell_x
+                elif not exposed and run_start is not None:
+                    add(1, face_y, run_start * size, cell_x * size, side)
+                    run_start = None
+
+    return axis, position, low, high, normal
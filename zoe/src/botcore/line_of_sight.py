@@ -0,0 +1,173 @@
+import math
+import typing
+
+from .constants import WALL_SIZE
+
+
+# Results of a trace
+CLEAR = 0
+BLOCKED_BY_WALL = 1
+BLOCKED_BY_DESTRUCTIBLE_WALL = 2
+
+# Flags stored per grid cell
+WALL_FLAG = 1
+DESTRUCTIBLE_FLAG = 2
+
+# Cached results are dropped once there are more than this many of them
+MAX_CACHE_SIZE = 4096
+
+
+class LineOfSight:
+    """
+    Answers "can I see / shoot from A to B" by walking the segment over a grid of wall cells (a DDA traversal, like
+    Bresenham's line but without missing any cell the segment touches) and stopping at the first cell with a wall in it.
+    Static walls are added once, destructible walls are tracked by id so they can be removed when they get destroyed.
+    Results are cached per (start cell, end cell), so asking again while neither endpoint left its cell is a dict
+    lookup.
+    """
+    def __init__(self, width: float, height: float, cell_size: float = WALL_SIZE):
+        self.cell_size = cell_size
+        self.columns = int(math.ceil(width / cell_size)) + 1
+        self.rows = int(math.ceil(height / cell_size)) + 1
+
+        # One byte per cell holding WALL_FLAG / DESTRUCTIBLE_FLAG, row by row
+        self._flags = bytearray(self.columns * self.rows)
+        # Number of destructible walls covering a cell, so overlapping walls don't clear each other's flag
+        self._destructible_counts = {}
+        # {destructible-wall-id: [cell, ...]}
+        self._destructible_cells = {}
+
+        self._cache = {}
+
+    @property
+    def flags(self) -> bytearray:
+        """
+        The grid itself: one byte of WALL_FLAG / DESTRUCTIBLE_FLAG per cell, row by row (index = y * columns + x).
+        It is updated in place, so views on it stay current. Do not modify it.
+        """
+        return self._flags
+
+    def _cells_covered(self, x: float, y: float) -> typing.List[int]:
+        """
+        :return: Indexes of every cell the wall centered at (x, y) overlaps.
+        """
+        half = WALL_SIZE / 2
+        # Shrink a little so a wall lying exactly on the grid doesn't bleed into its neighbours
+        epsilon = 1e-6
+        min_x = max(int((x - half + epsilon) // self.cell_size), 0)
+        max_x = min(int((x + half - epsilon) // self.cell_size), self.columns - 1)
+        min_y = max(int((y - half + epsilon) // self.cell_size), 0)
+        max_y = min(int((y + half - epsilon) // self.cell_size), self.rows - 1)
+        return [
+            cell_y * self.columns + cell_x
+            for cell_y in range(min_y, max_y + 1)
+            for cell_x in range(min_x, max_x + 1)
+        ]
+
+    def add_wall(self, x: float, y: float):
+        for cell in self._cells_covered(x, y):
+            self._flags[cell] |= WALL_FLAG
+        self._cache.clear()
+
+    def add_destructible_wall(self, object_id: str, x: float, y: float):
+        if object_id in self._destructible_cells:
+            return
+
+        cells = self._cells_covered(x, y)
+        self._destructible_cells[object_id] = cells
+        for cell in cells:
+            self._destructible_counts[cell] = self._destructible_counts.get(cell, 0) + 1
+            self._flags[cell] |= DESTRUCTIBLE_FLAG
+        self._cache.clear()
+
+    def remove_destructible_wall(self, object_id: str):
+        """
+        Removes a destroyed wall. Unknown ids are ignored.
+        """
+        cells = self._destructible_cells.pop(object_id, None)
+        if cells is None:
+            return
+
+        for cell in cells:
+            count = self._destructible_counts[cell] - 1
+            if count:
+                self._destructible_counts[cell] = count
+            else:
+                del self._destructible_counts[cell]
+                self._flags[cell] &= ~DESTRUCTIBLE_FLAG
+        self._cache.clear()
+
+    def is_wall(self, x: float, y: float, include_destructible: bool = True) -> bool:
+        cell_x = int(x // self.cell_size)
+        cell_y = int(y // self.cell_size)
+        if not (0 <= cell_x < self.columns and 0 <= cell_y < self.rows):
+            return False
+        mask = WALL_FLAG | DESTRUCTIBLE_FLAG if include_destructible else WALL_FLAG
+        return bool(self._flags[cell_y * self.columns + cell_x] & mask)
+
+    def trace(self, x1: float, y1: float, x2: float, y2: float, include_destructible: bool = True) -> int:
+        """
+        Walks from (x1, y1) to (x2, y2) and reports what blocks the way first.
+        The cells the two endpoints are in are not checked, since that's where the tanks are standing.
+        :param include_destructible: If False destructible walls are ignored, e.g. to see if breaking one would help.
+        :return: CLEAR, BLOCKED_BY_WALL or BLOCKED_BY_DESTRUCTIBLE_WALL.
+        """
+        size = self.cell_size
+        cell_x, cell_y = int(x1 // size), int(y1 // size)
+        end_x, end_y = int(x2 // size), int(y2 // size)
+
+        key = (cell_x, cell_y, end_x, end_y, include_destructible)
+        result = self._cache.get(key)
+        if result is not None:
+            return result
+
+        result = self._walk(x1, y1, x2, y2, cell_x, cell_y, end_x, end_y, include_destructible)
+
+        if len(self._cache) >= MAX_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def has_line_of_sight(self, x1: float, y1: float, x2: float, y2: float,
+                          include_destructible: bool = True) -> bool:
+        return self.trace(x1, y1, x2, y2, include_destructible) == CLEAR
+
+    def _walk(self, x1, y1, x2, y2, cell_x, cell_y, end_x, end_y, include_destructible):
+        size = self.cell_size
+        columns, rows = self.columns, self.rows
+        flags = self._flags
+        mask = WALL_FLAG | DESTRUCTIBLE_FLAG if include_destructible else WALL_FLAG
+
+        dx = x2 - x1
+        dy = y2 - y1
+
+        # For each axis: which way we step, the ray parameter t at the next cell border and how much t grows per cell
+        if dx > 0:
+            step_x, t_max_x, t_delta_x = 1, ((cell_x + 1) * size - x1) / dx, size / dx
+        elif dx < 0:
+            step_x, t_max_x, t_delta_x = -1, (cell_x * size - x1) / dx, -size / dx
+        else:
+            step_x, t_max_x, t_delta_x = 0, math.inf, math.inf
+
+        if dy > 0:
+            step_y, t_max_y, t_delta_y = 1, ((cell_y + 1) * size - y1) / dy, size / dy
+        elif dy < 0:
+            step_y, t_max_y, t_delta_y = -1, (cell_y * size - y1) / dy, -size / dy
+        else:
+            step_y, t_max_y, t_delta_y = 0, math.inf, math.inf
+
+        # The number of cells between the endpoints is fixed, so there's no need to compare floats to know when to stop
+        for _ in range(abs(end_x - cell_x) + abs(end_y - cell_y) - 1):
+            if t_max_x < t_max_y:
+                cell_x += step_x
+                t_max_x += t_delta_x
+            else:
+                cell_y += step_y
+                t_max_y += t_delta_y
+
+            if 0 <= cell_x < columns and 0 <= cell_y < rows:
+                cell_flags = flags[cell_y * columns + cell_x] & mask
+                if cell_flags:
+                    return BLOCKED_BY_WALL if cell_flags & WALL_FLAG else BLOCKED_BY_DESTRUCTIBLE_WALL
+
+        return CLEAR
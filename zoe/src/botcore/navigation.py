@@ -0,0 +1,209 @@
+import heapq
+import math
+import time
+import typing
+from array import array
+from collections import OrderedDict
+
+from .constants import WALL_SIZE
+
+
+SQRT2 = math.sqrt(2)
+
+# How many distance fields are kept around before the least recently used one is dropped
+DEFAULT_CACHE_SIZE = 32
+
+# (dx, dy, cost) of every move from a cell to its neighbours
+_MOVES = (
+    (1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+    (1, 1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2), (-1, -1, SQRT2),
+)
+
+
+class NavigationGrid:
+    """
+    An occupancy grid of the map that knows how far apart two points are when walking around the walls.
+    For every target cell asked about it builds a distance field (Dijkstra over the grid, 8 neighbours, no cutting
+    corners past walls) that holds the walking distance from every cell to that target. Fields are kept in an LRU cache,
+    so once a target has been seen, the distance from anywhere to it is a single list lookup.
+    When a destructible wall gets destroyed, the cached fields are patched around the freed cells instead of rebuilt.
+    """
+    def __init__(self, width: float, height: float, cell_size: float = WALL_SIZE,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.cell_size = cell_size
+        self.columns = int(math.ceil(width / cell_size)) + 1
+        self.rows = int(math.ceil(height / cell_size)) + 1
+        self.cache_size = cache_size
+
+        # Number of walls covering each cell, a cell can be walked on when this is 0
+        self._blocked = array("H", bytes(2 * self.columns * self.rows))
+        # {destructible-wall-id: [cell, ...]}
+        self._destructible_cells = {}
+        # {target-cell: distances}
+        self._fields = OrderedDict()
+
+        # Running average of how long building a distance field takes, in seconds
+        self.field_build_time = 0.0
+
+        # Goes up every time a wall is added or removed, so users can tell their cached distances are stale
+        self.version = 0
+
+    def cell_of(self, x: float, y: float) -> int:
+        """
+        :return: Index of the cell (x, y) is in. Points outside the map are clamped to the closest cell.
+        """
+        cell_x = min(max(int(x // self.cell_size), 0), self.columns - 1)
+        cell_y = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return cell_y * self.columns + cell_x
+
+    def cell_center(self, cell: int) -> typing.Tuple[float, float]:
+        cell_y, cell_x = divmod(cell, self.columns)
+        return (cell_x + 0.5) * self.cell_size, (cell_y + 0.5) * self.cell_size
+
+    def is_walkable(self, x: float, y: float) -> bool:
+        return self._blocked[self.cell_of(x, y)] == 0
+
+    def _cells_covered(self, x: float, y: float) -> typing.List[int]:
+        half = WALL_SIZE / 2
+        epsilon = 1e-6
+        min_x = max(int((x - half + epsilon) // self.cell_size), 0)
+        max_x = min(int((x + half - epsilon) // self.cell_size), self.columns - 1)
+        min_y = max(int((y - half + epsilon) // self.cell_size), 0)
+        max_y = min(int((y + half - epsilon) // self.cell_size), self.rows - 1)
+        return [
+            cell_y * self.columns + cell_x
+            for cell_y in range(min_y, max_y + 1)
+            for cell_x in range(min_x, max_x + 1)
+        ]
+
+    def add_wall(self, x: float, y: float):
+        for cell in self._cells_covered(x, y):
+            self._blocked[cell] += 1
+        # New walls can only make paths longer, which can't be patched in place
+        self._fields.clear()
+        self.version += 1
+
+    def add_destructible_wall(self, object_id: str, x: float, y: float):
+        if object_id in self._destructible_cells:
+            return
+
+        cells = self._cells_covered(x, y)
+        self._destructible_cells[object_id] = cells
+        for cell in cells:
+            self._blocked[cell] += 1
+        self._fields.clear()
+        self.version += 1
+
+    def remove_destructible_wall(self, object_id: str):
+        """
+        Removes a destroyed wall and updates the cached distance fields. Unknown ids are ignored.
+        """
+        cells = self._destructible_cells.pop(object_id, None)
+        if cells is None:
+            return
+
+        freed = []
+        for cell in cells:
+            self._blocked[cell] -= 1
+            if self._blocked[cell] == 0:
+                freed.append(cell)
+
+        if freed:
+            for target, distances in self._fields.items():
+                self._patch(distances, freed, target)
+            self.version += 1
+
+    def distance_field(self, x: float, y: float) -> typing.List[float]:
+        """
+        :return: The walking distance (in map units) from every cell to the cell (x, y) is in, indexed by cell.
+            Unreachable cells are math.inf.
+        """
+        target = self.cell_of(x, y)
+        distances = self._fields.get(target)
+        if distances is not None:
+            self._fields.move_to_end(target)
+            return distances
+
+        started = time.perf_counter()
+        distances = [math.inf] * (self.columns * self.rows)
+        if self._blocked[target] == 0:
+            distances[target] = 0.0
+            self._propagate(distances, [(0.0, target)])
+
+        build_time = time.perf_counter() - started
+        if self.field_build_time:
+            self.field_build_time = 0.8 * self.field_build_time + 0.2 * build_time
+        else:
+            self.field_build_time = build_time
+
+        self._fields[target] = distances
+        if len(self._fields) > self.cache_size:
+            self._fields.popitem(last=False)
+        return distances
+
+    def has_distance_field(self, x: float, y: float) -> bool:
+        """
+        :return: Whether the distance field to (x, y) is already cached, so path_distance to it is instant.
+        """
+        return self.cell_of(x, y) in self._fields
+
+    def path_distance(self, from_x: float, from_y: float, to_x: float, to_y: float) -> float:
+        """
+        :return: The walking distance from one point to the other, or math.inf if there is no way around the walls.
+        """
+        return self.distance_field(to_x, to_y)[self.cell_of(from_x, from_y)]
+
+    def _propagate(self, distances, heap):
+        """
+        Dijkstra from the given (distance, cell) heap, only ever lowering distances.
+        """
+        columns, rows = self.columns, self.rows
+        blocked = self._blocked
+        cell_size = self.cell_size
+
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance > distances[cell]:
+                continue
+
+            cell_y, cell_x = divmod(cell, columns)
+            for dx, dy, cost in _MOVES:
+                next_x = cell_x + dx
+                next_y = cell_y + dy
+                if not (0 <= next_x < columns and 0 <= next_y < rows):
+                    continue
+                next_cell = next_y * columns + next_x
+                if blocked[next_cell]:
+                    continue
+                # Don't cut corners past walls when moving diagonally
+                if dx and dy and (blocked[cell_y * columns + next_x] or blocked[next_y * columns + cell_x]):
+                    continue
+
+                next_distance = distance + cost * cell_size
+                if next_distance < distances[next_cell]:
+                    distances[next_cell] = next_distance
+                    heapq.heappush(heap, (next_distance, next_cell))
+
+    def _patch(self, distances, freed_cells, target):
+        """
+        Updates the distance field to `target` after the given cells became walkable. Removing walls can only make
+        paths shorter, and every new shortcut goes through a freed cell or a diagonal next to one, so it's enough to
+        restart the search from the freed cells and their neighbours. If the target itself was under the wall, nothing
+        could reach it before, so the search starts over from the target.
+        """
+        columns, rows = self.columns, self.rows
+        heap = []
+        if target in freed_cells:
+            distances[target] = 0.0
+            heap.append((0.0, target))
+        for cell in freed_cells:
+            cell_y, cell_x = divmod(cell, columns)
+            for dx, dy, _ in _MOVES:
+                next_x = cell_x + dx
+                next_y = cell_y + dy
+                if 0 <= next_x < columns and 0 <= next_y < rows:
+                    next_cell = next_y * columns + next_x
+                    if distances[next_cell] < math.inf:
+                        heap.append((distances[next_cell], next_cell))
+        heapq.heapify(heap)
+        self._propagate(distances, heap)
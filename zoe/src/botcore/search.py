@@ -0,0 +1,294 @@
+import math
+import typing
+
+import numpy as np
+
+from .boundary import ClosingBoundary
+from .constants import BULLET_SPEED, TANK_SPEED, TICK_DURATION
+from .line_of_sight import LineOfSight
+from .navigation import NavigationGrid
+from .scheduler import Deadline
+from .threats import BulletThreats, HIT_RADIUS
+from .tracker import MotionTracker
+
+
+# How many ticks every action is played forward
+DEFAULT_HORIZON_TICKS = 20
+
+# Rollouts are run in batches of this size until the deadline or MAX_ROLLOUTS
+BATCH_ROLLOUTS = 16
+MAX_ROLLOUTS = 128
+
+# Directions tried for moving, besides staying put and the targets the bot asks about
+MOVE_DIRECTIONS = 8
+
+# Chance that the enemy keeps going the way the tracker says in a rollout, instead of heading off somewhere random
+KEEP_COURSE = 0.5
+
+# Chance that the enemy fires at us during a rollout, unless the caller knows better
+FIRE_PROBABILITY = 0.5
+
+# Score of an action: what we expect to deal and take, how much closer it gets us to the goal, and staying inside
+DAMAGE_TAKEN_WEIGHT = 2.0
+PROGRESS_WEIGHT = 0.5
+OUTSIDE_BOUNDARY_PENALTY = 5.0
+
+
+class SearchResult(typing.NamedTuple):
+    path: typing.List[float]
+    # Angle to shoot at, or None if there were no angles to try
+    shoot: typing.Optional[float]
+    # Share of rollouts in which the shot hit
+    hit_probability: float
+    # Hits we expect to take on the chosen path
+    expected_damage: float
+    rollouts: int
+
+
+class ActionSearch:
+    """
+    Picks where to go and where to shoot by playing candidate actions a few ticks forward in a simple model of the game.
+    The model moves our tank in a straight line towards each candidate path point (stopping at walls), moves the known
+    bullets the way BulletThreats predicts them, and moves the enemy and its possible shots at random in every rollout,
+    starting from what the enemy tracker knows. Each rollout batch plays every candidate against every sampled enemy in
+    a few array operations, and batches keep coming until the deadline.
+    A shot leaves from where we are now whatever path we take, so paths and shots are scored separately and the best
+    of each is combined.
+    Given a worker pool, the rollouts are split between this process and the idle workers, see `workers`.
+    """
+    def __init__(self, threats: BulletThreats, line_of_sight: LineOfSight, navigation: NavigationGrid,
+                 width: float, height: float, seed: typing.Optional[int] = None, pool=None):
+        self.threats = threats
+        self.pool = pool
+        self.navigation = navigation
+        self.width = width
+        self.height = height
+        self._rng = np.random.default_rng(seed)
+
+        self._cell_size = line_of_sight.cell_size
+        # A view on the line of sight grid, so destroyed walls show up here without any extra work
+        self._grid = np.frombuffer(line_of_sight.flags, dtype=np.uint8).reshape(
+            line_of_sight.rows, line_of_sight.columns,
+        )
+
+    def movement_candidates(self, x: float, y: float, targets: typing.Iterable[typing.Optional[typing.Sequence[float]]],
+                            ticks: int = DEFAULT_HORIZON_TICKS) -> typing.List[typing.List[float]]:
+        """
+        :param targets: Points the bot would like to go to anyway, like a powerup or the path it's already on. None
+            entries are skipped.
+        :return: Points to try as the path: staying put, the targets, and a step in every direction.
+        """
+        candidates = [[x, y]]
+        candidates.extend([float(target[0]), float(target[1])] for target in targets if target is not None)
+        reach = TANK_SPEED * ticks * TICK_DURATION
+        for index in range(MOVE_DIRECTIONS):
+            angle = 2 * math.pi * index / MOVE_DIRECTIONS
+            candidates.append([
+                min(max(x + reach * math.cos(angle), 0.0), self.width),
+                min(max(y + reach * math.sin(angle), 0.0), self.height),
+            ])
+        return candidates
+
+    def plan(self, x: float, y: float, enemy: MotionTracker, paths: typing.Sequence[typing.Sequence[float]],
+             angles: typing.Sequence[float], deadline: typing.Optional[Deadline] = None,
+             goal: typing.Optional[typing.Sequence[float]] = None,
+             boundary: typing.Optional[ClosingBoundary] = None, fire_probability: float = FIRE_PROBABILITY,
+             ticks: int = DEFAULT_HORIZON_TICKS, max_rollouts: int = MAX_ROLLOUTS) -> SearchResult:
+        """
+        :param paths: Candidate path points, see `movement_candidates`.
+        :param angles: Candidate shooting angles in degrees.
+        :param deadline: Rollouts stop once it expires. At least one batch is always run.
+        :param goal: Where we're trying to get to in the long run. Paths that get closer to it score higher.
+        :param boundary: Paths that end up outside the closing boundary are penalised.
+        :param fire_probability: Chance that the enemy fires at us within the ticks played forward.
+        """
+        steps = np.arange(1, ticks + 1) * TICK_DURATION
+        start = np.array([x, y])
+
+        positions = self._move(start, np.asarray(paths, dtype=float).reshape(-1, 2), steps)
+        bullets = self._shots(start, np.radians(np.asarray(angles, dtype=float)), steps)
+
+        # Bullets already flying don't depend on the rollout
+        trajectory = self.threats.project(ticks)
+        known_damage = (
+            (np.abs(positions[:, :, None, :] - trajectory[None, :, :, :]) <= HIT_RADIUS).all(axis=3).any(axis=1)
+        ).sum(axis=1)
+
+        rollouts = 0
+        hits_dealt = np.zeros(len(bullets))
+        hits_taken = np.zeros(len(positions))
+        enemy_state = (enemy.x, enemy.y, enemy.vx, enemy.vy)
+
+        # Every idle worker plays as many rollouts as we do here
+        helpers = self.pool.idle_workers if self.pool is not None else 0
+        if helpers:
+            share = max(max_rollouts // (helpers + 1), BATCH_ROLLOUTS)
+            helpers = self.pool.dispatch(
+                positions, bullets, enemy_state, steps, fire_probability, self.width, self.height,
+                share // BATCH_ROLLOUTS,
+            )
+            if helpers:
+                max_rollouts = share
+
+        while rollouts < max_rollouts:
+            dealt, taken = play_batch(
+                self._rng, positions, bullets, enemy_state, steps, fire_probability, self.width, self.height,
+            )
+            hits_dealt += dealt
+            hits_taken += taken
+            rollouts += BATCH_ROLLOUTS
+            if deadline is not None and deadline.expired():
+                break
+
+        if helpers:
+            dealt, taken, played = self.pool.collect(deadline)
+            hits_dealt += dealt
+            hits_taken += taken
+            rollouts += played
+
+        expected_damage = known_damage + hits_taken / rollouts
+        scores = -DAMAGE_TAKEN_WEIGHT * expected_damage
+        if goal is not None:
+            scores += PROGRESS_WEIGHT * self._progress(start, positions[:, -1], goal, steps[-1])
+        if boundary is not None:
+            outside = [not boundary.contains_after(end_x, end_y, ticks) for end_x, end_y in positions[:, -1]]
+            scores -= OUTSIDE_BOUNDARY_PENALTY * np.array(outside, dtype=float)
+
+        best_path = int(np.argmax(scores))
+        shoot, hit_probability = None, 0.0
+        if len(bullets):
+            best_shot = int(np.argmax(hits_dealt))
+            shoot = float(angles[best_shot])
+            hit_probability = float(hits_dealt[best_shot] / rollouts)
+
+        return SearchResult(
+            [float(paths[best_path][0]), float(paths[best_path][1])],
+            shoot,
+            hit_probability,
+            float(expected_damage[best_path]),
+            rollouts,
+        )
+
+    def _blocked(self, points: np.ndarray) -> np.ndarray:
+        """
+        :return: Whether each point is in a cell with any kind of wall, for points of any shape (..., 2).
+        """
+        rows, columns = self._grid.shape
+        cells = (points // self._cell_size).astype(np.intp)
+        cell_x = np.clip(cells[..., 0], 0, columns - 1)
+        cell_y = np.clip(cells[..., 1], 0, rows - 1)
+        return self._grid[cell_y, cell_x] != 0
+
+    def _move(self, start: np.ndarray, targets: np.ndarray, steps: np.ndarray) -> np.ndarray:
+        """
+        :return: Our position on every tick when heading straight for each target: (targets, ticks, 2). A move that
+            runs into a wall stays where it was just before it.
+        """
+        offset = targets - start
+        length = np.linalg.norm(offset, axis=1)
+        direction = offset / np.maximum(length, 1e-9)[:, None]
+        travelled = np.minimum(TANK_SPEED * steps[None, :], length[:, None])
+        positions = np.clip(start + direction[:, None, :] * travelled[:, :, None], 0, [self.width, self.height])
+
+        blocked = self._blocked(positions)
+        ticks = len(steps)
+        first_blocked = np.where(blocked.any(axis=1), blocked.argmax(axis=1), ticks)
+        last_free = np.minimum(np.arange(ticks)[None, :], first_blocked[:, None] - 1)
+        held = positions[np.arange(len(targets))[:, None], np.maximum(last_free, 0)]
+        return np.where((last_free >= 0)[:, :, None], held, start)
+
+    def _shots(self, start: np.ndarray, angles: np.ndarray, steps: np.ndarray) -> np.ndarray:
+        """
+        :return: Where a bullet fired now at each angle is on every tick: (angles, ticks, 2). NaN once it hits a wall.
+        """
+        direction = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        bullets = start + direction[:, None, :] * (BULLET_SPEED * steps)[None, :, None]
+        stopped = np.logical_or.accumulate(self._blocked(bullets), axis=1)
+        return np.where(stopped[:, :, None], np.nan, bullets)
+
+    def _progress(self, start: np.ndarray, ends: np.ndarray, goal: typing.Sequence[float],
+                  seconds: float) -> np.ndarray:
+        """
+        :return: How much closer each end point is to the goal than the start, as a share of the distance we could
+            cover in the time. Distances are walking around walls if the navigation grid already has them at hand,
+            building them here would take too long, otherwise they're straight lines.
+        """
+        walk = self.navigation.has_distance_field(goal[0], goal[1])
+
+        def distance(point):
+            if walk:
+                walking = self.navigation.path_distance(point[0], point[1], goal[0], goal[1])
+                if not math.isinf(walking):
+                    return walking
+            return math.hypot(goal[0] - point[0], goal[1] - point[1])
+
+        start_distance = distance(start)
+        gained = np.array([start_distance - distance(end) for end in ends])
+        return gained / (TANK_SPEED * seconds)
+
+
+def play_batch(rng: np.random.Generator, positions: np.ndarray, bullets: np.ndarray,
+               enemy_state: typing.Sequence[float], steps: np.ndarray, fire_probability: float,
+               width: float, height: float) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Plays one batch of BATCH_ROLLOUTS rollouts of every candidate against randomly sampled enemy behaviour.
+    Only needs arrays and numbers, so it can run anywhere, see `workers`.
+    :param positions: Our position on every tick for each candidate path: (paths, ticks, 2).
+    :param bullets: Our bullet on every tick for each candidate angle: (angles, ticks, 2), NaN once it's stopped.
+    :param enemy_state: The enemy's x, y, vx, vy as the tracker estimates them.
+    :return: (rollouts in which the shot at each angle hit, rollouts in which we were hit on each path).
+    """
+    enemy_positions = _sample_enemy(rng, enemy_state, BATCH_ROLLOUTS, steps, width, height)
+    hits_dealt = np.zeros(len(bullets))
+    if len(bullets):
+        hits_dealt = _hits_on_enemy(bullets, enemy_positions).sum(axis=1)
+    hits_taken = _hits_from_enemy(rng, positions, enemy_positions, steps, fire_probability).sum(axis=1)
+    return hits_dealt, hits_taken
+
+
+def _sample_enemy(rng: np.random.Generator, enemy_state: typing.Sequence[float], rollouts: int, steps: np.ndarray,
+                  width: float, height: float) -> np.ndarray:
+    """
+    :return: Where the enemy is on every tick in each rollout: (rollouts, ticks, 2). It either keeps the course the
+        tracker estimated or picks a random direction and speed.
+    """
+    x, y, vx, vy = enemy_state
+    heading = rng.uniform(0, 2 * math.pi, rollouts)
+    speed = rng.uniform(0, TANK_SPEED, rollouts)
+    velocity = np.stack([np.cos(heading) * speed, np.sin(heading) * speed], axis=1)
+    keep = rng.random(rollouts) < KEEP_COURSE
+    velocity[keep] = (vx, vy)
+
+    positions = np.array([x, y]) + velocity[:, None, :] * steps[None, :, None]
+    return np.clip(positions, 0, [width, height])
+
+
+def _hits_on_enemy(bullets: np.ndarray, enemy_positions: np.ndarray) -> np.ndarray:
+    """
+    :return: (angles, rollouts) whether the shot at each angle hits the enemy in each rollout.
+    """
+    close = np.abs(bullets[:, None, :, :] - enemy_positions[None, :, :, :]) <= HIT_RADIUS
+    return close.all(axis=3).any(axis=2)
+
+
+def _hits_from_enemy(rng: np.random.Generator, positions: np.ndarray, enemy_positions: np.ndarray, steps: np.ndarray,
+                     fire_probability: float) -> np.ndarray:
+    """
+    In every rollout the enemy might fire once, at a random tick, straight at where we are on that tick.
+    :return: (paths, rollouts) whether that shot hits us on each path.
+    """
+    paths, ticks = positions.shape[:2]
+    rollouts = len(enemy_positions)
+    fires = rng.random(rollouts) < fire_probability
+    fired_at = rng.integers(0, ticks, rollouts)
+
+    origin = enemy_positions[np.arange(rollouts), fired_at]
+    aimed_at = positions[:, fired_at]
+    offset = aimed_at - origin[None, :, :]
+    direction = offset / np.maximum(np.linalg.norm(offset, axis=2), 1e-9)[:, :, None]
+
+    # Time the bullet has been flying on every tick, negative before it's fired: (rollouts, ticks)
+    flying = steps[None, :] - steps[fired_at][:, None]
+    bullet = origin[None, :, None, :] + direction[:, :, None, :] * (BULLET_SPEED * flying)[None, :, :, None]
+    close = (np.abs(bullet - positions[:, None, :, :]) <= HIT_RADIUS).all(axis=3) & (flying > 0)[None, :, :]
+    return close.any(axis=2) & fires[None, :]
@@ -0,0 +1,197 @@
+import math
+import typing
+
+import numpy as np
+
+from .constants import TANK_SIZE, TANK_SPEED, TICK_DURATION
+from .line_of_sight import LineOfSight, WALL_FLAG, DESTRUCTIBLE_FLAG
+
+
+# How far ahead bullets are projected by default
+DEFAULT_LOOKAHEAD_TICKS = 30
+
+# A bullet hits a tank once its center is this close to the tank's center on both axes
+HIT_RADIUS = TANK_SIZE / 2 + 2.0
+
+# Directions the dodge planner tries, besides staying put
+DODGE_DIRECTIONS = 16
+
+
+class BulletThreats:
+    """
+    Keeps every live bullet's position and velocity in one NumPy array and predicts where they'll be.
+    All bullets are moved together one tick at a time, bouncing off walls and the map edges and dying on destructible
+    walls, which gives their trajectories for the next few ticks. Those are then checked against our tank's hitbox,
+    and against a set of dodge moves, in single array operations rather than a Python loop per bullet.
+    Bullets are added/updated/removed by id every turn, like the rest of the game state.
+    """
+    def __init__(self, line_of_sight: LineOfSight, width: float, height: float, own_tank_id: str,
+                 capacity: int = 64):
+        self.width = width
+        self.height = height
+        self.own_tank_id = own_tank_id
+
+        self._cell_size = line_of_sight.cell_size
+        # A view on the line of sight grid, so destroyed walls show up here without any extra work
+        self._grid = np.frombuffer(line_of_sight.flags, dtype=np.uint8).reshape(
+            line_of_sight.rows, line_of_sight.columns,
+        )
+
+        # Row i holds x, y, vx, vy of the bullet self._ids[i]. Only the first len(self._ids) rows are in use.
+        self._state = np.zeros((capacity, 4))
+        # Whether the bullet in that row was shot by someone else
+        self._hostile = np.zeros(capacity, dtype=bool)
+        self._ids = []
+        self._rows = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def update(self, object_id: str, x: float, y: float, vx: float, vy: float, tank_id: typing.Optional[str]):
+        """
+        Adds a new bullet or updates a known one.
+        """
+        row = self._rows.get(object_id)
+        if row is None:
+            row = len(self._ids)
+            if row == len(self._state):
+                self._state = np.concatenate([self._state, np.zeros_like(self._state)])
+                self._hostile = np.concatenate([self._hostile, np.zeros_like(self._hostile)])
+            self._ids.append(object_id)
+            self._rows[object_id] = row
+
+        self._state[row] = (x, y, vx, vy)
+        self._hostile[row] = tank_id != self.own_tank_id
+
+    def remove(self, object_id: str):
+        """
+        Forgets a bullet. Unknown ids are ignored.
+        """
+        row = self._rows.pop(object_id, None)
+        if row is None:
+            return
+
+        # Move the last bullet into the freed row so the used rows stay packed
+        last = len(self._ids) - 1
+        last_id = self._ids.pop()
+        if row != last:
+            self._state[row] = self._state[last]
+            self._hostile[row] = self._hostile[last]
+            self._ids[row] = last_id
+            self._rows[last_id] = row
+
+    def project(self, ticks: int = DEFAULT_LOOKAHEAD_TICKS, hostile_only: bool = True,
+                tick_duration: float = TICK_DURATION) -> np.ndarray:
+        """
+        Predicts where the bullets will be for each of the next `ticks` ticks.
+        :return: Array of shape (ticks, bullets, 2) of positions. Bullets that got destroyed are NaN from then on.
+        """
+        count = len(self._ids)
+        state = self._state[:count]
+        if hostile_only:
+            state = state[self._hostile[:count]]
+
+        position = state[:, :2].copy()
+        velocity = state[:, 2:].copy()
+        alive = np.ones(len(state), dtype=bool)
+        trajectory = np.empty((ticks, len(state), 2))
+
+        grid = self._grid
+        rows, columns = grid.shape
+        size = self._cell_size
+        limits = np.array([self.width, self.height])
+
+        for tick in range(ticks):
+            moved = position + velocity * tick_duration
+
+            # Bounce off the edges of the map
+            outside = (moved < 0) | (moved > limits)
+            velocity[outside] *= -1
+
+            # Bounce off walls: flip the axis whose cell border we crossed into the wall
+            old_cell = np.clip((position // size).astype(np.intp), 0, [columns - 1, rows - 1])
+            new_cell = np.clip((moved // size).astype(np.intp), 0, [columns - 1, rows - 1])
+            flags = grid[new_cell[:, 1], new_cell[:, 0]]
+            hit_wall = (flags & WALL_FLAG).astype(bool)
+            if hit_wall.any():
+                wall_along_x = (grid[old_cell[:, 1], new_cell[:, 0]] & WALL_FLAG).astype(bool)
+                wall_along_y = (grid[new_cell[:, 1], old_cell[:, 0]] & WALL_FLAG).astype(bool)
+                # Hitting a corner head on flips both axes
+                velocity[hit_wall & (wall_along_x | ~wall_along_y), 0] *= -1
+                velocity[hit_wall & (wall_along_y | ~wall_along_x), 1] *= -1
+
+            bounced = hit_wall | outside.any(axis=1)
+            moved[bounced] = position[bounced] + velocity[bounced] * tick_duration
+
+            # Destructible walls absorb bullets
+            alive &= (flags & DESTRUCTIBLE_FLAG) == 0
+
+            position = moved
+            trajectory[tick] = np.where(alive[:, None], position, np.nan)
+
+        return trajectory
+
+    def time_to_impact(self, x: float, y: float, trajectory: typing.Optional[np.ndarray] = None,
+                       tick_duration: float = TICK_DURATION) -> float:
+        """
+        :return: Seconds until the first hostile bullet hits a tank standing still at (x, y), or math.inf if none does
+            within the projected ticks.
+        """
+        if trajectory is None:
+            trajectory = self.project(tick_duration=tick_duration)
+        if trajectory.size == 0:
+            return math.inf
+
+        hits = (np.abs(trajectory - (x, y)) <= HIT_RADIUS).all(axis=2).any(axis=1)
+        if not hits.any():
+            return math.inf
+        return (int(hits.argmax()) + 1) * tick_duration
+
+    def plan_dodge(self, x: float, y: float,
+                   is_walkable: typing.Optional[typing.Callable[[float, float], bool]] = None,
+                   preferred: typing.Optional[typing.Sequence[float]] = None,
+                   ticks: int = DEFAULT_LOOKAHEAD_TICKS,
+                   tick_duration: float = TICK_DURATION) -> typing.Optional[typing.List[float]]:
+        """
+        Works out where to go so that incoming bullets miss us.
+        Every dodge direction is tried against every bullet trajectory in one go, and the move that stays safe the
+        longest wins. Ties go to the move closest to `preferred`, the point we wanted to go to anyway.
+        :param is_walkable: Optional check that the end point of a move isn't inside a wall.
+        :return: The point to path to, or None if no move does better than standing still.
+        """
+        trajectory = self.project(ticks, tick_duration=tick_duration)
+        if trajectory.shape[1] == 0:
+            return None
+
+        angles = np.linspace(0, 2 * math.pi, DODGE_DIRECTIONS, endpoint=False)
+        # The first move is staying put
+        directions = np.concatenate([[[0.0, 0.0]], np.stack([np.cos(angles), np.sin(angles)], axis=1)])
+
+        # Where each move takes us on each tick: (moves, ticks, 2)
+        travelled = TANK_SPEED * tick_duration * np.arange(1, ticks + 1)
+        path = np.array([x, y]) + directions[:, None, :] * travelled[None, :, None]
+        path = np.clip(path, 0, [self.width, self.height])
+
+        # (moves, ticks, bullets) -> first tick each move gets hit, or `ticks` if it never does
+        hits = (np.abs(path[:, :, None, :] - trajectory[None, :, :, :]) <= HIT_RADIUS).all(axis=3).any(axis=2)
+        first_hit = np.where(hits.any(axis=1), hits.argmax(axis=1), ticks)
+
+        if first_hit[0] == ticks:
+            return None
+
+        scores = first_hit.astype(float)
+        if preferred is not None:
+            wanted = np.array(preferred, dtype=float) - (x, y)
+            norm = np.linalg.norm(wanted)
+            if norm > 0:
+                # Less than one tick, so it only ever breaks ties
+                scores += 0.5 * (directions @ (wanted / norm) + 1) / 2
+
+        for move in np.argsort(-scores, kind="stable"):
+            # Nothing beats staying on course
+            if move == 0:
+                return None
+            end_x, end_y = path[move, -1]
+            if is_walkable is None or is_walkable(end_x, end_y):
+                return [float(end_x), float(end_y)]
+        return None
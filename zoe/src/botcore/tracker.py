@@ -0,0 +1,139 @@
+import math
+import typing
+from array import array
+
+from .constants import BULLET_SPEED, TICK_DURATION
+
+
+# How many past positions are kept
+HISTORY_SIZE = 64
+
+# Filter gains: how much of the difference between what was predicted and what the server says gets taken on
+POSITION_GAIN = 0.85
+VELOCITY_GAIN = 0.7
+ACCELERATION_GAIN = 0.1
+
+# Tanks get up to speed quickly, so acceleration is only extrapolated this many seconds into the future
+ACCELERATION_HORIZON = 0.3
+
+# Don't lead a shot further ahead than this many seconds, the enemy will have changed its mind by then
+MAX_LEAD_TIME = 2.0
+
+# Start over if the tank hasn't been seen for this many turns
+MAX_GAP = 15
+
+# Fixed point iterations for the intercept time. Each one shrinks the error by the target's speed over the bullet's.
+INTERCEPT_ITERATIONS = 6
+
+
+class MotionTracker:
+    """
+    Follows one tank's motion from the positions and velocities the server sends, to predict where it's going to be.
+    The estimate is a constant acceleration model corrected with fixed gains every turn (a steady state Kalman filter),
+    and the last HISTORY_SIZE positions are kept in a ring buffer. Updating is O(1) and doesn't allocate.
+    Positions are in map units, times in seconds.
+    """
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self.history_size = history_size
+        self._xs = array("d", bytes(8 * history_size))
+        self._ys = array("d", bytes(8 * history_size))
+        self._turns = array("q", bytes(8 * history_size))
+        self._next = 0
+        self.count = 0
+
+        self.x = 0.0
+        self.y = 0.0
+        self.vx = 0.0
+        self.vy = 0.0
+        self.ax = 0.0
+        self.ay = 0.0
+        self.last_turn = None
+
+    def update(self, x: float, y: float, turn: int, vx: typing.Optional[float] = None,
+               vy: typing.Optional[float] = None):
+        """
+        :param turn: Number of the turn the position is from.
+        :param vx, vy: The velocity the server sent along with the position, if any.
+        """
+        slot = self._next
+        self._xs[slot] = x
+        self._ys[slot] = y
+        self._turns[slot] = turn
+        self._next = (slot + 1) % self.history_size
+        if self.count < self.history_size:
+            self.count += 1
+
+        if self.last_turn is None or not 0 < turn - self.last_turn <= MAX_GAP:
+            # First sighting, the same turn again or a long gap. Nothing to correct, start from what we're told.
+            self.x, self.y = x, y
+            self.vx = vx if vx is not None else 0.0
+            self.vy = vy if vy is not None else 0.0
+            self.ax = self.ay = 0.0
+            self.last_turn = turn
+            return
+
+        dt = (turn - self.last_turn) * TICK_DURATION
+        self.last_turn = turn
+
+        # Predict
+        predicted_x = self.x + self.vx * dt + 0.5 * self.ax * dt * dt
+        predicted_y = self.y + self.vy * dt + 0.5 * self.ay * dt * dt
+        predicted_vx = self.vx + self.ax * dt
+        predicted_vy = self.vy + self.ay * dt
+
+        # Correct
+        self.x = predicted_x + POSITION_GAIN * (x - predicted_x)
+        self.y = predicted_y + POSITION_GAIN * (y - predicted_y)
+        if vx is not None and vy is not None:
+            velocity_error_x = vx - predicted_vx
+            velocity_error_y = vy - predicted_vy
+        else:
+            velocity_error_x = (x - predicted_x) / dt
+            velocity_error_y = (y - predicted_y) / dt
+        self.vx = predicted_vx + VELOCITY_GAIN * velocity_error_x
+        self.vy = predicted_vy + VELOCITY_GAIN * velocity_error_y
+        self.ax += ACCELERATION_GAIN * velocity_error_x / dt
+        self.ay += ACCELERATION_GAIN * velocity_error_y / dt
+
+    def position_ago(self, turns: int) -> typing.Optional[typing.Tuple[float, float, int]]:
+        """
+        :param turns: 0 for the latest recorded position, 1 for the one before it and so on.
+        :return: (x, y, turn) of that position, or None if it isn't in the history.
+        """
+        if not 0 <= turns < self.count:
+            return None
+        slot = (self._next - 1 - turns) % self.history_size
+        return self._xs[slot], self._ys[slot], self._turns[slot]
+
+    def predict(self, seconds: float) -> typing.Tuple[float, float]:
+        """
+        :return: Where the tank is expected to be after the given number of seconds.
+        """
+        accelerating = min(seconds, ACCELERATION_HORIZON)
+        return (
+            self.x + self.vx * seconds + self.ax * accelerating * (seconds - 0.5 * accelerating),
+            self.y + self.vy * seconds + self.ay * accelerating * (seconds - 0.5 * accelerating),
+        )
+
+    def intercept(self, x: float, y: float, bullet_speed: float = BULLET_SPEED) -> typing.Tuple[float, float, float]:
+        """
+        Where to aim a bullet fired from (x, y) so that it meets the tank.
+        :return: (aim x, aim y, seconds until the bullet gets there).
+        """
+        seconds = math.hypot(self.x - x, self.y - y) / bullet_speed
+        aim_x, aim_y = self.x, self.y
+        for _ in range(INTERCEPT_ITERATIONS):
+            seconds = min(seconds, MAX_LEAD_TIME)
+            aim_x, aim_y = self.predict(seconds)
+            seconds = math.hypot(aim_x - x, aim_y - y) / bullet_speed
+        return aim_x, aim_y, seconds
+
+    def lead_angle(self, x: float, y: float, bullet_speed: float = BULLET_SPEED) -> typing.Optional[float]:
+        """
+        :return: The angle in degrees to shoot at from (x, y) to hit the tank where it's going to be, or None if it
+            hasn't been seen yet.
+        """
+        if self.last_turn is None:
+            return None
+        aim_x, aim_y, _ = self.intercept(x, y, bullet_speed)
+        return math.degrees(math.atan2(aim_y - y, aim_x - x))
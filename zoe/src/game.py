@@ -1,116 +1,44 @@
-import random
 import math
-import sys
 
-import comms
-from object_types import ObjectTypes
+from botcore import geometry
+from botcore import telemetry
+from botcore.constants import BULLET_SPEED
+from botcore.game import BaseGame
 
 
-class Game:
+class Game(BaseGame):
     """
-    Stores all information about the game and manages the communication cycle.
-    Available attributes after initialization will be:
-    - tank_id: your tank id
-    - objects: a dict of all objects on the map like {object-id: object-dict}.
-    - width: the width of the map as a floating point number.
-    - height: the height of the map as a floating point number.
-    - current_turn_message: a copy of the message received this turn. It will be updated everytime `read_next_turn_data`
-        is called and will be available to be used in `respond_to_turn` if needed.
+    Zoe's strategy. Everything the bot knows about the game comes from `BaseGame`.
     """
-    def __init__(self):
-        tank_id_message: dict = comms.read_message()
-        
-        self.tank_id = tank_id_message["message"]["your-tank-id"]
-        self.enemy_tank_id = tank_id_message["message"]["enemy-tank-id"]
-
-        self.current_turn_message = None
-
-        # We will store all game objects here
-        self.objects = {}
-
-        next_init_message = comms.read_message()
-        while next_init_message != comms.END_INIT_SIGNAL:
-            # At this stage, there won't be any "events" in the message. So we only care about the object_info.
-            object_info: dict = next_init_message["message"]["updated_objects"]
-
-            # Store them in the objects dict
-            self.objects.update(object_info)
-
-            # Read the next message
-            next_init_message = comms.read_message()
-
-        # We are outside the loop, which means we must've received the END_INIT signal
-
-        # Let's figure out the map size based on the given boundaries
-
-        # Read all the objects and find the boundary objects
-        boundaries = []
-        for game_object in self.objects.values():
-            if game_object["type"] == ObjectTypes.BOUNDARY.value:
-                boundaries.append(game_object)
-
-        # The biggest X and the biggest Y among all Xs and Ys of boundaries must be the top right corner of the map.
-
-        # Let's find them. This might seem complicated, but you will learn about its details in the tech workshop.
-        biggest_x, biggest_y = [
-            max([max(map(lambda single_position: single_position[i], boundary["position"])) for boundary in boundaries])
-            for i in range(2)
-        ]
-
-        self.width = biggest_x
-        self.height = biggest_y
-
-    def read_next_turn_data(self):
-        """
-        It's our turn! Read what the game has sent us and update the game info.
-        :returns True if the game continues, False if the end game signal is received and the bot should be terminated
-        """
-        # Read and save the message
-        self.current_turn_message = comms.read_message()
-
-        if self.current_turn_message == comms.END_SIGNAL:
-            return False
-
-        # Delete the objects that have been deleted
-        # NOTE: You might want to do some additional logic here. For example check if a powerup you were moving towards
-        # is already deleted, etc.
-        for deleted_object_id in self.current_turn_message["message"]["deleted_objects"]:
-            try:
-                del self.objects[deleted_object_id]
-            except KeyError:
-                pass
-
-        # Update your records of the new and updated objects in the game
-        # NOTE: you might want to do some additional logic here. For example check if a new bullet has been shot or a
-        # new powerup is now spawned, etc.
-        self.objects.update(self.current_turn_message["message"]["updated_objects"])
-
-        return True
-    
     def find_powerup(self):
         """
-        Find existing powerups and return the closest one.
+        Find existing powerups and return the closest one inside the closing boundary.
         """
-        closest_powerup = None
-        min_distance = float('inf')
-        for game_object in self.objects.values():
-            if game_object["type"] == ObjectTypes.POWERUP.value:
-                object_x = game_object["position"][0]
-                object_y = game_object["position"][1]
-                self_x = self.objects[self.tank_id]["position"][0]
-                self_y = self.objects[self.tank_id]["position"][1]
-                distance = math.sqrt(abs(object_x - self_x) ** 2 + abs(object_y - self_y) ** 2)
-                if min_distance > distance:
-                    min_distance = distance
-                    closest_powerup = game_object["position"]
-        return closest_powerup
+        my_tank = self.store.tanks[self.tank_id]
+        closest = self.nearest_powerup(my_tank.x, my_tank.y)
+        if closest is None:
+            return None
+        return list(closest[1])
 
     def find_enemy_tank(self):
-        for game_key, game_object in self.objects.items():
-            if game_object["type"] == ObjectTypes.TANK.value and game_key != self.tank_id:
-                return game_object["position"]
+        for tank_id, tank in self.store.tanks.items():
+            if tank_id != self.tank_id:
+                return tank.position
         return None
 
+    def worth_shooting(self):
+        """
+        Whether a shot at the enemy is clear and likely enough to hit, a miss wastes the time until we can fire again.
+        """
+        my_tank = self.store.tanks[self.tank_id]
+        enemy_tank = self.store.tanks[self.enemy_tank_id]
+        if not self.line_of_sight.has_line_of_sight(my_tank.x, my_tank.y, enemy_tank.x, enemy_tank.y):
+            return False
+        # Judged on the velocity calculate_angle leads the shot with, the server doesn't always send one
+        return self.hit_table.should_shoot(
+            my_tank.x, my_tank.y, enemy_tank.x, enemy_tank.y, self.enemy_tracker.vx, self.enemy_tracker.vy,
+        )
+
     def calculate_angle(self, mine, enemy):
             # angle_radians = math.degrees(math.atan(abs(mine[0] - enemy[0]) / abs(mine[1] - enemy[1])))
             # return -1 * (360 - angle_radians - 90)
@@ -127,13 +55,15 @@ class Game:
             # return math.degrees(theta)
             # # return angleBetweenTwoPoints(0, 0, myVelocityX, myVelocityY)
             # angle = (math.atan2(enemy[1] - mine[1], enemy[0] - mine[0]) * 100 )/ math.pi
-            angle = self.angleBetweenTwoPoints(mine[0], mine[1], enemy[0], enemy[1])
-            return angle - 90
+            # Lead the shot to where the enemy will be when the bullet gets there
+            angle = self.enemy_tracker.lead_angle(mine[0], mine[1], BULLET_SPEED)
+            if angle is None:
+                angle = self.angleBetweenTwoPoints(mine[0], mine[1], enemy[0], enemy[1])
+            return angle
     
     def angleBetweenTwoPoints(self, x1, y1, x2, y2): 
-        rateOfChange = (y2 - y1)/(x2 - x1)
-        theta = math.atan(rateOfChange)
-        return math.degrees(theta)
+        # atan2 works out the quadrant and doesn't divide by zero when the points are vertically aligned
+        return geometry.angle(x1, y1, x2, y2)
     
     # def angleRadBetweenTwoPoints(x1, y1, x2, y2):  
     #     dotProduct = x1 * x2 + y1 * y2 
@@ -147,10 +77,11 @@ class Game:
         """
 
         # Locate (and move towards) Power Up
-        my_tank_position = self.objects[self.tank_id]["position"]
-        enemey_tank_position =  self.objects[self.enemy_tank_id]["position"]
+        my_tank_position = self.store.tanks[self.tank_id].position
+        enemey_tank_position = self.store.tanks[self.enemy_tank_id].position
 
-        print("mine: " + str(my_tank_position) + "enemyL " + str(enemey_tank_position) , file=sys.stderr)
+        if telemetry.level >= telemetry.DEBUG:
+            telemetry.debug("positions", mine=my_tank_position, enemy=enemey_tank_position)
 
         dest_x = self.width // 2
         dest_y = self.height // 2
@@ -170,12 +101,12 @@ class Game:
         y2 = enemey_tank_position[1]
         angle = math.atan2(y2 - y1, x2 - x1) * 100 / math.pi
 
-        comms.post_message({
+        my_response = {
             # "shoot": random.uniform(0, random.randint(1, 360)),
             # "shoot": angle
-            "shoot": self.calculate_angle(my_tank_position, enemey_tank_position),
             # "shoot": 90
             # "path": [dest_x, dest_y],
-        })
-
-
+        }
+        if self.worth_shooting():
+            my_response["shoot"] = self.calculate_angle(my_tank_position, enemey_tank_position)
+        self.post_response(my_response)